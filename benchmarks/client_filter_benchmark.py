@@ -0,0 +1,52 @@
+"""Compare per-query latency of the legacy and AST client filter engines.
+
+Run with: python benchmarks/client_filter_benchmark.py [--number N]
+"""
+import argparse
+import contextlib
+import io
+import timeit
+
+from dataneuron.core.sql_query_filter import SQLQueryFilter
+
+CLIENT_TABLES = {
+    'main.orders': 'user_id',
+    'main.products': 'company_id',
+    'main.customers': 'customer_id',
+}
+
+QUERIES = {
+    'simple': 'SELECT * FROM orders WHERE total > 100',
+    'join': 'SELECT o.id, p.name FROM orders o JOIN products p ON o.product_id = p.id WHERE o.total > 100',
+    'union': 'SELECT id FROM orders UNION ALL SELECT id FROM products UNION ALL SELECT id FROM customers',
+    'subquery': 'SELECT * FROM orders WHERE product_id IN (SELECT id FROM products WHERE price > 10)',
+    'nested': 'SELECT * FROM (SELECT * FROM (SELECT * FROM orders) AS inner_subq) AS outer_subq',
+    'cte': ('WITH big AS (SELECT customer_id, SUM(total) AS spent FROM orders GROUP BY customer_id), '
+            'top AS (SELECT * FROM big WHERE spent > 1000) '
+            'SELECT c.name, t.spent FROM customers c JOIN top t ON c.id = t.customer_id ORDER BY t.spent DESC'),
+}
+
+
+def time_engine(engine: str, query: str, number: int) -> float:
+    query_filter = SQLQueryFilter(CLIENT_TABLES, schemas=['main'], engine=engine)
+    # The legacy engine prints debug output; keep it out of the measurements
+    with contextlib.redirect_stdout(io.StringIO()):
+        # _filter_query bypasses the template cache so every run parses the query
+        seconds = timeit.timeit(lambda: query_filter._filter_query(query, 1), number=number)
+    return seconds / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200, help='runs per query and engine')
+    args = parser.parse_args()
+
+    print(f"{'query':<10} {'legacy (us)':>12} {'ast (us)':>10} {'speedup':>8}")
+    for name, query in QUERIES.items():
+        legacy = time_engine('legacy', query, args.number)
+        ast = time_engine('ast', query, args.number)
+        print(f"{name:<10} {legacy:>12.1f} {ast:>10.1f} {legacy / ast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
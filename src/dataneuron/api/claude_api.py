@@ -1,8 +1,10 @@
 import requests
 import os
 import json
+import logging
 from typing import Dict, Any, Optional, List
 from ..utils.file_utils import convert_to_base64
+from . import http_session
 from typing import Dict, Any, Optional, List, Generator
 import xml.etree.ElementTree as ET
 import click
@@ -10,6 +12,9 @@ import click
 API_URL = 'https://api.anthropic.com/v1/messages'
 MODEL = 'claude-3-5-sonnet-20240620'
 MAX_TOKENS = 8000
+BETA_FEATURES = ["max-tokens-3-5-sonnet-2024-07-15", "prompt-caching-2024-07-31"]
+
+logger = logging.getLogger(__name__)
 
 
 def get_api_key() -> str:
@@ -23,18 +28,37 @@ def get_headers(api_key: str) -> Dict[str, str]:
     return {
         'x-api-key': api_key,
         'Content-Type': 'application/json',
-        "Anthropic-Beta": "max-tokens-3-5-sonnet-2024-07-15",
+        "Anthropic-Beta": ",".join(BETA_FEATURES),
         'Anthropic-Version': '2023-06-01'
     }
 
 
 def make_api_call(data: Dict[str, Any], headers: Dict[str, str], stream: bool = False) -> requests.Response:
-    response = requests.post(
+    response = http_session.post(
         API_URL, json=data, headers=headers, stream=stream)
     response.raise_for_status()
     return response
 
 
+def build_user_content(query: str):
+    """Send the static prefix of a CacheablePrompt as its own block, marked for prompt caching."""
+    prefix = getattr(query, 'prefix', '')
+    suffix = getattr(query, 'suffix', '')
+    if not prefix or not suffix:
+        return str(query)
+    return [
+        {'type': 'text', 'text': prefix, 'cache_control': {'type': 'ephemeral'}},
+        {'type': 'text', 'text': suffix}
+    ]
+
+
+def log_usage(usage: Optional[Dict[str, Any]]):
+    if usage:
+        logger.info("Claude usage: input_tokens=%s cache_creation_input_tokens=%s cache_read_input_tokens=%s output_tokens=%s",
+                    usage.get('input_tokens'), usage.get('cache_creation_input_tokens'),
+                    usage.get('cache_read_input_tokens'), usage.get('output_tokens'))
+
+
 def parse_response(response: str) -> str:
     try:
         # root = extract_and_parse_xml(response)
@@ -53,13 +77,14 @@ def call_claude_api_with_pagination(query: str, include_context: bool = False, i
     data = {
         'model': MODEL,
         'system': instruction_prompt or "",
-        'messages': [{'role': 'user', 'content': query}],
+        'messages': [{'role': 'user', 'content': build_user_content(query)}],
         'max_tokens': MAX_TOKENS
     }
 
     while True:
         response = make_api_call(data, headers)
         resp = response.json()
+        log_usage(resp.get('usage'))
         full_response += resp['content'][0]['text']
 
         if 'stop_reason' in resp and resp['stop_reason'] == 'max_tokens':
@@ -129,7 +154,7 @@ def stream_claude_response(query: str, chat_history: Optional[list] = None, inst
     headers['Accept'] = 'text/event-stream'
 
     messages = chat_history or []
-    messages.append({'role': 'user', 'content': query})
+    messages.append({'role': 'user', 'content': build_user_content(query)})
 
     data = {
         'model': MODEL,
@@ -138,6 +163,7 @@ def stream_claude_response(query: str, chat_history: Optional[list] = None, inst
         'max_tokens': MAX_TOKENS,
         'stream': True
     }
+    usage = {}
     try:
         response = make_api_call(data, headers, stream=True)
         for line in response.iter_lines():
@@ -148,7 +174,12 @@ def stream_claude_response(query: str, chat_history: Optional[list] = None, inst
                     if data['type'] == 'content_block_delta':
                         chunk = data['delta']['text']
                         yield chunk
+                    elif data['type'] == 'message_start':
+                        usage = data['message'].get('usage', {})
+                    elif data['type'] == 'message_delta':
+                        usage = dict(usage, **data.get('usage', {}))
                     elif data['type'] == 'message_stop':
+                        log_usage(usage)
                         break
 
     except Exception as e:
@@ -0,0 +1,68 @@
+import os
+import threading
+from typing import Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 300
+# 529 is returned by Anthropic when the API is overloaded
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504, 529)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session() -> requests.Session:
+    """Build a session that keeps connections alive and retries rate limits and server errors with backoff."""
+    pool_size = int(os.getenv('DATA_NEURON_HTTP_POOL_SIZE', DEFAULT_POOL_SIZE))
+    retry = Retry(
+        total=int(os.getenv('DATA_NEURON_HTTP_RETRIES', DEFAULT_RETRIES)),
+        backoff_factor=float(
+            os.getenv('DATA_NEURON_HTTP_BACKOFF', DEFAULT_BACKOFF)),
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'POST']),
+        respect_retry_after_header=True,
+        # Hand the last response back so callers still get raise_for_status errors
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size,
+                          pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session shared by all LLM API calls."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def get_timeout() -> Tuple[float, float]:
+    return (
+        float(os.getenv('DATA_NEURON_HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
+        float(os.getenv('DATA_NEURON_HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT))
+    )
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault('timeout', get_timeout())
+    return get_session().post(url, **kwargs)
+
+
+def reset_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
@@ -0,0 +1,139 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from ..utils.cache import TTLCache
+
+DEFAULT_CACHE_SIZE = 512
+DEFAULT_CACHE_TTL = 3600
+
+
+def make_cache_key(provider: str, model: str, instruction_prompt: Optional[str], query: str,
+                   include_context: bool = False) -> str:
+    digest = hashlib.sha256()
+    for part in (provider, model, instruction_prompt or "", query, str(bool(include_context))):
+        digest.update(part.encode('utf-8'))
+        # Separator so that moving text between parts changes the key
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """Cache of LLM responses: an in-memory LRU with TTL and an optional SQLite file shared between workers."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = DEFAULT_CACHE_TTL, disk_path: Optional[str] = None):
+        self.ttl = ttl
+        self.memory = TTLCache(max_size=max_size, ttl=ttl)
+        self.disk_path = os.path.expanduser(disk_path) if disk_path else None
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+        if self.disk_path:
+            with self._connect_disk() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key TEXT PRIMARY KEY,
+                        response TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+
+    def _connect_disk(self):
+        conn = sqlite3.connect(self.disk_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        response = self.memory.get(key)
+        if response is not None or not self.disk_path:
+            return response
+
+        conn = self._connect_disk()
+        try:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        # Disk entries carry wall-clock timestamps since they outlive the process
+        if row is None or (self.ttl is not None and row[1] + self.ttl <= time.time()):
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+        self.memory.set(key, row[0])
+        return row[0]
+
+    def set(self, key: str, response: str):
+        self.memory.set(key, response)
+        if not self.disk_path:
+            return
+        conn = self._connect_disk()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+                             (key, response, time.time()))
+                if self.ttl is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE created_at <= ?",
+                                 (time.time() - self.ttl,))
+        finally:
+            conn.close()
+
+    def clear(self):
+        self.memory.clear()
+        with self._lock:
+            self.disk_hits = 0
+        if self.disk_path:
+            conn = self._connect_disk()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM llm_cache")
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        # Memory misses that were found on disk are hits overall
+        hits = stats['hits'] + self.disk_hits
+        lookups = stats['hits'] + stats['misses']
+        return {
+            'size': stats['size'],
+            'memory_hits': stats['hits'],
+            'disk_hits': self.disk_hits,
+            'misses': stats['misses'] - self.disk_hits,
+            'hit_ratio': hits / lookups if lookups else 0.0
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide LLM cache configured from the environment, or None when disabled.
+
+    The cache is off unless DATA_NEURON_LLM_CACHE=true; DATA_NEURON_LLM_CACHE_TTL,
+    DATA_NEURON_LLM_CACHE_SIZE and DATA_NEURON_LLM_CACHE_PATH (SQLite file)
+    tune it.
+    """
+    global _cache
+    if os.getenv('DATA_NEURON_LLM_CACHE', 'false').lower() not in ('true', '1', 'yes', 'on'):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                ttl = os.getenv('DATA_NEURON_LLM_CACHE_TTL')
+                _cache = LLMCache(
+                    max_size=int(os.getenv(
+                        'DATA_NEURON_LLM_CACHE_SIZE', DEFAULT_CACHE_SIZE)),
+                    ttl=float(ttl) if ttl else DEFAULT_CACHE_TTL,
+                    disk_path=os.getenv('DATA_NEURON_LLM_CACHE_PATH')
+                )
+    return _cache
+
+
+def reset_llm_cache():
+    """Drop the process-wide cache so it is rebuilt from the environment on next use."""
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -1,6 +1,8 @@
 import os
 from .claude_api import call_claude_api_with_pagination, call_claude_vision_api_with_pagination, stream_claude_response
-from .openai_api import call_api_with_pagination, call_vision_api_with_pagination, stream_response
+from .openai_api import call_api_with_pagination, call_vision_api_with_pagination, stream_response, get_model
+from .claude_api import MODEL as CLAUDE_MODEL
+from .llm_cache import get_llm_cache, make_cache_key
 import xml.etree.ElementTree as ET
 
 
@@ -14,14 +16,57 @@ def get_api_functions():
         raise ValueError(f"Unsupported LLM type: {llm_type}")
 
 
-def stream_neuron_api(query, chat_history=None, instruction_prompt=None):
+def stream_neuron_api(query, chat_history=None, instruction_prompt=None, use_cache=False):
     _, _, stream_response = get_api_functions()
-    return stream_response(query, chat_history, instruction_prompt)
+    cache = get_llm_cache() if use_cache and not chat_history else None
+    if cache is None:
+        return stream_response(query, chat_history, instruction_prompt)
+    return _stream_with_cache(cache, stream_response, query, instruction_prompt)
 
 
-def call_neuron_api(query, include_context=False, instruction_prompt=None):
+def _stream_with_cache(cache, stream_response, query, instruction_prompt):
+    """Replay a cached response as one chunk, or stream and cache the complete response."""
+    provider, model = get_llm_identity()
+    key = make_cache_key(provider, model, instruction_prompt, query)
+    response = cache.get(key)
+    if response is not None:
+        yield response
+        return
+
+    chunks = []
+    for chunk in stream_response(query, None, instruction_prompt):
+        chunks.append(chunk)
+        yield chunk
+    response = "".join(chunks)
+    # The Claude stream reports failures as an "Error: ..." chunk instead of raising
+    if response and not response.startswith("Error: "):
+        cache.set(key, response)
+
+
+def get_llm_identity():
+    """Return the (provider, model) pair that responses are generated with."""
+    llm_type = os.getenv('DATA_NEURON_LLM', 'claude').lower()
+    if llm_type == 'claude':
+        return llm_type, CLAUDE_MODEL
+    try:
+        return llm_type, get_model()
+    except ValueError:
+        return llm_type, ""
+
+
+def call_neuron_api(query, include_context=False, instruction_prompt=None, use_cache=False):
     call_api, _, _ = get_api_functions()
-    response = call_api(query, include_context, instruction_prompt)
+    cache = get_llm_cache() if use_cache else None
+    if cache is None:
+        return call_api(query, include_context, instruction_prompt)
+
+    provider, model = get_llm_identity()
+    key = make_cache_key(provider, model, instruction_prompt, query, include_context)
+    response = cache.get(key)
+    if response is None:
+        response = call_api(query, include_context, instruction_prompt)
+        if response:
+            cache.set(key, response)
     return response
     # return parse_neuron_response(response)
 
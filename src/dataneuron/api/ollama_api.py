@@ -1,4 +1,4 @@
-import requests
+from . import http_session
 from typing import Dict, Any, Generator, Optional, List
 import json
 
@@ -18,7 +18,7 @@ def call_ollama_api(model: str, prompt: str, system_prompt: str = "") -> str:
         "system": system_prompt,
         "stream": False
     }
-    response = requests.post(f"{OLLAMA_ENDPOINT}/generate", json=data)
+    response = http_session.post(f"{OLLAMA_ENDPOINT}/generate", json=data)
     response.raise_for_status()
     return response.json()["response"]
 
@@ -38,7 +38,7 @@ def stream_ollama_response(model: str, prompt: str, chat_history: Optional[List[
         "stream": True
     }
 
-    response = requests.post(
+    response = http_session.post(
         f"{OLLAMA_ENDPOINT}/chat", json=data, stream=True)
     response.raise_for_status()
 
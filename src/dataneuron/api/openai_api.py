@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import Dict, Any, Optional, List, Generator
 from openai import OpenAI, AzureOpenAI
 from ..utils.file_utils import convert_to_base64
@@ -19,23 +20,38 @@ def get_client():
     llm_type = get_env_variable('DATA_NEURON_LLM', 'openai').lower()
 
     if llm_type == 'azure':
-        return AzureOpenAI(
-            api_key=get_env_variable("AZURE_OPENAI_API_KEY"),
-            api_version=get_env_variable("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=get_env_variable("AZURE_OPENAI_ENDPOINT")
+        return _create_client(
+            llm_type,
+            get_env_variable("AZURE_OPENAI_API_KEY"),
+            get_env_variable("AZURE_OPENAI_ENDPOINT"),
+            get_env_variable("AZURE_OPENAI_API_VERSION")
         )
     elif llm_type == 'openai':
-        return OpenAI()
+        return _create_client(llm_type, os.getenv("OPENAI_API_KEY"))
     elif llm_type == 'custom':
         api_key = get_env_variable("DATA_NEURON_LLM_API_KEY")
         api_base = get_env_variable("DATA_NEURON_LLM_ENDPOINT")
-        return OpenAI(api_key=api_key, base_url=api_base)
+        return _create_client(llm_type, api_key, api_base)
     elif llm_type == 'ollama':
         return get_ollama_client()
     else:
         raise ValueError(f"Unsupported LLM type: {llm_type}")
 
 
+@lru_cache(maxsize=8)
+def _create_client(llm_type: str, api_key: Optional[str], endpoint: Optional[str] = None, api_version: Optional[str] = None):
+    """Build a client once per configuration; clients keep their HTTP connection pool and are thread-safe."""
+    if llm_type == 'azure':
+        return AzureOpenAI(
+            api_key=api_key,
+            api_version=api_version,
+            azure_endpoint=endpoint
+        )
+    elif llm_type == 'custom':
+        return OpenAI(api_key=api_key, base_url=endpoint)
+    return OpenAI()
+
+
 def get_model():
     llm_type = get_env_variable('DATA_NEURON_LLM', 'openai').lower()
     if llm_type == 'azure':
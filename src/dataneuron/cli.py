@@ -27,10 +27,16 @@ VERSION = "0.3.2"  # Update this as you release new versions
 @click.option('--host', default='0.0.0.0', help='Host to run the server on')
 @click.option('--port', type=int, default=8040, help='Port to run the server on')
 @click.option('--mc', is_flag=True, help='Mark tables with client ID columns.')
-def cli(init, db_init, chat, version, report, context, ask, server, prod, host, port, mc):
+@click.option('--refresh-index', is_flag=True, help='Rebuild the value index of the context given with --context.')
+def cli(init, db_init, chat, version, report, context, ask, server, prod, host, port, mc, refresh_index):
     if init:
         initializer = ContextInitializer()
         initializer.init_context()
+    elif refresh_index:
+        if not context:
+            click.echo("Please provide the context to index with --context.")
+            return
+        ContextInitializer().refresh_value_index(context)
     elif ask:
         query(ask, context)
     elif db_init:
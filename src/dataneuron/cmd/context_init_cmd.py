@@ -8,6 +8,8 @@ from ..core.dashboard_manager import DashboardManager
 from ..utils.print import print_header, print_info, print_success, print_warning, print_prompt
 from ..db_operations.error_handler import handle_database_errors
 from ..db_operations.database_helpers import DatabaseHelper
+from ..core.context_loader import ContextLoader
+from ..core.value_index import build_value_index, VALUE_INDEX_FILE
 
 
 class ContextInitializer:
@@ -59,6 +61,8 @@ class ContextInitializer:
             yaml.dump(sample_data, f)
         print_success("Generated sample_data.yaml")
 
+        self._build_value_index(context_name)
+
         print_info("Generating definitions and relationships...")
         try:
             definitions_yaml, relationships_yaml = self._generate_definitions_and_relationships(
@@ -81,6 +85,20 @@ class ContextInitializer:
         except Exception as e:
             print_warning(f"An error occurred: {str(e)}")
 
+    @handle_database_errors
+    def refresh_value_index(self, context_name):
+        if not os.path.exists(os.path.join('context', context_name)):
+            print_warning(f"Context '{context_name}' does not exist.")
+            return
+        self._build_value_index(context_name)
+
+    def _build_value_index(self, context_name):
+        print_info("Indexing column values for entity matching...")
+        context_loader = ContextLoader(context_name)
+        index = build_value_index(self.db, context_loader.load()['tables'])
+        index.save(os.path.join(context_loader.context_dir, VALUE_INDEX_FILE))
+        print_success(f"Indexed values of {len(index.values)} columns")
+
     def _choose_tables(self, all_tables):
         chosen_tables = []
         for i in range(0, len(all_tables), 10):
@@ -1,6 +1,7 @@
 import os
 import yaml
-from ..utils.file_utils import format_yaml_for_prompt
+from ..prompts.prompt_compiler import compile_context, context_prompt
+from .value_index import ValueIndex, VALUE_INDEX_FILE
 
 
 class ContextLoader:
@@ -23,30 +24,19 @@ class ContextLoader:
         self._load_global_definitions()
         self._load_sample_data()
         self._load_client_tables()
+        compile_context(self.context)
         return self.context
 
     def get_formatted_context(self) -> str:
-        context_prompt = "Database Context:\n\n"
+        return context_prompt(self.context)
 
-        # Format table information
-        context_prompt += "Tables:\n"
-        for table_name, table_data in self.context["tables"].items():
-            context_prompt += f"  {table_name}:\n"
-            context_prompt += format_yaml_for_prompt(
-                table_data).replace("\n", "\n    ")
-            context_prompt += "\n"
-
-        # Format relationships
-        context_prompt += "\nRelationships:\n"
-        context_prompt += format_yaml_for_prompt(
-            self.context["relationships"]).replace("\n", "\n  ")
-
-        # Format global definitions
-        context_prompt += "\nGlobal Definitions:\n"
-        context_prompt += format_yaml_for_prompt(
-            self.context["global_definitions"]).replace("\n", "\n  ")
-
-        return context_prompt
+    def load_value_index(self):
+        """Load the context's value index, or None if it has not been built."""
+        try:
+            return ValueIndex.load(os.path.join(self.context_dir, VALUE_INDEX_FILE))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load the value index: {str(e)}")
+            return None
 
     def _load_tables(self):
         """Load table-specific context."""
@@ -1,30 +1,76 @@
+import threading
 import sqlparse
-from typing import Union, Dict, List, Any, Tuple, Optional
+from queue import Queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Union, Dict, List, Any, Iterator, Tuple, Optional
 from sqlparse.sql import IdentifierList, Identifier, Function
 from sqlparse.tokens import Keyword, DML
 from .context_loader import ContextLoader
 from ..db_operations.factory import DatabaseFactory
-from ..api.main import call_neuron_api
+from ..db_operations.result_stream import QueryResultStream, DEFAULT_BATCH_SIZE
+from ..api.main import call_neuron_api, stream_neuron_api
 from ..prompts.sql_query_prompt import sql_query_prompt
 from .query_refiner import QueryRefiner
 from .sql_query_filter import SQLQueryFilter
+from .table_resolver import TableResolver
+from ..utils.stream_print import parse_simplified_xml
+from ..utils.stats import HitCounter
 from ..utils.print import print_info, print_prompt, print_warning, print_success, print_error, create_box
 
 
 MAX_CHAT_HISTORY = 5
 MAX_RESULT_RECORDS = 3
+# Rows fetched for query() and chat() unless max_result_rows says otherwise
+DEFAULT_MAX_RESULT_ROWS = 10000
+SPECULATION_WORKERS = 8
+
+# How often speculative SQL generation could be used, across all instances
+speculation_stats = HitCounter()
+_speculation_executor = None
+_speculation_executor_lock = threading.Lock()
+# A running LLM call cannot be cancelled, so speculation is skipped while every worker is busy
+_speculation_slots = threading.BoundedSemaphore(SPECULATION_WORKERS)
+
+
+def _get_speculation_executor() -> ThreadPoolExecutor:
+    global _speculation_executor
+    if _speculation_executor is None:
+        with _speculation_executor_lock:
+            if _speculation_executor is None:
+                _speculation_executor = ThreadPoolExecutor(
+                    max_workers=SPECULATION_WORKERS, thread_name_prefix='dataneuron-speculation')
+    return _speculation_executor
 
 
 class DataNeuron:
-    def __init__(self, db_config: Union[str, Dict], context: Union[str, Dict], log: bool = False):
+    def __init__(self, db_config: Union[str, Dict], context: Union[str, Dict], log: bool = False, max_result_rows: Optional[int] = DEFAULT_MAX_RESULT_ROWS,
+                 stream_sql: bool = False, speculative_sql: bool = False, combined_prompt: bool = False,
+                 max_prompt_tables: Optional[int] = None, filter_engine: str = 'legacy',
+                 bind_filter_params: bool = False):
         self.db_config = db_config
         self.context = context
         self.db = None
         self.query_refiner = None
+        # Set when query_refiner belongs to DataNeuronPool state shared with other handles
+        self._shared_refiner = False
         self.chat_history = []
         self.log = log
         self.filter = None
         self.current_client_id = None
+        # Caps the rows streamed for query() and chat(); None fetches everything
+        self.max_result_rows = max_result_rows
+        # Execute the SQL as soon as it is streamed, while the explanation is still being generated
+        self.stream_sql = stream_sql
+        # Generate SQL for the raw question in parallel with refinement
+        self.speculative_sql = speculative_sql
+        # Refine the question and generate its SQL with a single LLM call
+        self.combined_prompt = combined_prompt
+        # Only put this many tables most relevant to the question (plus related tables) in prompts
+        self.max_prompt_tables = max_prompt_tables
+        # Client filter implementation: 'legacy' or the single-pass 'ast' engine
+        self.filter_engine = filter_engine
+        # Execute client-filtered queries with the client id as a bind parameter
+        self.bind_filter_params = bind_filter_params
 
     def initialize(self):
         """Initialize the database connection and load the context."""
@@ -42,13 +88,39 @@ class DataNeuron:
             client_info = self.context.get("client_info", {})
             client_tables = client_info.get("tables", {})
             schemas = client_info.get("schemas", ["main"])
-            self.filter = SQLQueryFilter(client_tables, schemas)
+            self.filter = SQLQueryFilter(
+                client_tables, schemas, engine=self.filter_engine, db_type=self.db.db_type,
+                resolver=TableResolver.from_context(self.context))
         elif self.context is None:
             self.context = {}
 
         if self.log:
             print_info("DataNeuron initialized with database and context.")
 
+    @classmethod
+    def from_shared_state(cls, state, log: bool = False, max_result_rows: Optional[int] = DEFAULT_MAX_RESULT_ROWS,
+                          stream_sql: bool = False, speculative_sql: bool = False, combined_prompt: bool = False,
+                          max_prompt_tables: Optional[int] = None, filter_engine: str = 'legacy',
+                          bind_filter_params: bool = False) -> 'DataNeuron':
+        """Create an initialized instance on top of state shared through DataNeuronPool.
+
+        The database, context and query refiner are shared and must not be
+        mutated; client_id and chat history stay local to the returned instance.
+        set_context() gives the instance its own query refiner.
+        """
+        dataneuron = cls(db_config=None, context=state.context, log=log, max_result_rows=max_result_rows,
+                         stream_sql=stream_sql, speculative_sql=speculative_sql, combined_prompt=combined_prompt,
+                         max_prompt_tables=max_prompt_tables, filter_engine=filter_engine,
+                         bind_filter_params=bind_filter_params)
+        dataneuron.db = state.db
+        dataneuron.query_refiner = state.query_refiner
+        dataneuron._shared_refiner = True
+        if state.client_tables is not None:
+            dataneuron.filter = SQLQueryFilter(
+                state.client_tables, state.schemas, engine=filter_engine, db_type=state.db.db_type,
+                resolver=state.table_resolver)
+        return dataneuron
+
     def query(self, question: str) -> Dict[str, Any]:
         """Execute a natural language query and return the SQL and result."""
         if not self.context or not self.db:
@@ -58,13 +130,16 @@ class DataNeuron:
         if self.log:
             print_info(f"Received question: {question}")
 
-        refined_query, changes, refined_entities, invalid_entities = self.query_refiner.refine_query(
-            question)
+        prompt_context = self._prompt_context(question)
+        speculation = self._start_speculation(question, prompt_context)
+        refined_query, changes, refined_entities, invalid_entities, combined_response = self._refine(
+            question, context=prompt_context)
 
         if self.log:
             print_info(f"Refined query: {refined_query}")
 
         if not refined_query:
+            self._discard_speculation(speculation)
             if self.log:
                 print_warning(
                     "Unable to generate a valid SQL query for the given question.")
@@ -79,11 +154,8 @@ class DataNeuron:
                 'explanation': "Unable to generate a valid SQL query for the given question."
             }
 
-        prompt = sql_query_prompt(refined_query, self.context, self.db.db_type)
-        llm_response = call_neuron_api(prompt)
-
-        sql_query, explanation, references = self._extract_sql_explanation_and_references(
-            llm_response)
+        llm_response, sql_query, explanation, references, execution = self._generate_sql(
+            refined_query, speculation, changes, refined_entities, combined_response, prompt_context)
 
         if not sql_query:
             if self.log:
@@ -105,10 +177,11 @@ class DataNeuron:
             print_prompt(f"Explanation: {explanation}")
             print_info(f"References: {references}")
 
-        if self.current_client_id:
+        if execution is None:
+            execution = self.execute_query_with_column_names(
+                sql_query, max_rows=self.max_result_rows)
             sql_query = self._apply_client_filter(sql_query)
-
-        result, column_names = self.execute_query_with_column_names(sql_query)
+        result, column_names = execution
 
         if self.log:
             print_info("Query execution completed. Displaying results:")
@@ -138,8 +211,11 @@ class DataNeuron:
         self.chat_history.append({"role": "user", "content": message})
 
         formatted_history = self._format_chat_history()
-        refined_query, changes, refined_entities, invalid_entities = self.query_refiner.refine_query(
-            message, formatted_history)
+        prompt_context = self._prompt_context(self._chat_questions())
+        speculation = self._start_speculation(
+            message, prompt_context, follow_up=len(self.chat_history) > 1)
+        refined_query, changes, refined_entities, invalid_entities, combined_response = self._refine(
+            message, formatted_history, prompt_context)
 
         if self.log:
             print_info(f"Refined query: {refined_query}")
@@ -147,18 +223,15 @@ class DataNeuron:
         response = ""
         result = []
         if not refined_query:
+            self._discard_speculation(speculation)
             response = "I'm sorry, but I couldn't understand your query in the context of our conversation and the database structure."
             if self.log:
                 print_warning(
                     "Unable to understand the query. Can you try asking questions related to your db")
             return None, response
         else:
-            prompt = sql_query_prompt(
-                refined_query, self.context, self.db.db_type)
-            llm_response = call_neuron_api(prompt)
-
-            sql_query, explanation, references = self._extract_sql_explanation_and_references(
-                llm_response)
+            llm_response, sql_query, explanation, references, execution = self._generate_sql(
+                refined_query, speculation, changes, refined_entities, combined_response, prompt_context)
 
             if not sql_query:
                 response = "I'm sorry, but I couldn't generate a valid SQL query for your question."
@@ -167,13 +240,12 @@ class DataNeuron:
                         "The language model was unable to generate a valid SQL query.")
                 return None, response
             else:
-                if self.current_client_id:
+                if execution is None:
+                    execution = self.execute_query_with_column_names(
+                        sql_query, max_rows=self.max_result_rows)
                     sql_query = self._apply_client_filter(sql_query)
-
-                result, column_names = self.execute_query_with_column_names(
-                    sql_query)
-                result_str = str(result[:MAX_RESULT_RECORDS])
-                response = f"Based on your question, I've generated the following SQL query: {sql_query}\n\nHere's a sample of the results: {result_str}"
+                result, column_names = execution
+                self._record_answer(sql_query, result)
 
                 if self.log:
                     print_success(f"Generated SQL query: {sql_query}")
@@ -183,13 +255,90 @@ class DataNeuron:
                         "Query execution completed. Displaying results:\n")
                     self._print_formatted_result(result, column_names)
 
+        return sql_query, {"data": result, "column_names": column_names}
+
+    def chat_stream(self, message: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[str, Any]]:
+        """Process a chat message like chat(), yielding (event, data) pairs as each stage completes.
+
+        Events in order: refined_question, token (raw LLM output chunks), sql,
+        explanation, references, columns, rows (one per result batch) and done.
+        An error event ends the stream early.
+        """
+        if not self.context or not self.db:
+            raise ValueError(
+                "DataNeuron is not initialized. Call initialize() first.")
+
         self.chat_history.append({"role": "user", "content": message})
-        self.chat_history.append({"role": "assistant", "content": response})
 
-        if len(self.chat_history) > MAX_CHAT_HISTORY * 2:
-            self.chat_history = self.chat_history[-MAX_CHAT_HISTORY * 2:]
+        formatted_history = self._format_chat_history()
+        prompt_context = self._prompt_context(self._chat_questions())
+        refined_query, changes, refined_entities, invalid_entities, combined_response = self._refine(
+            message, formatted_history, prompt_context)
+        if not refined_query:
+            yield 'error', {"message": "I'm sorry, but I couldn't understand your query in the context of our conversation and the database structure."}
+            return
+        yield 'refined_question', {
+            "refined_question": refined_query,
+            "refinement_changes": changes,
+            "refined_entities": refined_entities,
+            "invalid_entities": invalid_entities
+        }
 
-        return sql_query, {"data": result, "column_names": column_names}
+        if combined_response and '</sql>' in combined_response:
+            # The combined refinement response already carries the SQL
+            chunks = [combined_response]
+        else:
+            prompt = sql_query_prompt(
+                refined_query, prompt_context, self.db.db_type)
+            chunks = stream_neuron_api(prompt, use_cache=True)
+
+        sql_query = None
+        stream = None
+        execution_error = None
+        result = []
+        try:
+            for event, content in self._stream_response_events(chunks):
+                if event == 'token':
+                    yield 'token', {"text": content}
+                elif event == 'sql':
+                    sql_query = self._apply_client_filter(content)
+                    yield 'sql', {"sql": sql_query}
+                    # The query runs while the rest of the response is still streaming
+                    try:
+                        stream = self.stream_query_with_column_names(content, batch_size)
+                    except Exception as e:
+                        execution_error = e
+                elif event == 'failure':
+                    raise content
+                else:
+                    yield event, {event: content}
+
+            if not sql_query:
+                yield 'error', {"message": "I'm sorry, but I couldn't generate a valid SQL query for your question."}
+                return
+
+            try:
+                if execution_error is not None:
+                    raise execution_error
+                yield 'columns', {"column_names": stream.column_names}
+                for batch in stream:
+                    if self.max_result_rows is not None:
+                        batch = batch[:self.max_result_rows - len(result)]
+                    result.extend(batch)
+                    yield 'rows', {"rows": batch}
+                    if self.max_result_rows is not None and len(result) >= self.max_result_rows:
+                        break
+            except Exception as e:
+                if self.log:
+                    print_error(f"Error executing query: {str(e)}")
+                yield 'error', {"message": f"Error executing query: {str(e)}", "sql": sql_query}
+                return
+        finally:
+            if stream is not None:
+                stream.close()
+
+        self._record_answer(sql_query, result)
+        yield 'done', {"sql": sql_query, "row_count": len(result)}
 
     def execute_query(self, sql_query: str) -> Any:
         """Execute a SQL query and return the result."""
@@ -210,22 +359,39 @@ class DataNeuron:
                 print_error(f"Error executing query: {str(e)}")
             return f"Error executing query: {str(e)}"
 
-    def execute_query_with_column_names(self, sql_query: str) -> Any:
-        """Execute a SQL query and return the result."""
+    def execute_query_with_column_names(self, sql_query: str, max_rows: Optional[int] = None) -> Any:
+        """Execute a SQL query and return the result.
+
+        With max_rows set, rows are streamed from the database and fetching
+        stops once max_rows rows have been read.
+        """
         if not self.db:
             raise ValueError(
                 "DataNeuron is not initialized. Call initialize() first.")
 
-        if self.current_client_id:
-            sql_query = self._apply_client_filter(sql_query)
+        sql_query, params = self._bind_client_filter(sql_query)
         try:
-            result = self.db.execute_query_with_column_names(sql_query)
+            if max_rows is not None:
+                stream = self.db.stream_query_with_column_names(
+                    sql_query, **self._query_params(params))
+                return stream.fetch(max_rows), stream.column_names
+            result = self.db.execute_query_with_column_names(
+                sql_query, **self._query_params(params))
             return result
         except Exception as e:
             if self.log:
                 print_error(f"Error executing query: {str(e)}")
             return f"Error executing query: {str(e)}"
 
+    def stream_query_with_column_names(self, sql_query: str, batch_size: int = DEFAULT_BATCH_SIZE) -> QueryResultStream:
+        """Execute a SQL query and return its result as a stream of row batches."""
+        if not self.db:
+            raise ValueError(
+                "DataNeuron is not initialized. Call initialize() first.")
+
+        sql_query, params = self._bind_client_filter(sql_query)
+        return self.db.stream_query_with_column_names(sql_query, batch_size, **self._query_params(params))
+
     def client_filtered_query(self, sql_query: str) -> str:
         if self.current_client_id:
             return self._apply_client_filter(sql_query)
@@ -258,17 +424,20 @@ class DataNeuron:
         return formatted_history
 
     def set_context(self, context):
+        context_loader = None
         if isinstance(context, str):
             context_loader = ContextLoader(context)
             self.context = context_loader.load()
         else:
             self.context = context
 
-        if self.query_refiner:
+        if self.query_refiner and not self._shared_refiner:
             self.query_refiner.update_context(self.context)
         else:
+            # Pooled handles switch to their own refiner instead of updating the shared one
             self.query_refiner = QueryRefiner(
                 self.context, self.db, context_loader)
+            self._shared_refiner = False
 
     def set_chat_history(self, messages: List[Dict[str, str]]):
         self.chat_history = [
@@ -277,6 +446,161 @@ class DataNeuron:
             if msg["role"] in ["user", "assistant"]
         ]
 
+    def _prompt_context(self, question: str) -> Dict:
+        """The context to build prompts from, pruned to the relevant tables when max_prompt_tables is set."""
+        if not self.max_prompt_tables or not self.query_refiner:
+            return self.context
+        return self.query_refiner.prune_context(question, self.max_prompt_tables)
+
+    def _chat_questions(self) -> str:
+        """The user messages of the chat, so follow-up questions keep the tables of earlier ones."""
+        return "\n".join(msg["content"] for msg in self.chat_history if msg["role"] == "user")
+
+    def _refine(self, question: str, formatted_history: str = "", context: Optional[Dict] = None) -> Tuple[Optional[str], Any, List[Dict], List[Dict], Optional[str]]:
+        """Refine the question; with combined_prompt the LLM response carrying the SQL is returned too."""
+        if self.combined_prompt:
+            return self.query_refiner.refine_and_generate_sql(
+                question, formatted_history, self.current_client_id, context)
+        refined_query, changes, refined_entities, invalid_entities = self.query_refiner.refine_query(
+            question, formatted_history, self.current_client_id, context)
+        return refined_query, changes, refined_entities, invalid_entities, None
+
+    def _start_speculation(self, question: str, context: Optional[Dict] = None,
+                           follow_up: bool = False) -> Optional[Future]:
+        """Start generating SQL for the raw question while it is being refined.
+
+        Follow-up chat messages are not speculated on, since the raw message
+        means nothing without the conversation before it.
+        """
+        if not self.speculative_sql or self.combined_prompt or follow_up:
+            return None
+        if not _speculation_slots.acquire(blocking=False):
+            return None
+        prompt = sql_query_prompt(question, context or self.context, self.db.db_type)
+        try:
+            speculation = _get_speculation_executor().submit(call_neuron_api, prompt, use_cache=True)
+        except Exception:
+            _speculation_slots.release()
+            raise
+        speculation.add_done_callback(lambda future: _speculation_slots.release())
+        return speculation
+
+    def _discard_speculation(self, speculation: Optional[Future]):
+        if speculation is not None:
+            speculation.cancel()
+            speculation_stats.record(False)
+
+    def _generate_sql(self, refined_query: str, speculation: Optional[Future], changes, refined_entities,
+                      combined_response: Optional[str] = None,
+                      context: Optional[Dict] = None) -> Tuple[str, Optional[str], str, Dict[str, List[str]], Any]:
+        """Return the LLM response, SQL, explanation, references and, when already run, the execution result.
+
+        A combined refinement response already holds the SQL. A speculative
+        response for the raw question is used when refinement changed nothing,
+        since the refined prompt would be the same question.
+        """
+        if combined_response:
+            sql_query, explanation, references = self._extract_sql_explanation_and_references(
+                combined_response)
+            if sql_query:
+                return combined_response, sql_query, explanation, references, None
+
+        if speculation is not None:
+            if not changes and not refined_entities:
+                try:
+                    llm_response = speculation.result()
+                except Exception as e:
+                    llm_response = None
+                    if self.log:
+                        print_warning(f"Speculative SQL generation failed: {str(e)}")
+                if llm_response:
+                    speculation_stats.record(True)
+                    if self.log:
+                        print_info(
+                            f"Using speculative SQL generation (hit ratio {speculation_stats.stats()['hit_ratio']:.0%})")
+                    sql_query, explanation, references = self._extract_sql_explanation_and_references(
+                        llm_response)
+                    return llm_response, sql_query, explanation, references, None
+            self._discard_speculation(speculation)
+
+        prompt = sql_query_prompt(refined_query, context or self.context, self.db.db_type)
+        if self.stream_sql:
+            return self._generate_and_execute(prompt)
+        llm_response = call_neuron_api(prompt, use_cache=True)
+        sql_query, explanation, references = self._extract_sql_explanation_and_references(
+            llm_response)
+        return llm_response, sql_query, explanation, references, None
+
+    def _generate_and_execute(self, prompt: str) -> Tuple[str, Optional[str], str, Dict[str, List[str]], Any]:
+        """Stream the LLM response for prompt and execute its SQL as soon as the </sql> tag arrives.
+
+        Returns the full response, the client-filtered SQL, explanation,
+        references and the execution result (None when no SQL was generated).
+        """
+        chunks = []
+        sql_query = None
+        execution = None
+        error = None
+        for event, content in self._stream_response_events(stream_neuron_api(prompt, use_cache=True)):
+            if event == 'token':
+                chunks.append(content)
+            elif event == 'failure':
+                error = content
+            elif event == 'sql':
+                execution = self.execute_query_with_column_names(
+                    content, max_rows=self.max_result_rows)
+                sql_query = self._apply_client_filter(content)
+
+        if error is not None and not sql_query:
+            raise error
+
+        llm_response = "".join(chunks)
+        _, explanation, references = self._extract_sql_explanation_and_references(
+            llm_response)
+        return llm_response, sql_query, explanation, references, execution
+
+    def _stream_response_events(self, chunks: Iterator[str]) -> Iterator[Tuple[str, Any]]:
+        """Read LLM chunks on a background thread and yield ('token', chunk) and (tag, content) events.
+
+        The first SQL is yielded as soon as its </sql> tag arrives, so the
+        caller can execute it while the rest of the response keeps streaming.
+        A failure while reading is yielded as ('failure', exception) and ends
+        the events.
+        """
+        events = Queue()
+
+        def consume():
+            state = {'buffer': ''}
+            sql_found = False
+            try:
+                for chunk in chunks:
+                    events.put(('token', chunk))
+                    for tag, content in parse_simplified_xml(chunk, state):
+                        if tag == 'sql':
+                            if sql_found or not content:
+                                continue
+                            sql_found = True
+                        events.put((tag, content))
+            except Exception as e:
+                events.put(('failure', e))
+            finally:
+                # Ends the events when the response is complete
+                events.put(None)
+
+        threading.Thread(target=consume, daemon=True).start()
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield event
+
+    def _record_answer(self, sql_query: str, result: List[Tuple]):
+        """Add the answer to the chat history, which already holds the question, keeping the last MAX_CHAT_HISTORY exchanges."""
+        response = f"Based on your question, I've generated the following SQL query: {sql_query}\n\nHere's a sample of the results: {str(result[:MAX_RESULT_RECORDS])}"
+        self.chat_history.append({"role": "assistant", "content": response})
+        if len(self.chat_history) > MAX_CHAT_HISTORY * 2:
+            self.chat_history = self.chat_history[-MAX_CHAT_HISTORY * 2:]
+
     def _extract_sql_explanation_and_references(self, llm_response: str) -> Tuple[Optional[str], str, Dict[str, List[str]]]:
         sql_start = llm_response.find('<sql>')
         sql_end = llm_response.find('</sql>')
@@ -332,3 +656,12 @@ class DataNeuron:
         if self.current_client_id and self.filter:
             return self.filter.apply_client_filter(sql_query, self.current_client_id)
         return sql_query
+
+    def _bind_client_filter(self, sql_query: str) -> Tuple[str, Any]:
+        """Client-filter sql_query for execution; returns the query and its bind params, if any."""
+        if self.bind_filter_params and self.current_client_id and self.filter:
+            return self.filter.apply_client_filter_with_params(sql_query, self.current_client_id)
+        return self._apply_client_filter(sql_query), None
+
+    def _query_params(self, params: Any) -> Dict[str, Any]:
+        return {'params': params} if params is not None else {}
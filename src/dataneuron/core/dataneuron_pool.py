@@ -0,0 +1,178 @@
+import os
+import time
+import hashlib
+import threading
+import weakref
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from .data_neuron import DataNeuron, DEFAULT_MAX_RESULT_ROWS
+from ..db_operations.factory import CONFIG_PATH, DatabaseFactory
+
+
+class DataNeuronState(NamedTuple):
+    """Pre-initialized state shared by every request on the same context."""
+    context_name: Optional[str]
+    fingerprint: str
+    db: Any
+    context: Dict
+    query_refiner: Any
+    client_tables: Optional[Dict[str, str]]
+    schemas: List[str]
+    table_resolver: Any = None
+
+
+class DataNeuronPool:
+    """Process-wide registry of initialized DataNeuron state, keyed by context name and config fingerprint.
+
+    Loading database.yaml and parsing every context YAML happens once per
+    fingerprint. Each call to acquire() returns a fresh DataNeuron handle that
+    shares that state but keeps its own client_id and chat history.
+
+    The context files are checked for changes at most once every
+    check_interval seconds. A state replaced after a change stays open until
+    the last handle acquired on it is garbage collected. With read_only, SQLite
+    databases are opened read-only unless the database config sets read_only.
+    """
+
+    def __init__(self, db_config: Union[str, Dict] = CONFIG_PATH, context_root: str = 'context',
+                 check_interval: float = 2.0, read_only: bool = False):
+        self.db_config = db_config
+        self.read_only = read_only
+        self.context_root = context_root
+        self.check_interval = check_interval
+        self._states: Dict[Tuple[Optional[str], str], DataNeuronState] = {}
+        # context name -> (monotonic time of the last fingerprint check, key it found)
+        self._checked: Dict[Optional[str], Tuple[float, Tuple[Optional[str], str]]] = {}
+        # Live handles per state key, and replaced states waiting for their handles
+        self._handle_counts: Dict[Tuple[Optional[str], str], int] = {}
+        self._retired: Dict[Tuple[Optional[str], str], DataNeuronState] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, context_name: Optional[str] = None, log: bool = False, max_result_rows: Optional[int] = DEFAULT_MAX_RESULT_ROWS,
+                stream_sql: bool = False, speculative_sql: bool = False, combined_prompt: bool = False,
+                max_prompt_tables: Optional[int] = None, filter_engine: str = 'legacy',
+                bind_filter_params: bool = False) -> DataNeuron:
+        """Return a request-scoped DataNeuron backed by the shared state for context_name."""
+        state = self.get_state(context_name, track_handle=True)
+        dataneuron = DataNeuron.from_shared_state(state, log=log, max_result_rows=max_result_rows,
+                                                  stream_sql=stream_sql, speculative_sql=speculative_sql,
+                                                  combined_prompt=combined_prompt, max_prompt_tables=max_prompt_tables,
+                                                  filter_engine=filter_engine, bind_filter_params=bind_filter_params)
+        weakref.finalize(dataneuron, self._release_handle, (state.context_name, state.fingerprint))
+        return dataneuron
+
+    def get_state(self, context_name: Optional[str] = None, track_handle: bool = False) -> DataNeuronState:
+        """The current state for context_name; track_handle counts a handle on it until _release_handle."""
+        key = self._current_key(context_name)
+        stale_states = []
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._build_state(context_name, key[1])
+                # Replace states built from older versions of the same context
+                for stale_key in [k for k in self._states if k[0] == context_name]:
+                    stale_states.extend(self._retire(stale_key, self._states.pop(stale_key)))
+                self._states[key] = state
+            if track_handle:
+                self._handle_counts[key] = self._handle_counts.get(key, 0) + 1
+        self._close_states(stale_states)
+        return state
+
+    def _current_key(self, context_name: Optional[str]) -> Tuple[Optional[str], str]:
+        """The state key for context_name, fingerprinting its files at most once per check_interval."""
+        now = time.monotonic()
+        checked = self._checked.get(context_name)
+        if checked is not None and now - checked[0] < self.check_interval:
+            return checked[1]
+        key = (context_name, self.fingerprint(context_name))
+        self._checked[context_name] = (now, key)
+        return key
+
+    def _retire(self, key: Tuple[Optional[str], str], state: DataNeuronState) -> List[DataNeuronState]:
+        """States that can be closed now; states that handles still use wait for _release_handle. Holds the lock."""
+        if self._handle_counts.get(key):
+            self._retired[key] = state
+            return []
+        return [state]
+
+    def _release_handle(self, key: Tuple[Optional[str], str]):
+        state = None
+        with self._lock:
+            count = self._handle_counts.get(key, 0) - 1
+            if count > 0:
+                self._handle_counts[key] = count
+            else:
+                self._handle_counts.pop(key, None)
+                state = self._retired.pop(key, None)
+        if state is not None:
+            self._close_states([state])
+
+    def warm(self, context_names: List[Optional[str]]):
+        """Initialize the given contexts ahead of the first request."""
+        for context_name in context_names:
+            self.get_state(context_name)
+
+    def clear(self):
+        with self._lock:
+            states = []
+            for key, state in self._states.items():
+                states.extend(self._retire(key, state))
+            self._states = {}
+            self._checked = {}
+        self._close_states(states)
+
+    def _close_states(self, states: List[DataNeuronState]):
+        """Release the connections held by states that were replaced and have no handles left."""
+        for state in states:
+            if state.db is not None:
+                state.db.close()
+
+    def fingerprint(self, context_name: Optional[str] = None) -> str:
+        """Hash the size and mtime of the database config and every file of the context."""
+        digest = hashlib.sha1()
+        if isinstance(self.db_config, str):
+            digest.update(self._stat_signature(self.db_config).encode())
+        else:
+            digest.update(repr(sorted(self.db_config.items())).encode())
+
+        if context_name:
+            context_dir = os.path.join(self.context_root, context_name)
+            for root, dirs, files in os.walk(context_dir):
+                dirs.sort()
+                for filename in sorted(files):
+                    path = os.path.join(root, filename)
+                    digest.update(self._stat_signature(path).encode())
+        return digest.hexdigest()
+
+    def _stat_signature(self, path: str) -> str:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return f"{path}:missing;"
+        return f"{path}:{stat.st_size}:{stat.st_mtime_ns};"
+
+    def _build_state(self, context_name: Optional[str], fingerprint: str) -> DataNeuronState:
+        db_config = self.db_config
+        if self.read_only:
+            db_config = dict(DatabaseFactory.load_config() if isinstance(db_config, str) else db_config)
+            db_config.setdefault('read_only', True)
+        dataneuron = DataNeuron(db_config=db_config, context=context_name)
+        dataneuron.initialize()
+
+        client_tables = None
+        schemas = ["main"]
+        table_resolver = None
+        if dataneuron.filter is not None:
+            client_tables = dataneuron.filter.client_tables
+            schemas = dataneuron.filter.schemas
+            table_resolver = dataneuron.filter.resolver
+
+        return DataNeuronState(
+            context_name=context_name,
+            fingerprint=fingerprint,
+            db=dataneuron.db,
+            context=dataneuron.context,
+            query_refiner=dataneuron.query_refiner,
+            client_tables=client_tables,
+            schemas=schemas,
+            table_resolver=table_resolver
+        )
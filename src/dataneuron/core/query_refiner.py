@@ -1,21 +1,49 @@
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
+import re
 import json
+from concurrent.futures import ThreadPoolExecutor
 from ..api.main import call_neuron_api
 from ..prompts.query_refinement_prompt import query_refinement_prompt
+from ..prompts.combined_query_prompt import combined_query_prompt
+from ..prompts.prompt_compiler import context_prompt
 from ..db_operations.database_helpers import DatabaseHelper
+from ..utils.cache import TTLCache
+from .schema_retriever import SchemaRetriever
+from .table_resolver import TableResolver
+
+# Upper bound on concurrent lookups when the batched query cannot be used
+ENTITY_LOOKUP_WORKERS = 4
+ENTITY_CACHE_SIZE = 4096
+ENTITY_CACHE_TTL = 600
 
 
 class QueryRefiner:
-    def __init__(self, context: Dict, db, context_loader):
+    def __init__(self, context: Dict, db, context_loader,
+                 entity_cache_size: int = ENTITY_CACHE_SIZE, entity_cache_ttl: Optional[float] = ENTITY_CACHE_TTL):
         self.context = context
         self.db = db
         self.context_loader = context_loader
+        self.value_index = context_loader.load_value_index() if context_loader else None
+        # Database entity lookups, keyed by context, table, column, value and client scope
+        self.entity_cache = TTLCache(
+            max_size=entity_cache_size, ttl=entity_cache_ttl)
+        self.schema_retriever = None
+        self.table_resolver = None
 
     def update_context(self, new_context: Dict):
         self.context = new_context
+        self.entity_cache.clear()
+        self.schema_retriever = None
+        self.table_resolver = None
+
+    def prune_context(self, question: str, max_tables: int) -> Dict:
+        """The context reduced to the max_tables tables most relevant to the question, plus related tables."""
+        if self.schema_retriever is None:
+            self.schema_retriever = SchemaRetriever(self.context)
+        return self.schema_retriever.prune_context(question, max_tables)
 
-    def get_sample_data(self) -> str:
-        sample_data = self.context.get('sample_data', {})
+    def get_sample_data(self, context: Optional[Dict] = None) -> str:
+        sample_data = (context or self.context).get('sample_data', {})
         sample_data_str = "Sample Data:\n"
         for table_name, data in sample_data.items():
             sample_data_str += f"Table: {table_name}\n"
@@ -23,13 +51,16 @@ class QueryRefiner:
                 sample_data_str += f"  {row}\n"
         return sample_data_str
 
-    def refine_query(self, user_query: str, formatted_history: str = "") -> Tuple[str, List[str], List[Dict], List[Dict]]:
-        formatted_context = self.context.get('formatted_context', '')
-        sample_data = self.get_sample_data()
+    def refine_query(self, user_query: str, formatted_history: str = "", client_id=None,
+                     context: Optional[Dict] = None) -> Tuple[str, List[str], List[Dict], List[Dict]]:
+        context = context or self.context
+        formatted_context = context_prompt(context)
+        sample_data = self.get_sample_data(context)
 
         prompt = query_refinement_prompt(
             formatted_context, sample_data, user_query, formatted_history)
-        response = call_neuron_api(prompt)
+        # Follow-ups depend on the conversation, so only standalone questions are cached
+        response = call_neuron_api(prompt, use_cache=not formatted_history)
 
         try:
             parsed_response = json.loads(response)
@@ -48,7 +79,7 @@ class QueryRefiner:
 
         if entities:
             is_valid, refined_entities, invalid_entities = self.validate_and_refine_entities(
-                entities)
+                entities, client_id)
             if refined_entities:
                 refined_query = self.further_refine_query(
                     refined_query, refined_entities)
@@ -56,19 +87,61 @@ class QueryRefiner:
             is_valid, refined_entities, invalid_entities = True, [], []
         return refined_query, changes, refined_entities, invalid_entities
 
-    def validate_and_refine_entities(self, entities: List[Dict]) -> Tuple[bool, List[Dict], List[Dict]]:
+    def refine_and_generate_sql(self, user_query: str, formatted_history: str = "", client_id=None,
+                                context: Optional[Dict] = None) -> Tuple[str, List[str], List[Dict], List[Dict], Optional[str]]:
+        """Refine the question and generate its SQL with one LLM call.
+
+        Returns the same values as refine_query plus the LLM response holding
+        the SQL. The response is None when an entity value did not match the
+        database exactly, so the SQL has to be generated again from the
+        refined question.
+        """
+        context = context or self.context
+        prompt = combined_query_prompt(
+            user_query, context, self.db.db_type, self.get_sample_data(context), formatted_history)
+        response = call_neuron_api(prompt, use_cache=not formatted_history)
+
+        try:
+            can_be_answered = self._extract_tag(
+                response, 'can_be_answered').lower() == 'true'
+            refined_query = self._extract_tag(response, 'refined_query')
+            changes = json.loads(self._extract_tag(response, 'changes') or '[]')
+            entities = json.loads(self._extract_tag(response, 'entities') or '[]')
+        except (json.JSONDecodeError, AttributeError):
+            print("Error: Invalid response from LLM.")
+            return None, [], [], [], None
+
+        if not can_be_answered:
+            exp = self._extract_tag(response, 'explanation')
+            print("Explantion", exp)
+            return None, exp, [], [], None
+
+        if not entities:
+            return refined_query, changes, [], [], response
+
+        is_valid, refined_entities, invalid_entities = self.validate_and_refine_entities(
+            entities, client_id)
+        if refined_entities:
+            refined_query = self.further_refine_query(
+                refined_query, refined_entities)
+        exact_matches = is_valid and all(
+            [str(match) for match in entity['matches']] == [
+                str(entity['original_value'])]
+            for entity in refined_entities
+        )
+        return refined_query, changes, refined_entities, invalid_entities, response if exact_matches else None
+
+    def _extract_tag(self, response: str, tag: str) -> Optional[str]:
+        match = re.search(rf'<\s*{tag}\s*>(.*?)<\s*/\s*{tag}\s*>',
+                          response, re.DOTALL | re.IGNORECASE)
+        return match.group(1).strip() if match else None
+
+    def validate_and_refine_entities(self, entities: List[Dict], client_id=None) -> Tuple[bool, List[Dict], List[Dict]]:
         refined_entities = []
         invalid_entities = []
         db_helper = DatabaseHelper(self.db.db_type, self.db)
-        for entity in entities:
-            query = db_helper.top_few_records(
-                entity['column'],
-                entity['table'],
-                entity['potential_value']
-            )
-            results = self.db.execute_query(query)
-            if results:
-                matches = [row[0] for row in results]
+        for entity, matches in zip(entities, self._lookup_entities(db_helper, entities, client_id)):
+            if matches:
                 refined_entities.append({
                     'table': entity['table'],
                     'column': entity['column'],
@@ -81,6 +154,76 @@ class QueryRefiner:
         is_valid = len(invalid_entities) == 0
         return is_valid, refined_entities, invalid_entities
 
+    def _lookup_entities(self, db_helper: DatabaseHelper, entities: List[Dict], client_id=None) -> List[List]:
+        """Return the matching values of every entity.
+
+        Entities on columns in the value index are matched locally, the rest
+        come from the entity cache or are looked up in one UNION ALL query
+        when possible. A value the index does not know is looked up too, since
+        it may have been added after the index was built.
+        """
+        matches = [None] * len(entities)
+        if self.value_index:
+            for i, entity in enumerate(entities):
+                matches[i] = self.value_index.search(
+                    entity['table'], entity['column'], entity['potential_value']) or None
+
+        cache_keys = {}
+        for i, entity in enumerate(entities):
+            if matches[i] is None:
+                cache_keys[i] = self._entity_cache_key(entity, client_id)
+                cached = self.entity_cache.get(cache_keys[i])
+                if cached is not None:
+                    matches[i] = list(cached)
+
+        pending = [i for i, found in enumerate(matches) if found is None]
+        if pending:
+            looked_up = self._query_entities(
+                db_helper, [entities[i] for i in pending])
+            for i, found in zip(pending, looked_up):
+                matches[i] = found
+                self.entity_cache.set(cache_keys[i], tuple(found))
+        return matches
+
+    def _entity_cache_key(self, entity: Dict, client_id=None) -> Tuple:
+        if self.table_resolver is None:
+            self.table_resolver = TableResolver.from_context(self.context)
+        client_table = self.table_resolver.client_table(entity['table'])
+        resolved = client_table or self.table_resolver.resolve(entity['table'])
+        table = (resolved or entity['table']).lower()
+        # Only tables known to hold no client rows are shared; unknown tables are scoped to the client
+        client_scope = None if resolved and not client_table else client_id
+        context_name = self.context_loader.context_name if self.context_loader else None
+        return (context_name, table, entity['column'].lower(),
+                str(entity['potential_value']).strip().lower(), client_scope)
+
+    def _query_entities(self, db_helper: DatabaseHelper, entities: List[Dict]) -> List[List]:
+        if len(entities) > 1:
+            try:
+                rows, _ = self.db.execute_query_with_column_names(
+                    db_helper.batched_top_few_records(entities))
+                matches = [[] for _ in entities]
+                for entity_index, value in rows:
+                    matches[int(entity_index)].append(value)
+                return matches
+            except Exception as e:
+                print(
+                    f"Batched entity lookup failed, looking up entities separately: {str(e)}")
+
+        def lookup(entity):
+            query = db_helper.top_few_records(
+                entity['column'],
+                entity['table'],
+                entity['potential_value']
+            )
+            results, _ = self.db.execute_query_with_column_names(query)
+            return [row[0] for row in results or []]
+
+        if len(entities) == 1:
+            return [lookup(entities[0])]
+        with ThreadPoolExecutor(max_workers=min(ENTITY_LOOKUP_WORKERS, len(entities))) as executor:
+            return list(executor.map(lookup, entities))
+
     def further_refine_query(self, query: str, refined_entities: List[Dict]) -> str:
         for entity in refined_entities:
             matches_len = len(entity['matches'])
@@ -0,0 +1,185 @@
+import math
+import re
+import yaml
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from ..prompts.prompt_compiler import compile_context
+from ..utils.cache import TTLCache
+
+TOKEN_PATTERN = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+# Table and column names count more than descriptions
+NAME_WEIGHT = 3
+TABLE_TEXT_KEYS = ('description', 'alias', 'synonyms')
+COLUMN_TEXT_KEYS = ('description', 'alias', 'synonyms')
+# Contexts up to this many tables are sent whole. A pruned context differs per
+# question, so it cannot reuse the cached prompt prefix; pruning only pays off
+# once the schema is too large to send on every request.
+PRUNE_MIN_TABLES = 50
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words, breaking snake_case and camelCase and dropping plural s."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(str(text)):
+        token = token.lower()
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _flatten_text(value) -> str:
+    if isinstance(value, dict):
+        return ' '.join(_flatten_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_flatten_text(v) for v in value)
+    return '' if value is None else str(value)
+
+
+class SchemaRetriever:
+    """BM25 index over the tables of a context, used to keep prompts small for large schemas.
+
+    Each table is scored on its names, descriptions, aliases and synonyms and
+    those of its columns. The best tables are then expanded with the tables
+    they are related to, so join paths stay in the prompt.
+    """
+
+    def __init__(self, context: Dict, k1: float = 1.5, b: float = 0.75, min_tables: Optional[int] = None):
+        self.context = context
+        self.k1 = k1
+        self.b = b
+        self.min_tables = PRUNE_MIN_TABLES if min_tables is None else min_tables
+        self.tables = list(context.get('tables', {}))
+        self._term_counts = [Counter(self._table_tokens(name, data))
+                             for name, data in context.get('tables', {}).items()]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0
+        document_frequency = Counter(
+            term for counts in self._term_counts for term in counts)
+        self._idf = {
+            term: math.log(1 + (len(self.tables) - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+        self.relationship_entries = self._relationship_entries(
+            context.get('relationships'))
+        self._entry_tables = [self._mentioned_tables(entry)
+                              for entry in self.relationship_entries]
+        self._pruned_contexts = TTLCache(max_size=256)
+
+    def _table_tokens(self, name: str, data: Dict) -> List[str]:
+        data = data or {}
+        names = [name, data.get('table_name', ''), data.get('name', '')]
+        tokens = tokenize(' '.join(str(n) for n in names)) * NAME_WEIGHT
+        tokens += tokenize(' '.join(_flatten_text(data.get(key))
+                           for key in TABLE_TEXT_KEYS))
+        for column in data.get('columns') or []:
+            if not isinstance(column, dict):
+                continue
+            tokens += tokenize(column.get('name', '')) * NAME_WEIGHT
+            tokens += tokenize(' '.join(_flatten_text(column.get(key))
+                               for key in COLUMN_TEXT_KEYS))
+        return tokens
+
+    @staticmethod
+    def _relationship_entries(relationships) -> List:
+        if isinstance(relationships, dict) and len(relationships) == 1:
+            relationships = next(iter(relationships.values()))
+        if isinstance(relationships, list):
+            return relationships
+        return []
+
+    def _mentioned_tables(self, entry) -> Set[str]:
+        text = yaml.dump(entry) if not isinstance(entry, str) else entry
+        words = set(re.findall(r'[\w.]+', text.lower()))
+        mentioned = set()
+        for table in self.tables:
+            short_name = table.lower().split('.')[-1]
+            if table.lower() in words or short_name in words or \
+                    any(word.startswith(short_name + '.') for word in words):
+                mentioned.add(table)
+        return mentioned
+
+    def rank(self, question: str) -> List[Tuple[str, float]]:
+        """Return (table, score) for the tables matching the question, best first."""
+        terms = set(tokenize(question))
+        scores = []
+        for table, counts, length in zip(self.tables, self._term_counts, self._lengths):
+            score = 0.0
+            for term in terms:
+                frequency = counts.get(term)
+                if not frequency:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b *
+                                  length / self._average_length)
+                score += self._idf[term] * frequency * \
+                    (self.k1 + 1) / (frequency + norm)
+            if score > 0:
+                scores.append((table, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores
+
+    def related_tables(self, table: str) -> Set[str]:
+        related = set()
+        for mentioned in self._entry_tables:
+            if table in mentioned:
+                related |= mentioned
+        related.discard(table)
+        return related
+
+    def retrieve(self, question: str, top_k: int) -> List[str]:
+        """The top_k tables for the question plus the tables related to them, at most 2 * top_k.
+
+        Returns every table when nothing in the question matches.
+        """
+        ranked = [table for table, _ in self.rank(question)]
+        if not ranked:
+            return list(self.tables)
+        selected = ranked[:top_k]
+        limit = 2 * top_k
+        for table in list(selected):
+            for related in sorted(self.related_tables(table), key=self.tables.index):
+                if len(selected) >= limit:
+                    return selected
+                if related not in selected:
+                    selected.append(related)
+        return selected
+
+    def prune_context(self, question: str, top_k: int) -> Dict:
+        """A compiled copy of the context holding only the tables relevant to the question.
+
+        Contexts of at most min_tables tables are returned whole, so their
+        prompt prefix stays the same across questions and can be cached.
+        """
+        if len(self.tables) <= max(top_k, self.min_tables):
+            return self.context
+        selected = self.retrieve(question, top_k)
+        if len(selected) == len(self.tables):
+            return self.context
+
+        key = frozenset(selected)
+        pruned = self._pruned_contexts.get(key)
+        if pruned is None:
+            pruned = self._build_pruned_context(key)
+            self._pruned_contexts.set(key, pruned)
+        return pruned
+
+    def _build_pruned_context(self, selected: frozenset) -> Dict:
+        pruned = {key: value for key, value in self.context.items()
+                  if key not in ('tables', 'relationships', 'sample_data', 'formatted_context')}
+        pruned['tables'] = {name: data for name, data in self.context['tables'].items()
+                            if name in selected}
+        entries = [entry for entry, mentioned in zip(self.relationship_entries, self._entry_tables)
+                   if mentioned and mentioned <= selected]
+        relationships = self.context.get('relationships')
+        if isinstance(relationships, dict) and len(relationships) == 1:
+            pruned['relationships'] = {next(iter(relationships)): entries}
+        elif isinstance(relationships, list):
+            pruned['relationships'] = entries
+        else:
+            pruned['relationships'] = relationships or {}
+        pruned['global_definitions'] = self.context.get('global_definitions') or {}
+        if 'sample_data' in self.context:
+            pruned['sample_data'] = {name: rows for name, rows in (self.context['sample_data'] or {}).items()
+                                     if name in selected}
+        compile_context(pruned)
+        return pruned
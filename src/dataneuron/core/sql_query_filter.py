@@ -2,20 +2,97 @@ import re
 import sqlparse
 from sqlparse.sql import IdentifierList, Identifier, Token, TokenList, Parenthesis, Where, Comparison
 from sqlparse.tokens import Keyword, DML, Name, Whitespace, Punctuation
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from .nlp_helpers.cte_handler import handle_cte_query
 from .nlp_helpers.is_cte import is_cte_query
+from .sql_query_filters.ast_filter import ASTClientFilter
+from .sql_query_filters.client_filter import CLIENT_ID_PARAM
+from .table_resolver import TableResolver, split_table_name
+from ..db_operations.database_helpers import DatabaseHelper
+from ..utils.cache import TTLCache
+
+# Stands in for the client id when a query is compiled into a filter template
+CLIENT_ID_SENTINEL = 9182736450918273645
+TEMPLATE_CACHE_SIZE = 1024
+FILTER_ENGINES = ('legacy', 'ast')
 
 
 class SQLQueryFilter:
-    def __init__(self, client_tables: Dict[str, str], schemas: List[str] = ['main'], case_sensitive: bool = False):
+    # Compiled filter templates shared by every instance, keyed by query and client table config
+    _template_cache = TTLCache(max_size=TEMPLATE_CACHE_SIZE)
+
+    def __init__(self, client_tables: Dict[str, str], schemas: List[str] = ['main'], case_sensitive: bool = False,
+                 engine: str = 'legacy', db_type: Optional[str] = None, resolver: Optional[TableResolver] = None):
+        if engine not in FILTER_ENGINES:
+            raise ValueError(
+                f"Unknown filter engine: {engine}. Expected one of {', '.join(FILTER_ENGINES)}")
         self.client_tables = client_tables
         self.schemas = schemas
         self.case_sensitive = case_sensitive
+        self.engine = engine
+        # Picks identifier quoting, PREWHERE on ClickHouse (AST engine) and the placeholder style of apply_client_filter_with_params
+        self.db_type = db_type
+        self._helper = DatabaseHelper(db_type, None)
+        # Shared by every filter on the same context; built here when not given
+        self.resolver = resolver or TableResolver(client_tables, schemas, case_sensitive)
         self.filtered_tables = set()
         self._is_cte_query = is_cte_query
+        self._ast_filter = ASTClientFilter(
+            client_tables, schemas, case_sensitive, db_type, self.resolver) if engine == 'ast' else None
+        self._config = (self.resolver.key, engine, db_type)
 
     def apply_client_filter(self, sql_query: str, client_id: int) -> str:
+        """Filter sql_query to the rows of client_id.
+
+        The query is filtered once with a sentinel client id and cached as a
+        template, so later calls only substitute the id into it. Non-numeric
+        ids go in as quoted string literals.
+        """
+        if str(CLIENT_ID_SENTINEL) in sql_query:
+            return self._filter_query(sql_query, client_id)
+
+        return self._helper.sql_literal(client_id).join(self._template(sql_query))
+
+    def apply_client_filter_with_params(self, sql_query: str, client_id: Any) -> Tuple[str, Any]:
+        """Filter sql_query to the rows of client_id, with the id as a bind parameter.
+
+        Returns the query with a placeholder in the style of db_type wherever
+        the id goes, and the params to execute it with (None when nothing was
+        filtered). The query text is the same for every client, so the
+        database can reuse its plan. MySQL queries keep the literal id.
+        """
+        if not self._helper.supports_bind_parameters() or str(CLIENT_ID_SENTINEL) in sql_query:
+            return self.apply_client_filter(sql_query, client_id), None
+
+        parts = self._template(sql_query)
+        if len(parts) == 1:
+            return parts[0], None
+        placeholder = self._helper.parameter_placeholder(CLIENT_ID_PARAM, client_id)
+        query = placeholder.join(self._helper.escape_parameter_text(part) for part in parts)
+        return query, self._helper.bind_parameters(CLIENT_ID_PARAM, client_id, len(parts) - 1)
+
+    def _template(self, sql_query: str) -> Tuple[str, ...]:
+        """The filtered query split around the client id, from the template cache."""
+        key = (sql_query.strip(), self._template_config())
+        template = self._template_cache.get(key)
+        if template is None:
+            filtered_query = self._filter_query(sql_query, CLIENT_ID_SENTINEL)
+            template = (tuple(filtered_query.split(str(CLIENT_ID_SENTINEL))),
+                        frozenset(self.filtered_tables))
+            self._template_cache.set(key, template)
+        parts, filtered_tables = template
+        self.filtered_tables = set(filtered_tables)
+        return parts
+
+    def _template_config(self):
+        return self._config
+
+    def _filter_query(self, sql_query: str, client_id: int) -> str:
+        if self._ast_filter is not None:
+            filtered_query = self._ast_filter.apply_client_filter(sql_query, client_id)
+            self.filtered_tables = set(self._ast_filter.filtered_tables)
+            return filtered_query
+
         self.filtered_tables = set()
         parsed = sqlparse.parse(sql_query)[0]
 
@@ -154,41 +231,36 @@ class SQLQueryFilter:
     def _parse_table_identifier(self, identifier):
         schema = None
         alias = None
-        name = self._strip_quotes(str(identifier))
+        name = str(identifier)
 
         if identifier.has_alias():
             alias = self._strip_quotes(identifier.get_alias())
-            name = self._strip_quotes(identifier.get_real_name())
+            name = identifier.get_real_name()
+            # sqlparse does not know ClickHouse's PREWHERE and reads it as an alias
+            if alias.upper() == 'PREWHERE':
+                alias = None
 
-        if '.' in name:
-            parts = name.split('.')
-            if len(parts) == 2:
-                schema, name = parts
-            name = f"{schema}.{name}" if schema else name
+        schema, name = split_table_name(name)
+        name = f"{schema}.{name}" if schema else name
 
         return {'name': name, 'schema': schema, 'alias': alias}
 
     def _find_matching_table(self, table_name: str, schema: Optional[str] = None) -> Optional[str]:
-        possible_names = [
-            f"{schema}.{table_name}" if schema else table_name,
-            table_name,
-        ] + [f"{s}.{table_name}" for s in self.schemas]
-
-        for name in possible_names:
-            if self._case_insensitive_get(self.client_tables, name) is not None:
-                return name
-        return None
+        return self.resolver.client_table(table_name, schema)
 
-    def _case_insensitive_get(self, dict_obj: Dict[str, str], key: str) -> Optional[str]:
-        if self.case_sensitive:
-            return dict_obj.get(key)
-        return next((v for k, v in dict_obj.items() if k.lower() == key.lower()), None)
+    def _table_reference(self, table_info: Dict[str, Optional[str]]) -> str:
+        """The quoted alias or table name that a client predicate qualifies its column with."""
+        if table_info['alias'] or not table_info['schema'] or self.db_type is None:
+            return self._quote_identifier(table_info['alias'] or table_info['name'])
+        # Dialect quoting applies to each part of a schema-qualified name
+        schema, name = split_table_name(table_info['name'])
+        return f"{self._quote_identifier(schema)}.{self._quote_identifier(name)}"
 
     def _strip_quotes(self, identifier: str) -> str:
         return identifier.strip('"').strip("'").strip('`')
 
     def _quote_identifier(self, identifier: str) -> str:
-        return f'"{identifier}"'
+        return self._helper.quote_identifier(identifier)
 
     def _inject_where_clause(self, parsed, where_clause):
 
@@ -281,15 +353,14 @@ class SQLQueryFilter:
 
             if matching_table and matching_table not in self.filtered_tables:
                 client_id_column = self.client_tables[matching_table]
-                table_reference = table_alias or table_name
                 filters.append(
-                    f'{self._quote_identifier(table_reference)}.{self._quote_identifier(client_id_column)} = {client_id}')
+                    f'{self._table_reference(table_info)}.{self._quote_identifier(client_id_column)} = {self._helper.sql_literal(client_id)}')
                 self.filtered_tables.add(matching_table)
 
         if filters:
             where_clause = " AND ".join(filters)
-            if 'WHERE' in main_query.upper():
-                where_parts = main_query.split('WHERE', 1)
+            if re.search(r'\bWHERE\b', main_query, re.IGNORECASE):
+                where_parts = re.split(r'\bWHERE\b', main_query, maxsplit=1, flags=re.IGNORECASE)
                 result = f"{where_parts[0]} WHERE {where_parts[1].strip()} AND {where_clause}"
             else:
                 result = f"{main_query} WHERE {where_clause}"
@@ -485,7 +556,7 @@ class SQLQueryFilter:
         matching_table = self._find_matching_table(table_name)
         if matching_table:
             client_id_column = self.client_tables[matching_table]
-            return f'{self._quote_identifier(table_name)}.{self._quote_identifier(client_id_column)} = {client_id}'
+            return f'{self._quote_identifier(table_name)}.{self._quote_identifier(client_id_column)} = {self._helper.sql_literal(client_id)}'
         return None
 
     def _extract_main_query(self, parsed):
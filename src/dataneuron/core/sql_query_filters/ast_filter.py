@@ -0,0 +1,211 @@
+import re
+import sqlparse
+from sqlparse.sql import Function, Identifier, IdentifierList, Parenthesis, Token, TokenList, Where
+from sqlparse.tokens import CTE, DML, Keyword, Name, Punctuation, Whitespace
+from typing import Dict, FrozenSet, List, Optional
+from ..table_resolver import TableResolver, unquote_identifier
+from ...db_operations.database_helpers import DatabaseHelper
+
+SET_OPERATIONS = ('UNION', 'UNION ALL', 'INTERSECT', 'INTERSECT ALL', 'EXCEPT', 'EXCEPT ALL', 'MINUS')
+# Keywords that end the FROM/WHERE part of a SELECT
+CLAUSE_KEYWORDS = ('GROUP BY', 'HAVING', 'WINDOW', 'QUALIFY', 'ORDER BY', 'LIMIT', 'OFFSET', 'FETCH')
+
+
+class ASTClientFilter:
+    """Client filter engine that walks a single sqlparse tree once and injects predicates in place.
+
+    Every SELECT scope (CTE bodies, derived tables, subqueries anywhere in
+    the query, set-operation branches) gets a predicate for each client table
+    it reads. References to CTEs are not filtered since their bodies are.
+    On ClickHouse, the predicate of a single-table scope goes in PREWHERE.
+    """
+
+    def __init__(self, client_tables: Dict[str, str], schemas: List[str] = ['main'], case_sensitive: bool = False,
+                 db_type: Optional[str] = None, resolver: Optional[TableResolver] = None):
+        self.client_tables = client_tables
+        self.schemas = schemas
+        self.case_sensitive = case_sensitive
+        self.db_type = db_type
+        self._helper = DatabaseHelper(db_type, None)
+        self.resolver = resolver or TableResolver(client_tables, schemas, case_sensitive)
+        self.filtered_tables = set()
+
+    def apply_client_filter(self, sql_query: str, client_id: int) -> str:
+        self.filtered_tables = set()
+        statement = sqlparse.parse(sql_query)[0]
+        self._filter_query(statement, frozenset(), client_id)
+        return str(statement)
+
+    def _normalize(self, name: str) -> str:
+        return name if self.case_sensitive else name.lower()
+
+    def _quote_identifier(self, identifier: str) -> str:
+        return self._helper.quote_identifier(identifier)
+
+    def _predicate(self, table_reference: str, column: str, client_id) -> str:
+        return f'{table_reference}.{self._quote_identifier(column)} = {self._helper.sql_literal(client_id)}'
+
+    def _filter_query(self, tlist: TokenList, ctes: FrozenSet[str], client_id):
+        """Filter a statement or parenthesized query: its CTEs, then each set-operation branch."""
+        tokens = tlist.tokens
+        start = 1 if isinstance(tlist, Parenthesis) else 0
+        index = start
+        while index < len(tokens):
+            token = tokens[index]
+            if token.ttype is CTE:
+                index, ctes = self._filter_ctes(tokens, index + 1, ctes, client_id)
+                start = index
+                break
+            if token.ttype is DML:
+                break
+            index += 1
+
+        end = len(tokens) - 1 if isinstance(tlist, Parenthesis) else len(tokens)
+        end = next((i for i in range(start, end) if tokens[i].match(Punctuation, ';')), end)
+        boundaries = [i for i in range(start, end)
+                      if tokens[i].ttype is Keyword and tokens[i].normalized in SET_OPERATIONS]
+        # Branches are filtered from the last one so earlier indexes stay valid
+        for branch_start, branch_end in reversed(list(zip([start] + [b + 1 for b in boundaries], boundaries + [end]))):
+            self._filter_select(tlist, branch_start, branch_end, ctes, client_id)
+
+    def _filter_ctes(self, tokens: List[Token], index: int, ctes: FrozenSet[str], client_id):
+        while index < len(tokens) and tokens[index].ttype is not DML:
+            token = tokens[index]
+            definitions = token.get_identifiers() if isinstance(token, IdentifierList) else [token]
+            for definition in definitions:
+                if not isinstance(definition, Identifier):
+                    continue
+                first = definition.token_first(skip_ws=True, skip_cm=True)
+                name = first.get_name() if isinstance(first, Function) else definition.get_real_name()
+                if name:
+                    # Added first so recursive CTEs see themselves
+                    ctes = ctes | {self._normalize(name)}
+                body = next((t for t in reversed(definition.tokens) if isinstance(t, Parenthesis)), None)
+                if body is not None:
+                    self._filter_query(body, ctes, client_id)
+            index += 1
+        return index, ctes
+
+    def _filter_select(self, tlist: TokenList, start: int, end: int, ctes: FrozenSet[str], client_id):
+        tokens = tlist.tokens
+        predicates = []
+        table_count = 0
+        where = None
+        where_index = None
+        insert_at = end
+        in_from = False
+        expect_table = False
+        for index in range(start, end):
+            token = tokens[index]
+            if token.is_whitespace or token.ttype is Punctuation:
+                continue
+            if isinstance(token, Where):
+                self._filter_nested(token, ctes, client_id)
+                where = (token, 1, len(token.tokens))
+                where_index = index
+                in_from = False
+                continue
+            if token.ttype in (Keyword, DML, CTE):
+                keyword = token.normalized
+                if keyword == 'FROM':
+                    in_from = expect_table = True
+                elif keyword.endswith('JOIN'):
+                    expect_table = True
+                elif keyword == 'WHERE':
+                    clause_end = next((i for i in range(index + 1, end)
+                                       if tokens[i].ttype is Keyword and tokens[i].normalized in CLAUSE_KEYWORDS), end)
+                    where = (tlist, index + 1, clause_end)
+                    where_index = index
+                    in_from = False
+                elif keyword in CLAUSE_KEYWORDS:
+                    in_from = False
+                    insert_at = min(insert_at, index)
+                else:
+                    expect_table = expect_table and keyword in ('LATERAL', 'ONLY')
+                continue
+
+            if in_from and expect_table:
+                references = token.get_identifiers() if isinstance(token, IdentifierList) else [token]
+                for reference in references:
+                    table_count += 1
+                    predicate = self._table_predicate(reference, ctes, client_id)
+                    if predicate:
+                        predicates.append(predicate)
+                expect_table = isinstance(token, IdentifierList)
+            else:
+                self._filter_nested(token, ctes, client_id)
+
+        if not predicates:
+            return
+        condition = " AND ".join(predicates)
+        if self._use_prewhere(tokens[start:end], table_count):
+            prewhere_at = where_index if where_index is not None else insert_at
+            while prewhere_at > start and tokens[prewhere_at - 1].is_whitespace:
+                prewhere_at -= 1
+            tokens[prewhere_at:prewhere_at] = [Token(Whitespace, ' '), Token(Keyword, 'PREWHERE'),
+                                               Token(Whitespace, ' '), Token(Name, condition)]
+        elif where is not None:
+            self._extend_condition(*where, condition)
+        else:
+            while insert_at > start and tokens[insert_at - 1].is_whitespace:
+                insert_at -= 1
+            tokens[insert_at:insert_at] = [Token(Whitespace, ' '), Token(Keyword, 'WHERE'),
+                                           Token(Whitespace, ' '), Token(Name, condition)]
+
+    def _use_prewhere(self, tokens: List[Token], table_count: int) -> bool:
+        """ClickHouse reads fewer granules with the tenant predicate in PREWHERE; joins keep it in WHERE."""
+        if self.db_type != 'clickhouse' or table_count != 1:
+            return False
+        return not any(re.search(r'\bPREWHERE\b', str(token), re.IGNORECASE) for token in tokens)
+
+    def _table_predicate(self, reference: Token, ctes: FrozenSet[str], client_id) -> Optional[str]:
+        """The client predicate for a FROM/JOIN item; derived tables and subqueries are filtered in place."""
+        if not isinstance(reference, Identifier) or isinstance(reference.token_first(skip_cm=True), (Parenthesis, Function)):
+            self._filter_nested(reference, ctes, client_id)
+            return None
+
+        name = reference.get_real_name()
+        schema = reference.get_parent_name()
+        # sqlparse keeps the brackets of MSSQL names
+        name = unquote_identifier(name) if name else name
+        schema = unquote_identifier(schema) if schema else schema
+        if not name or (schema is None and self._normalize(name) in ctes):
+            return None
+        client_table = self.resolver.client_table(name, schema)
+        if client_table is None:
+            return None
+
+        self.filtered_tables.add(client_table)
+        alias = reference.get_alias()
+        # sqlparse does not know ClickHouse's PREWHERE and reads it as an alias
+        if alias and alias.upper() == 'PREWHERE':
+            alias = None
+        if alias:
+            table_reference = self._quote_identifier(alias)
+        elif schema:
+            table_reference = f"{self._quote_identifier(schema)}.{self._quote_identifier(name)}"
+        else:
+            table_reference = self._quote_identifier(name)
+        return self._predicate(table_reference, self.client_tables[client_table], client_id)
+
+    def _filter_nested(self, token: Token, ctes: FrozenSet[str], client_id):
+        """Filter every query nested anywhere inside token."""
+        if not token.is_group:
+            return
+        if isinstance(token, Parenthesis) and any(t.ttype is DML or t.ttype is CTE for t in token.tokens):
+            self._filter_query(token, ctes, client_id)
+            return
+        for child in token.tokens:
+            self._filter_nested(child, ctes, client_id)
+
+    def _extend_condition(self, container: TokenList, start: int, end: int, condition: str):
+        """AND condition onto the WHERE condition in container.tokens[start:end]."""
+        tokens = container.tokens
+        while end > start and tokens[end - 1].is_whitespace:
+            end -= 1
+        existing = tokens[start:end]
+        has_or = any(t.ttype is Keyword and t.normalized == 'OR' for t in existing)
+        existing_text = "".join(str(t) for t in existing).strip()
+        if has_or:
+            existing_text = f"({existing_text})"
+        tokens[start:end] = [Token(Whitespace, ' '), Token(Name, f"{existing_text} AND {condition}")]
@@ -1,12 +1,22 @@
 from typing import Dict, Optional, List
 from .sql_parser import ClientFilterApplier
+from ..table_resolver import TableResolver
+from ...db_operations.database_helpers import DatabaseHelper
+
+CLIENT_ID_PARAM = 'client_id'
 
 
 class ClientFilterApplierImplementation(ClientFilterApplier):
-    def __init__(self, client_tables: Dict[str, str], schemas: List[str] = ['main'], case_sensitive: bool = False):
+    def __init__(self, client_tables: Dict[str, str], schemas: List[str] = ['main'], case_sensitive: bool = False,
+                 db_type: Optional[str] = None, bind_params: bool = False, resolver: Optional[TableResolver] = None):
         self.client_tables = client_tables
         self.schemas = schemas
         self.case_sensitive = case_sensitive
+        self.db_type = db_type
+        self.resolver = resolver or TableResolver(client_tables, schemas, case_sensitive)
+        self._helper = DatabaseHelper(db_type, None)
+        # Emit a db_type placeholder instead of the client id; bind it with DatabaseHelper.bind_parameters
+        self.bind_params = bind_params
 
     def apply_filter(self, table_info: Dict[str, Optional[str]], client_id: int) -> str:
         table_name = table_info['name']
@@ -17,24 +27,16 @@ class ClientFilterApplierImplementation(ClientFilterApplier):
         if matching_table:
             client_id_column = self.client_tables[matching_table]
             table_reference = alias or table_name
-            return f'{self._quote_identifier(table_reference)}.{self._quote_identifier(client_id_column)} = {client_id}'
+            return f'{self._quote_identifier(table_reference)}.{self._quote_identifier(client_id_column)} = {self._client_id_value(client_id)}'
         return ''
 
     def _find_matching_table(self, table_name: str, schema: Optional[str] = None) -> Optional[str]:
-        possible_names = [
-            f"{schema}.{table_name}" if schema else table_name,
-            table_name,
-        ] + [f"{s}.{table_name}" for s in self.schemas]
-
-        for name in possible_names:
-            if self._case_insensitive_get(self.client_tables, name) is not None:
-                return name
-        return None
+        return self.resolver.client_table(table_name, schema)
 
-    def _case_insensitive_get(self, dict_obj: Dict[str, str], key: str) -> Optional[str]:
-        if self.case_sensitive:
-            return dict_obj.get(key)
-        return next((v for k, v in dict_obj.items() if k.lower() == key.lower()), None)
+    def _client_id_value(self, client_id) -> str:
+        if self.bind_params and self._helper.supports_bind_parameters():
+            return self._helper.parameter_placeholder(CLIENT_ID_PARAM, client_id)
+        return self._helper.sql_literal(client_id)
 
     def _quote_identifier(self, identifier: str) -> str:
-        return f'"{identifier}"'
+        return self._helper.quote_identifier(identifier)
@@ -1,20 +1,18 @@
 import sqlparse
-from sqlparse.sql import IdentifierList, Identifier, Function
+from sqlparse.sql import IdentifierList, Identifier, Function, Parenthesis
 from sqlparse.tokens import Keyword, DML
 import re
+from typing import Optional
+from .table_resolver import TableResolver
 
 
 class SQLQueryValidator:
-    def __init__(self, context):
+    def __init__(self, context, resolver: Optional[TableResolver] = None):
         self.context = context
         self.allowed_tables = set(context['tables'].keys())
-        self.table_aliases = {alias: table for table, info in context['tables'].items()
-                              for alias in [info.get('alias', ''), table]}
-        self.global_aliases = {alias: table for alias, table in context['global_definitions'].get(
-            'global_aliases', {}).get('table_aliases', {}).items()}
-        self.table_aliases.update(self.global_aliases)
+        # Resolves table names and aliases against the context, honoring the schema search path
+        self.resolver = resolver or TableResolver.from_context(context)
         print(f"Allowed tables: {self.allowed_tables}")
-        print(f"Table aliases: {self.table_aliases}")
 
     def validate_and_sanitize(self, query):
         print(f"Validating query: {query}")
@@ -27,10 +25,11 @@ class SQLQueryValidator:
         # Validate tables
         used_tables = self._extract_table_names(parsed)
         print(f"Extracted table names: {used_tables}")
-        for table in used_tables:
-            if table not in self.allowed_tables and table not in self.table_aliases:
+        for schema, table in used_tables:
+            if self.resolver.resolve(table, schema) is None:
+                name = f"{schema}.{table}" if schema else table
                 raise ValueError(
-                    f"Table '{table}' is not allowed or doesn't exist in the context.")
+                    f"Table '{name}' is not allowed or doesn't exist in the context.")
 
         # Add LIMIT if not present
         if not self._has_limit(parsed):
@@ -41,39 +40,30 @@ class SQLQueryValidator:
     def _extract_table_names(self, parsed):
         tables = set()
         for token in parsed.tokens:
-            if isinstance(token, IdentifierList):
-                for identifier in token.get_identifiers():
-                    if identifier.has_alias():
-                        tables.add(identifier.get_real_name())
-                    else:
-                        tables.add(identifier.get_name())
-            elif isinstance(token, Identifier):
-                if token.has_alias():
-                    tables.add(identifier.get_real_name())
-                else:
-                    tables.add(token.get_name())
-            elif token.ttype is Keyword and token.value.upper() == 'FROM':
+            if token.ttype is Keyword and token.value.upper() == 'FROM':
                 tables.update(self._extract_from_clause_tables(token))
-        return {self.table_aliases.get(table, table) for table in tables}
+        return tables
 
     def _extract_from_clause_tables(self, from_token):
         tables = set()
         for token in from_token.parent.tokens[from_token.parent.token_index(from_token):]:
             if isinstance(token, IdentifierList):
                 for identifier in token.get_identifiers():
-                    if identifier.has_alias():
-                        tables.add(identifier.get_real_name())
-                    else:
-                        tables.add(identifier.get_name())
-            elif isinstance(token, Identifier):
-                if token.has_alias():
-                    tables.add(token.get_real_name())
-                else:
-                    tables.add(token.get_name())
+                    if self._is_table(identifier):
+                        tables.add(self._table_reference(identifier))
+            elif self._is_table(token):
+                tables.add(self._table_reference(token))
             elif token.ttype is Keyword and token.value.upper() in ('WHERE', 'GROUP', 'ORDER', 'LIMIT'):
                 break
         return tables
 
+    def _is_table(self, token):
+        # Derived tables are parenthesized subqueries, not context tables
+        return isinstance(token, Identifier) and not isinstance(token.token_first(), Parenthesis)
+
+    def _table_reference(self, identifier):
+        return identifier.get_parent_name(), identifier.get_real_name()
+
     def _has_limit(self, parsed):
         return any(token.ttype is Keyword and token.value.upper() == 'LIMIT' for token in parsed.tokens)
 
@@ -0,0 +1,110 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TableKey = Tuple[Optional[str], str]
+
+# A name part: bracketed, backtick or double quoted (and may then contain dots), or bare
+NAME_PART = re.compile(r'\[[^\]]*\]|`[^`]*`|"[^"]*"|[^.]+')
+
+
+def unquote_identifier(identifier: str) -> str:
+    """Strip the [], ` or " quoting of a single name part."""
+    identifier = identifier.strip()
+    if len(identifier) > 1 and (identifier[0], identifier[-1]) in (('[', ']'), ('`', '`'), ('"', '"')):
+        return identifier[1:-1]
+    return identifier
+
+
+def split_table_name(name: str) -> TableKey:
+    """Split 'schema.table' into unquoted (schema, table); unqualified names have no schema."""
+    parts = [unquote_identifier(part) for part in NAME_PART.findall(name)] or [name]
+    schema = '.'.join(parts[:-1])
+    return (schema or None), parts[-1]
+
+
+def _mapping(value) -> Dict:
+    """A YAML section as a dict; empty or null sections are {} and lists of mappings are merged."""
+    if isinstance(value, dict):
+        return value
+    merged = {}
+    if isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                merged.update(item)
+    return merged
+
+
+class TableResolver:
+    """Resolves table references to configured table names with dict lookups.
+
+    Built once per context from the client tables (table -> client id
+    column) and, for validation, the context's tables and table aliases.
+    A reference is looked up as written, then unqualified, then in each
+    schema of the search path, in that order.
+    """
+
+    def __init__(self, client_tables: Dict[str, str], schemas: List[str] = ['main'], case_sensitive: bool = False,
+                 tables: Iterable[str] = (), aliases: Optional[Dict[str, str]] = None):
+        self.client_tables = client_tables
+        self.schemas = schemas
+        self.case_sensitive = case_sensitive
+        # Identifies the client table configuration, e.g. in cache keys
+        self.key = (tuple(sorted(client_tables.items())), tuple(schemas), case_sensitive)
+        self._client_tables: Dict[TableKey, str] = {}
+        for name in client_tables:
+            self._client_tables.setdefault(self._key(name), name)
+        self._tables: Dict[TableKey, str] = {}
+        for name in tables:
+            self._tables.setdefault(self._key(name), name)
+        self._aliases: Dict[str, str] = {}
+        for alias, name in (aliases or {}).items():
+            if alias:
+                self._aliases.setdefault(self._normalize(alias), name)
+
+    @classmethod
+    def from_context(cls, context: Dict) -> 'TableResolver':
+        client_info = _mapping(context.get('client_info'))
+        tables = _mapping(context.get('tables'))
+        aliases = {info.get('alias'): table for table, info in tables.items() if isinstance(info, dict)}
+        global_aliases = _mapping(_mapping(context.get('global_definitions')).get('global_aliases'))
+        aliases.update((alias, table) for alias, table in _mapping(global_aliases.get('table_aliases')).items()
+                       if isinstance(alias, str) and isinstance(table, str))
+        return cls(_mapping(client_info.get('tables')), client_info.get('schemas') or ['main'],
+                   tables=tables.keys(), aliases=aliases)
+
+    def client_table(self, name: str, schema: Optional[str] = None) -> Optional[str]:
+        """The configured client table a reference points to, or None."""
+        return self._lookup(self._client_tables, name, schema)
+
+    def client_column(self, name: str, schema: Optional[str] = None) -> Optional[str]:
+        """The client id column of the table a reference points to, or None."""
+        client_table = self.client_table(name, schema)
+        return self.client_tables[client_table] if client_table else None
+
+    def resolve(self, name: str, schema: Optional[str] = None) -> Optional[str]:
+        """The context table a reference or table alias points to, or None."""
+        table = self._lookup(self._tables, name, schema)
+        if table is None and schema is None and split_table_name(name)[0] is None:
+            aliased = self._aliases.get(self._normalize(split_table_name(name)[1]))
+            if aliased is not None:
+                table = self._lookup(self._tables, aliased) or aliased
+        return table
+
+    def _lookup(self, index: Dict[TableKey, str], name: str, schema: Optional[str] = None) -> Optional[str]:
+        name_schema, name = split_table_name(name)
+        schema = name_schema or (unquote_identifier(schema) if schema else None)
+        name = self._normalize(name)
+        candidates = [(self._normalize(schema) if schema else None, name), (None, name)] + \
+            [(self._normalize(s), name) for s in self.schemas]
+        for candidate in candidates:
+            table = index.get(candidate)
+            if table is not None:
+                return table
+        return None
+
+    def _key(self, name: str) -> TableKey:
+        schema, table = split_table_name(name)
+        return (self._normalize(schema) if schema else None), self._normalize(table)
+
+    def _normalize(self, name: str) -> str:
+        return name if self.case_sensitive else name.lower()
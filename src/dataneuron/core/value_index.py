@@ -0,0 +1,110 @@
+import gzip
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..db_operations.database_helpers import DatabaseHelper
+
+VALUE_INDEX_FILE = 'value_index.json.gz'
+# Columns with more distinct values than this are left to the database
+MAX_DISTINCT_VALUES = 1000
+TEXT_TYPE_PATTERN = re.compile(r'char|text|string|enum|clob', re.IGNORECASE)
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ValueIndex:
+    """Distinct values of low-cardinality text columns with a trigram inverted index.
+
+    search() gives the same answers as DatabaseHelper.top_few_records,
+    a case-insensitive substring match, without querying the database.
+    """
+
+    def __init__(self):
+        self.values: Dict[Tuple[str, str], List[str]] = {}
+        self.trigrams: Dict[Tuple[str, str], Dict[str, Set[int]]] = {}
+
+    @staticmethod
+    def _key(table: str, column: str) -> Tuple[str, str]:
+        return table.lower(), column.lower()
+
+    def add_column(self, table: str, column: str, values: Iterable):
+        key = self._key(table, column)
+        self.values[key] = sorted({str(value)
+                                  for value in values if value is not None})
+        postings: Dict[str, Set[int]] = {}
+        for position, value in enumerate(self.values[key]):
+            for trigram in _trigrams(value.lower()):
+                postings.setdefault(trigram, set()).add(position)
+        self.trigrams[key] = postings
+
+    def has_column(self, table: str, column: str) -> bool:
+        return self._key(table, column) in self.values
+
+    def search(self, table: str, column: str, value: str, limit: int = 10) -> Optional[List[str]]:
+        """Return up to limit values containing value, or None if the column is not indexed."""
+        key = self._key(table, column)
+        if key not in self.values:
+            return None
+
+        values = self.values[key]
+        needle = str(value).lower()
+        candidates = range(len(values))
+        if len(needle) >= 3:
+            postings = self.trigrams[key]
+            matched = None
+            for trigram in _trigrams(needle):
+                positions = postings.get(trigram, set())
+                matched = positions if matched is None else matched & positions
+                if not matched:
+                    return []
+            candidates = sorted(matched)
+
+        matches = []
+        for position in candidates:
+            if needle in values[position].lower():
+                matches.append(values[position])
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def save(self, path: str):
+        columns = [{'table': table, 'column': column, 'values': values}
+                   for (table, column), values in self.values.items()]
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump({'columns': columns}, f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ValueIndex']:
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls()
+        for column in data.get('columns', []):
+            index.add_column(column['table'], column['column'], column['values'])
+        return index
+
+
+def build_value_index(db, tables: Dict[str, Dict], max_distinct: int = MAX_DISTINCT_VALUES) -> ValueIndex:
+    """Index the text columns of the context tables that have at most max_distinct values."""
+    db_helper = DatabaseHelper(db.db_type, db)
+    index = ValueIndex()
+    for table_name, table_data in tables.items():
+        for column in table_data.get('columns') or []:
+            if column.get('primary_key') or not TEXT_TYPE_PATTERN.search(str(column.get('type', ''))):
+                continue
+            query = db_helper.top_few_records(
+                column['name'], table_name, limit=max_distinct + 1)
+            try:
+                rows, _ = db.execute_query_with_column_names(query)
+            except Exception as e:
+                print(
+                    f"Warning: Could not index {table_name}.{column['name']}: {str(e)}")
+                continue
+            if len(rows) <= max_distinct:
+                index.add_column(table_name, column['name'],
+                                 [row[0] for row in rows])
+    return index
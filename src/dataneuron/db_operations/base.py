@@ -1,10 +1,39 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from .connection_pool import ConnectionPool
+from .result_stream import QueryResultStream, DEFAULT_BATCH_SIZE, slice_batches
+
+QueryParams = Union[Sequence[Any], Dict[str, Any]]
+
+
+def execute_cursor(cursor: Any, query: str, params: Optional[QueryParams] = None):
+    """Execute query on a DB-API cursor, binding params only when there are any."""
+    if params is None:
+        return cursor.execute(query)
+    return cursor.execute(query, params)
 
 
 class DatabaseOperations(ABC):
     def __init__(self):
         self.db_type = None
+        self.pool = None
+
+    def _init_pool(self, pool_config: Optional[Dict[str, Any]] = None, **kwargs):
+        """Create a connection pool that opens connections through _get_connection."""
+        self.pool = ConnectionPool.from_config(
+            self._get_connection, pool_config, **kwargs)
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection for the duration of the block."""
+        with self.pool.connection() as conn:
+            yield conn
+
+    def close(self):
+        """Release any connections held by this object."""
+        if self.pool is not None:
+            self.pool.close()
 
     @abstractmethod
     def get_table_list(self):
@@ -18,9 +47,19 @@ class DatabaseOperations(ABC):
     def execute_query(self, query: str) -> str:
         pass
 
-    def execute_query_with_column_names(self, query: str) -> Tuple[List[Tuple], List[str]]:
+    def execute_query_with_column_names(self, query: str, params: Optional[QueryParams] = None) -> Tuple[List[Tuple], List[str]]:
+        """Execute query, binding params in the backend's placeholder style (see DatabaseHelper.parameter_placeholder)."""
         pass
 
+    def stream_query_with_column_names(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, params: Optional[QueryParams] = None) -> QueryResultStream:
+        """Return the query result as a stream of row batches.
+
+        Backends override this to fetch incrementally; this fallback reads the
+        whole result first.
+        """
+        results, column_names = self.execute_query_with_column_names(query, params)
+        return QueryResultStream(column_names, slice_batches(results, batch_size))
+
     def handle_error(self, operation: str, error: Exception) -> str:
         error_type = type(error).__name__
         error_message = str(error)
@@ -1,10 +1,12 @@
+import threading
 from .base import DatabaseOperations
 from .exceptions import ConnectionError, OperationError
-from typing import List, Tuple, Dict, Any
+from .result_stream import QueryResultStream, DEFAULT_BATCH_SIZE, slice_batches
+from typing import List, Tuple, Dict, Any, Optional
 
 
 class ClickHouseOperations(DatabaseOperations):
-    def __init__(self, host: str, port: int, user: str, password: str, database: str):
+    def __init__(self, host: str, port: int, user: str, password: str, database: str, settings: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.db_type = "clickhouse"
         self.conn_params = {
@@ -15,11 +17,24 @@ class ClickHouseOperations(DatabaseOperations):
         }
         if database:
             self.conn_params["database"] = database
+        # Default query settings, e.g. max_execution_time or max_result_rows
+        self.settings = settings or {}
+        self._client = None
+        self._client_lock = threading.Lock()
 
     def _get_connection(self):
+        """Return the shared client, creating it on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
         try:
             import clickhouse_connect
-            return clickhouse_connect.get_client(**self.conn_params)
+            # Without a session id the client can serve queries from several threads at once
+            return clickhouse_connect.get_client(autogenerate_session_id=False, **self.conn_params)
         except ImportError:
             raise ConnectionError(
                 "ClickHouse support is not installed. Please install it with 'pip install your_cli_tool[clickhouse]'")
@@ -56,18 +71,56 @@ class ClickHouseOperations(DatabaseOperations):
         except Exception as e:
             raise OperationError(f"Failed to get table info: {str(e)}")
 
-    def execute_query_with_column_names(self, query: str) -> Tuple[List[Tuple], List[str]]:
+    def execute_query_with_column_names(self, query: str, params: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None) -> Tuple[List[Tuple], List[str]]:
         try:
             client = self._get_connection()
-            result = client.query(query)
+            result = client.query(query, settings=self._query_settings(settings),
+                                  **self._query_parameters(params))
             return result.result_rows, result.column_names
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}")
 
-    def execute_query(self, query: str) -> List[Tuple]:
+    def execute_query(self, query: str, settings: Optional[Dict[str, Any]] = None) -> List[Tuple]:
         try:
             client = self._get_connection()
-            result = client.query(query)
+            result = client.query(query, settings=self._query_settings(settings))
             return result.result_rows
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}")
+
+    def stream_query_with_column_names(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, params: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None) -> QueryResultStream:
+        try:
+            client = self._get_connection()
+            stream = client.query_row_block_stream(
+                query, settings=self._query_settings(settings), **self._query_parameters(params))
+            stream.__enter__()
+            column_names = stream.source.column_names
+        except Exception as e:
+            raise OperationError(f"Failed to execute query: {str(e)}")
+
+        def batches():
+            # Blocks arrive in the server's block size, re-slice them to batch_size
+            for block in stream:
+                yield from slice_batches(block, batch_size)
+
+        def close(exhausted):
+            stream.__exit__(None, None, None)
+
+        return QueryResultStream(column_names, batches(), close)
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _query_settings(self, settings: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Merge per-query settings over the configured defaults."""
+        merged = dict(self.settings)
+        if settings:
+            merged.update(settings)
+        return merged or None
+
+    def _query_parameters(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Keyword arguments binding params to {name:Type} placeholders on the server."""
+        return {'parameters': params} if params else {}
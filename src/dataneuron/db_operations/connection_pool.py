@@ -0,0 +1,221 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .exceptions import ConnectionError
+
+DEFAULT_MIN_SIZE = 0
+DEFAULT_MAX_SIZE = 5
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_ACQUIRE_TIMEOUT = 30
+
+
+def ping_connection(conn: Any) -> None:
+    """Run a trivial query, raising if the connection is no longer usable."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def reset_connection(conn: Any) -> None:
+    """End any transaction left open by the previous borrower."""
+    conn.rollback()
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of DB-API connections.
+
+    Idle connections are reused most-recently-returned first, closed once they
+    have been idle for longer than idle_timeout (keeping at least min_size), and
+    optionally pinged before being handed out.
+    """
+
+    def __init__(self,
+                 connect: Callable[[], Any],
+                 min_size: int = DEFAULT_MIN_SIZE,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+                 health_check: bool = True,
+                 acquire_timeout: Optional[float] = DEFAULT_ACQUIRE_TIMEOUT,
+                 ping: Callable[[Any], None] = ping_connection,
+                 reset: Callable[[Any], None] = reset_connection):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.acquire_timeout = acquire_timeout
+        self._ping = ping
+        self._reset = reset
+
+        self._idle: List[Tuple[Any, float]] = []
+        self._size = 0
+        self._filled = False
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, connect: Callable[[], Any], config: Optional[Dict[str, Any]] = None, **kwargs) -> 'ConnectionPool':
+        """Build a pool from the optional `pool` section of database.yaml."""
+        config = config or {}
+        return cls(
+            connect,
+            min_size=int(config.get('min_size', DEFAULT_MIN_SIZE)),
+            max_size=int(config.get('max_size', DEFAULT_MAX_SIZE)),
+            idle_timeout=config.get('idle_timeout', DEFAULT_IDLE_TIMEOUT),
+            health_check=bool(config.get('health_check', True)),
+            acquire_timeout=config.get(
+                'acquire_timeout', DEFAULT_ACQUIRE_TIMEOUT),
+            **kwargs
+        )
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or in use."""
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def acquire(self) -> Any:
+        """Borrow a connection, opening a new one if the pool is not yet full."""
+        if not self._filled:
+            self._fill()
+
+        deadline = None
+        if self.acquire_timeout is not None:
+            deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            conn = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise ConnectionError("Connection pool is closed")
+                    self._evict_idle()
+                    if self._idle:
+                        conn, _ = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise ConnectionError(
+                            f"Timed out waiting for a database connection (pool max_size={self.max_size})")
+                    self._condition.wait(remaining)
+
+            if conn is None:
+                return self._open()
+
+            if not self.health_check or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: Any, discard: bool = False):
+        """Return a borrowed connection to the pool, or close it if discard is set."""
+        if not discard and not self._closed:
+            try:
+                self._reset(conn)
+            except Exception:
+                discard = True
+
+        with self._condition:
+            if discard or self._closed:
+                self._close_quietly(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; connections in use are closed when released."""
+        with self._condition:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._size -= len(self._idle)
+            self._idle = []
+            self._condition.notify_all()
+
+    def _fill(self):
+        with self._condition:
+            if self._filled:
+                return
+            self._filled = True
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+
+        for _ in range(max(missing, 0)):
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify()
+
+    def _open(self) -> Any:
+        try:
+            return self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _is_healthy(self, conn: Any) -> bool:
+        try:
+            self._ping(conn)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn: Any):
+        self._close_quietly(conn)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _evict_idle(self):
+        # Called with the condition held
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        kept = []
+        # Oldest connections sit at the front of the list
+        for conn, returned_at in self._idle:
+            expired = now - returned_at > self.idle_timeout
+            if expired and self._size > self.min_size:
+                self._close_quietly(conn)
+                self._size -= 1
+            else:
+                kept.append((conn, returned_at))
+        self._idle = kept
+
+    @staticmethod
+    def _close_quietly(conn: Any):
+        try:
+            conn.close()
+        except Exception:
+            pass
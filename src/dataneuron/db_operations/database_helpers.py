@@ -1,4 +1,5 @@
-from typing import List, Optional, Any
+import re
+from typing import Dict, List, Optional, Any, Union
 
 
 class DatabaseHelper:
@@ -14,7 +15,61 @@ class DatabaseHelper:
         else:  # postgres and sqlite
             return f'"{identifier}"'
 
+    def escape_literal(self, value: Any) -> str:
+        return str(value).replace("'", "''")
+
+    def sql_literal(self, value: Any) -> str:
+        """value as a SQL literal: integers as they are, anything else as an escaped string."""
+        value = self.parameter_value(value)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+        return f"'{self.escape_literal(value)}'"
+
+    def cast_to_text(self, expression: str) -> str:
+        if self.database == 'mysql':
+            return f"CAST({expression} AS CHAR)"
+        elif self.database == 'mssql':
+            return f"CAST({expression} AS NVARCHAR(4000))"
+        elif self.database == 'clickhouse':
+            return f"toString({expression})"
+        elif self.database in ('csv', 'duckdb'):
+            return f"CAST({expression} AS VARCHAR)"
+        else:  # postgres and sqlite
+            return f"CAST({expression} AS TEXT)"
+
+    def supports_bind_parameters(self) -> bool:
+        """Whether queries can carry bind parameters; mysql-connector never un-escapes %% in the query text."""
+        return self.database is not None and self.database != 'mysql'
+
+    def parameter_placeholder(self, name: str, value: Any) -> str:
+        if self.database == 'clickhouse':
+            param_type = 'Int64' if isinstance(self.parameter_value(value), int) else 'String'
+            return f"{{{name}:{param_type}}}"
+        elif self.database == 'postgres':
+            return "%s"
+        else:  # sqlite, mssql, duckdb and csv
+            return "?"
+
+    def parameter_value(self, value: Any) -> Any:
+        if isinstance(value, str) and re.fullmatch(r'-?\d+', value):
+            return int(value)
+        return value
+
+    def escape_parameter_text(self, sql: str) -> str:
+        """Escape SQL text around placeholders; psycopg2 reads any bare % as a placeholder."""
+        if self.database == 'postgres':
+            return sql.replace('%', '%%')
+        return sql
+
+    def bind_parameters(self, name: str, value: Any, count: int) -> Union[List[Any], Dict[str, Any]]:
+        """Parameters for count placeholders of name, in the form the backend's execute expects."""
+        value = self.parameter_value(value)
+        if self.database == 'clickhouse':
+            return {name: value}
+        return [value] * count
+
     def get_pattern_match_clause(self, column: str, value: str) -> str:
+        value = self.escape_literal(value)
         if self.database == 'mssql':
             return f"LOWER({column}) LIKE '%' + LOWER('{value}') + '%'"
         else:  # postgres, mysql, and sqlite
@@ -37,10 +92,11 @@ class DatabaseHelper:
         where_clause = ""
         if potential_value:
             if column_name == '*':
+                value = self.escape_literal(potential_value)
                 if self.database == 'mssql':
-                    where_clause = f"WHERE EXISTS (SELECT 1 FROM {quoted_table} FOR JSON PATH) WHERE JSON_VALUE(BulkColumn, '$.*') LIKE '%{potential_value}%'"
+                    where_clause = f"WHERE EXISTS (SELECT 1 FROM {quoted_table} FOR JSON PATH) WHERE JSON_VALUE(BulkColumn, '$.*') LIKE '%{value}%'"
                 else:
-                    where_clause = f"WHERE CAST({quoted_table} AS TEXT) LIKE '%{potential_value}%'"
+                    where_clause = f"WHERE CAST({quoted_table} AS TEXT) LIKE '%{value}%'"
             else:
                 where_clause = f"WHERE {self.get_pattern_match_clause(quoted_column, potential_value)}"
 
@@ -59,6 +115,25 @@ class DatabaseHelper:
             """
         return query.strip()
 
+    def batched_top_few_records(self, entities: List[Dict[str, Any]], limit: int = 10) -> str:
+        """Build one UNION ALL query returning (entity_index, value) rows for every entity lookup.
+
+        Each entity is a dict with table, column and potential_value keys.
+        Values are cast to text so the branches have compatible types.
+        """
+        branches = []
+        for index, entity in enumerate(entities):
+            quoted_column = self.quote_identifier(entity['column'])
+            value = self.cast_to_text(quoted_column)
+            where_clause = f"WHERE {self.get_pattern_match_clause(quoted_column, entity['potential_value'])}"
+            if self.database == 'mssql':
+                lookup = f"SELECT DISTINCT TOP {limit} {value} AS match_value FROM {entity['table']} {where_clause}"
+            else:
+                lookup = f"SELECT DISTINCT {value} AS match_value FROM {entity['table']} {where_clause} LIMIT {limit}"
+            branches.append(
+                f"SELECT {index} AS entity_index, match_value FROM ({lookup}) AS entity_{index}")
+        return "\nUNION ALL\n".join(branches)
+
     def get_sample_data(self, table_name: str, limit: int = 5) -> List[tuple]:
         query = self.top_few_records('*', table_name, limit=limit)
         return self.execute_query(query)
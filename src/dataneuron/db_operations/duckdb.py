@@ -1,58 +1,289 @@
 import os
-from typing import List, Dict, Any, Tuple
-from .base import DatabaseOperations
-from .exceptions import ConnectionError, OperationError
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from .base import DatabaseOperations, QueryParams, execute_cursor
+from .exceptions import ConnectionError, OperationError, ConfigurationError
+from .result_stream import QueryResultStream, DEFAULT_BATCH_SIZE, fetch_batches
+from ..utils.print import print_warning
+
+
+DATA_FILE_READERS = {
+    '.csv': 'read_csv_auto',
+    '.parquet': 'read_parquet',
+}
+
+
+MANIFEST_TABLE = 'dataneuron_cache.manifest'
+CACHE_CATALOG = 'dataneuron_cache_db'
 
 
 class DuckDBOperations(DatabaseOperations):
-    def __init__(self, data_directory: str):
+    def __init__(self, data_directory: str, mode: str = 'table', materialize: Optional[List[str]] = None,
+                 cache_path: Optional[str] = None, threads: Optional[int] = None, memory_limit: Optional[str] = None):
         super().__init__()
+        if mode not in ('table', 'view'):
+            raise ConfigurationError(
+                f"Unsupported DuckDB mode: {mode}. Use 'table' or 'view'")
         self.db_type = "duckdb"
         self.data_directory = os.path.expanduser(data_directory)
+        # 'table' copies every file into memory as text columns, 'view' reads the files lazily with inferred types
+        self.mode = mode
+        self.materialize = set(materialize or [])
+        # Optional .duckdb file that keeps converted data files between processes.
+        # Only tables are cached; lazy views in 'view' mode always read their file.
+        self.cache_path = os.path.expanduser(
+            cache_path) if cache_path else None
+        self.cached_tables = set()
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.read_only = False
         self.conn = None
         self.csv_files = []
+        self.data_files = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
 
     def _get_connection(self):
         if not self.conn:
-            try:
-                import duckdb
-                self.conn = duckdb.connect(database=':memory:')
-                self._load_csv_files()
-            except ImportError as e:
-                raise ConnectionError("DuckDB support is not installed. "
-                                      "Please install it with 'pip install duckdb'") from e
-            except Exception as e:
-                raise ConnectionError(
-                    f"Failed to connect to DuckDB: {str(e)}") from e
+            with self._lock:
+                if not self.conn:
+                    self.conn = self._connect()
         return self.conn
 
-    def _load_csv_files(self):
+    def _get_cursor(self):
+        """Return this thread's cursor on the shared connection so queries can run in parallel."""
+        conn = self._get_connection()
+        if getattr(self._local, 'conn', None) is not conn:
+            self._local.cursor = conn.cursor()
+            self._local.conn = conn
+        return self._local.cursor
+
+    def _connect(self):
         try:
-            self.csv_files = [f for f in os.listdir(
-                self.data_directory) if f.endswith('.csv')]
-            for csv_file in self.csv_files:
-                table_name = os.path.splitext(csv_file)[0]
-                file_path = os.path.join(self.data_directory, csv_file)
-                self.conn.execute(f"""
-                    CREATE TABLE {table_name} AS 
-                    SELECT * FROM read_csv_auto('{file_path}', ALL_VARCHAR=1)
-                """)
+            import duckdb
+            self._scan_data_files()
+            if self.cache_path:
+                return self._open_cache(duckdb)
+            conn = duckdb.connect(database=':memory:',
+                                  config=self._connect_config())
+            self._load_data_files(conn)
+            return conn
+        except ImportError as e:
+            raise ConnectionError("DuckDB support is not installed. "
+                                  "Please install it with 'pip install duckdb'") from e
         except Exception as e:
-            raise OperationError(f"Failed to load CSV files: {str(e)}") from e
+            raise ConnectionError(
+                f"Failed to connect to DuckDB: {str(e)}") from e
+
+    def _connect_config(self) -> Dict[str, Any]:
+        config = {}
+        if self.threads is not None:
+            config['threads'] = self.threads
+        if self.memory_limit is not None:
+            config['memory_limit'] = self.memory_limit
+        return config
+
+    def _scan_data_files(self):
+        self.csv_files = []
+        self.data_files = {}
+        for data_file in sorted(os.listdir(self.data_directory)):
+            table_name, extension = os.path.splitext(data_file)
+            if extension.lower() not in DATA_FILE_READERS:
+                continue
+            if extension.lower() == '.csv':
+                self.csv_files.append(data_file)
+            self.data_files[table_name] = os.path.abspath(
+                os.path.join(self.data_directory, data_file))
+
+    def _load_data_files(self, conn):
+        try:
+            for table_name in self.data_files:
+                self._create_object(conn, table_name)
+        except Exception as e:
+            raise OperationError(f"Failed to load data files: {str(e)}") from e
+
+    def _object_kind(self, table_name: str) -> str:
+        if self.mode == 'view' and table_name not in self.materialize:
+            return 'VIEW'
+        return 'TABLE'
+
+    def _create_object(self, conn, table_name: str):
+        conn.execute(
+            f"CREATE {self._object_kind(table_name)} {self._quote_identifier(table_name)} AS {self._source_query(table_name)}")
+
+    def _open_cache(self, duckdb):
+        """Attach the cache file read-only, re-ingesting only data files whose size or mtime changed."""
+        self.read_only = False
+        self.cached_tables = set()
+        expected = self._expected_manifest()
+        if not expected and not os.path.exists(self.cache_path):
+            # 'view' mode without materialized tables has nothing worth caching
+            conn = duckdb.connect(database=':memory:',
+                                  config=self._connect_config())
+            self._load_data_files(conn)
+            return conn
+        current = None
+        if os.path.exists(self.cache_path):
+            try:
+                conn = duckdb.connect(self.cache_path, read_only=True)
+                current = self._read_manifest(conn)
+                conn.close()
+            except duckdb.Error:
+                # Another process may be rebuilding the cache; try to open it for writing below
+                pass
+
+        if current != expected:
+            try:
+                conn = duckdb.connect(
+                    self.cache_path, config=self._connect_config())
+            except duckdb.Error as e:
+                print_warning(
+                    f"DuckDB cache {self.cache_path} is in use, loading data files in memory instead: {str(e)}")
+                conn = duckdb.connect(database=':memory:',
+                                      config=self._connect_config())
+                self._load_data_files(conn)
+                return conn
+
+            try:
+                self._sync_cache(conn, expected)
+            except Exception as e:
+                raise OperationError(
+                    f"Failed to update DuckDB cache {self.cache_path}: {str(e)}") from e
+            finally:
+                conn.close()
+
+        # Queries run in an in-memory database with views over the attached
+        # cache, so materialized copies are visible to every thread's cursor
+        conn = duckdb.connect(database=':memory:',
+                              config=self._connect_config())
+        conn.execute(
+            f"ATTACH {self._quote_literal(self.cache_path)} AS {CACHE_CATALOG} (READ_ONLY)")
+        self.read_only = True
+        self.cached_tables = set(expected)
+        for table_name in self.data_files:
+            conn.execute(
+                f"CREATE VIEW {self._quote_identifier(table_name)} AS {self._source_query(table_name)}")
+        return conn
+
+    def _expected_manifest(self) -> Dict[str, Tuple]:
+        manifest = {}
+        for table_name, file_path in self.data_files.items():
+            if self._object_kind(table_name) == 'VIEW':
+                continue
+            stat = os.stat(file_path)
+            manifest[table_name] = (file_path, stat.st_size, stat.st_mtime_ns,
+                                    self.mode, self._object_kind(table_name))
+        return manifest
+
+    def _read_manifest(self, conn) -> Dict[str, Tuple]:
+        exists = conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_schema = 'dataneuron_cache' AND table_name = 'manifest'").fetchone()[0]
+        if not exists:
+            return {}
+        rows = conn.execute(
+            f"SELECT table_name, file_path, size, mtime_ns, mode, kind FROM {MANIFEST_TABLE}").fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def _sync_cache(self, conn, expected: Dict[str, Tuple]):
+        conn.execute("CREATE SCHEMA IF NOT EXISTS dataneuron_cache")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+                table_name VARCHAR PRIMARY KEY,
+                file_path VARCHAR,
+                size BIGINT,
+                mtime_ns BIGINT,
+                mode VARCHAR,
+                kind VARCHAR
+            )
+        """)
+        current = self._read_manifest(conn)
+
+        for table_name in current:
+            if table_name not in expected:
+                conn.execute("BEGIN TRANSACTION")
+                self._drop_object(conn, table_name)
+                conn.execute(
+                    f"DELETE FROM {MANIFEST_TABLE} WHERE table_name = ?", [table_name])
+                conn.execute("COMMIT")
+
+        for table_name, entry in expected.items():
+            if current.get(table_name) == entry:
+                continue
+            # One transaction per file so finished files survive an interrupted rebuild
+            conn.execute("BEGIN TRANSACTION")
+            self._drop_object(conn, table_name)
+            self._create_object(conn, table_name)
+            conn.execute(
+                f"DELETE FROM {MANIFEST_TABLE} WHERE table_name = ?", [table_name])
+            conn.execute(
+                f"INSERT INTO {MANIFEST_TABLE} VALUES (?, ?, ?, ?, ?, ?)", [table_name, *entry])
+            conn.execute("COMMIT")
+
+    def _drop_object(self, conn, table_name: str):
+        row = conn.execute(
+            "SELECT table_type FROM information_schema.tables "
+            "WHERE table_catalog = current_database() AND table_schema = 'main' AND table_name = ?",
+            [table_name]).fetchone()
+        if row:
+            kind = 'VIEW' if row[0] == 'VIEW' else 'TABLE'
+            conn.execute(
+                f"DROP {kind} {self._quote_identifier(table_name)}")
+
+    def _source_query(self, table_name: str) -> str:
+        if self.read_only and table_name in self.cached_tables:
+            return f"SELECT * FROM {CACHE_CATALOG}.main.{self._quote_identifier(table_name)}"
+        file_path = self.data_files[table_name]
+        reader = DATA_FILE_READERS[os.path.splitext(file_path)[1].lower()]
+        options = ""
+        if reader == 'read_csv_auto' and self.mode == 'table':
+            # Table mode keeps the original all-text columns for compatibility
+            options = ", ALL_VARCHAR=1"
+        return f"SELECT * FROM {reader}({self._quote_literal(file_path)}{options})"
+
+    def materialize_table(self, table_name: str):
+        """Replace the lazy view of table_name with an in-memory table."""
+        if table_name not in self.data_files:
+            self._get_connection()
+        if table_name not in self.data_files:
+            raise OperationError(f"Unknown data file table: {table_name}")
+        with self._lock:
+            if self.mode == 'table' or table_name in self.materialize:
+                return
+            cursor = self._get_cursor()
+            quoted_name = self._quote_identifier(table_name)
+            try:
+                cursor.execute("BEGIN TRANSACTION")
+                cursor.execute(f"DROP VIEW IF EXISTS {quoted_name}")
+                cursor.execute(
+                    f"CREATE TABLE {quoted_name} AS {self._source_query(table_name)}")
+                cursor.execute("COMMIT")
+            except Exception as e:
+                cursor.execute("ROLLBACK")
+                raise OperationError(
+                    f"Failed to materialize table {table_name}: {str(e)}") from e
+            self.materialize.add(table_name)
+
+    def _quote_identifier(self, name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def _quote_literal(self, value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
 
     def get_table_list(self) -> List[Dict[str, str]]:
         try:
-            conn = self._get_connection()
-            result = conn.execute(
-                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'").fetchall()
+            cursor = self._get_cursor()
+            result = cursor.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_catalog = current_database() AND table_schema = 'main'").fetchall()
             return [{"schema": "main", "table": row[0]} for row in result]
         except Exception as e:
             raise OperationError(f"Failed to get table list: {str(e)}") from e
 
     def get_table_info(self, schema: str, table: str) -> Dict[str, Any]:
         try:
-            conn = self._get_connection()
-            columns = conn.execute(f"PRAGMA table_info('{table}')").fetchall()
+            cursor = self._get_cursor()
+            columns = cursor.execute(f"PRAGMA table_info({self._quote_literal(table)})").fetchall()
             return {
                 'schema': 'main',
                 'table_name': table,
@@ -69,20 +300,34 @@ class DuckDBOperations(DatabaseOperations):
         except Exception as e:
             raise OperationError(f"Failed to get table info: {str(e)}") from e
 
-    def execute_query_with_column_names(self, query: str) -> Tuple[List[Tuple], List[str]]:
+    def execute_query_with_column_names(self, query: str, params: Optional[QueryParams] = None) -> Tuple[List[Tuple], List[str]]:
         try:
-            conn = self._get_connection()
-            result = conn.execute(query)
+            cursor = self._get_cursor()
+            result = execute_cursor(cursor, query, params)
             column_names = [desc[0] for desc in result.description]
             results = result.fetchall()
             return results, column_names
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}") from e
 
+    def stream_query_with_column_names(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, params: Optional[QueryParams] = None) -> QueryResultStream:
+        try:
+            # A separate cursor keeps the pending result apart from other queries
+            cursor = self._get_connection().cursor()
+            execute_cursor(cursor, query, params)
+            column_names = [desc[0] for desc in cursor.description]
+        except Exception as e:
+            raise OperationError(f"Failed to execute query: {str(e)}") from e
+
+        def close(exhausted):
+            cursor.close()
+
+        return QueryResultStream(column_names, fetch_batches(cursor, batch_size), close)
+
     def execute_query(self, query: str) -> List[Tuple]:
         try:
-            conn = self._get_connection()
-            result = conn.execute(query).fetchall()
+            cursor = self._get_cursor()
+            result = cursor.execute(query).fetchall()
             return result
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}")
@@ -18,7 +18,12 @@ class DatabaseFactory:
             db = None
 
             if db_type == 'sqlite':
-                db = SQLiteOperations(db_config.get('db_path'))
+                db = SQLiteOperations(
+                    db_path=db_config.get('db_path'),
+                    read_only=db_config.get('read_only', False),
+                    pragmas=db_config.get('pragmas'),
+                    check_wal=db_config.get('check_wal', False)
+                )
             elif db_type == 'postgres':
                 from .postgres import PostgreSQLOperations
                 db = PostgreSQLOperations(
@@ -26,7 +31,8 @@ class DatabaseFactory:
                     user=db_config.get('user'),
                     password=db_config.get('password'),
                     host=db_config.get('host'),
-                    port=db_config.get('port')
+                    port=db_config.get('port'),
+                    pool_config=db_config.get('pool')
                 )
             elif db_type == 'mysql':
                 from .mysql import MySQLOperations
@@ -34,7 +40,8 @@ class DatabaseFactory:
                     host=db_config.get('host'),
                     user=db_config.get('user'),
                     password=db_config.get('password'),
-                    database=db_config.get('database')
+                    database=db_config.get('database'),
+                    pool_config=db_config.get('pool')
                 )
             elif db_type == 'mssql':
                 from .mssql import MSSQLOperations
@@ -42,11 +49,19 @@ class DatabaseFactory:
                     server=db_config.get('server'),
                     database=db_config.get('database'),
                     username=db_config.get('username'),
-                    password=db_config.get('password')
+                    password=db_config.get('password'),
+                    pool_config=db_config.get('pool')
                 )
             elif db_type == 'csv':
                 from .duckdb import DuckDBOperations
-                db = DuckDBOperations(db_config.get('data_directory'))
+                db = DuckDBOperations(
+                    data_directory=db_config.get('data_directory'),
+                    mode=db_config.get('mode', 'table'),
+                    materialize=db_config.get('materialize'),
+                    cache_path=db_config.get('cache_path'),
+                    threads=db_config.get('threads'),
+                    memory_limit=db_config.get('memory_limit')
+                )
             elif db_type == 'clickhouse':
                 from .clickhouse import ClickHouseOperations
                 db = ClickHouseOperations(
@@ -54,7 +69,8 @@ class DatabaseFactory:
                     port=db_config.get('port'),
                     user=db_config.get('user'),
                     password=db_config.get('password'),
-                    database=db_config.get('database')
+                    database=db_config.get('database'),
+                    settings=db_config.get('settings')
                 )
             else:
                 raise ConfigurationError(
@@ -1,10 +1,11 @@
-from .base import DatabaseOperations
+from .base import DatabaseOperations, QueryParams, execute_cursor
 from .exceptions import ConnectionError, OperationError
-from typing import List, Dict, Any, Tuple
+from .result_stream import QueryResultStream, DEFAULT_BATCH_SIZE, fetch_batches
+from typing import List, Dict, Any, Tuple, Optional
 
 
 class MSSQLOperations(DatabaseOperations):
-    def __init__(self, server: str, database: str, username: str, password: str):
+    def __init__(self, server: str, database: str, username: str, password: str, pool_config: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.db_type = "mssql"
         self.conn_params = {
@@ -14,6 +15,7 @@ class MSSQLOperations(DatabaseOperations):
             "password": password
         }
         self.conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={server};DATABASE={database};UID={username};PWD={password}"
+        self._init_pool(pool_config)
 
     def _get_connection(self):
         try:
@@ -28,7 +30,7 @@ class MSSQLOperations(DatabaseOperations):
 
     def get_table_list(self) -> List[Dict[str, str]]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("""
                         SELECT TABLE_SCHEMA, TABLE_NAME 
@@ -41,7 +43,7 @@ class MSSQLOperations(DatabaseOperations):
 
     def get_table_info(self, schema: str, table: str) -> Dict[str, Any]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(f"""
                         SELECT 
@@ -83,20 +85,41 @@ class MSSQLOperations(DatabaseOperations):
         except Exception as e:
             raise OperationError(f"Failed to get table info: {str(e)}")
 
-    def execute_query_with_column_names(self, query: str) -> Tuple[List[Tuple], List[str]]:
+    def execute_query_with_column_names(self, query: str, params: Optional[QueryParams] = None) -> Tuple[List[Tuple], List[str]]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(query)
+                    execute_cursor(cursor, query, params)
                     results = cursor.fetchall()
                     column_names = [column[0] for column in cursor.description]
                     return results, column_names
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}")
 
+    def stream_query_with_column_names(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, params: Optional[QueryParams] = None) -> QueryResultStream:
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            execute_cursor(cursor, query, params)
+            column_names = [column[0] for column in cursor.description]
+        except Exception as e:
+            self.pool.release(conn)
+            raise OperationError(f"Failed to execute query: {str(e)}")
+
+        def close(exhausted):
+            try:
+                if not exhausted:
+                    cursor.cancel()
+                cursor.close()
+            except Exception:
+                pass
+            self.pool.release(conn)
+
+        return QueryResultStream(column_names, fetch_batches(cursor, batch_size), close)
+
     def execute_query(self, query: str) -> List[Tuple]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(query)
                     return cursor.fetchall()
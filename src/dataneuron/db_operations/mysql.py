@@ -1,10 +1,11 @@
-from .base import DatabaseOperations
+from .base import DatabaseOperations, QueryParams, execute_cursor
 from .exceptions import ConnectionError, OperationError
-from typing import List, Tuple, Dict, Any
+from .result_stream import QueryResultStream, DEFAULT_BATCH_SIZE, fetch_batches
+from typing import List, Tuple, Dict, Any, Optional
 
 
 class MySQLOperations(DatabaseOperations):
-    def __init__(self, host: str, user: str, password: str, database: str):
+    def __init__(self, host: str, user: str, password: str, database: str, pool_config: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.db_type = "mysql"
         self.conn_params = {
@@ -13,6 +14,7 @@ class MySQLOperations(DatabaseOperations):
             "password": password,
             "database": database
         }
+        self._init_pool(pool_config)
 
     def _get_connection(self):
         try:
@@ -27,7 +29,7 @@ class MySQLOperations(DatabaseOperations):
 
     def get_table_list(self) -> List[Dict[str, str]]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("SHOW TABLES")
                     return [{"schema": self.conn_params['database'], "table": table[0]} for table in cursor.fetchall()]
@@ -36,7 +38,7 @@ class MySQLOperations(DatabaseOperations):
 
     def get_table_info(self, schema: str, table: str) -> Dict[str, Any]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(f"DESCRIBE {table}")
                     columns = cursor.fetchall()
@@ -56,20 +58,41 @@ class MySQLOperations(DatabaseOperations):
         except Exception as e:
             raise OperationError(f"Failed to get table info: {str(e)}")
 
-    def execute_query_with_column_names(self, query: str) -> Tuple[List[Tuple], List[str]]:
+    def execute_query_with_column_names(self, query: str, params: Optional[QueryParams] = None) -> Tuple[List[Tuple], List[str]]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(query)
+                    execute_cursor(cursor, query, params)
                     results = cursor.fetchall()
                     column_names = [desc[0] for desc in cursor.description]
                     return results, column_names
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}")
 
+    def stream_query_with_column_names(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, params: Optional[QueryParams] = None) -> QueryResultStream:
+        conn = self.pool.acquire()
+        try:
+            # Unbuffered cursors read rows from the socket as they are fetched
+            cursor = conn.cursor(buffered=False)
+            execute_cursor(cursor, query, params)
+            column_names = [desc[0] for desc in cursor.description]
+        except Exception as e:
+            self.pool.release(conn)
+            raise OperationError(f"Failed to execute query: {str(e)}")
+
+        def close(exhausted):
+            try:
+                cursor.close()
+            except Exception:
+                pass
+            # Unread rows would block the next query on this connection
+            self.pool.release(conn, discard=not exhausted)
+
+        return QueryResultStream(column_names, fetch_batches(cursor, batch_size), close)
+
     def execute_query(self, query: str) -> List[Tuple]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(query)
                     return cursor.fetchall()
@@ -1,10 +1,12 @@
-from .base import DatabaseOperations
+import uuid
+from .base import DatabaseOperations, QueryParams, execute_cursor
 from .exceptions import ConnectionError, OperationError
-from typing import List, Tuple, Dict, Any
+from .result_stream import QueryResultStream, DEFAULT_BATCH_SIZE, fetch_batches
+from typing import List, Tuple, Dict, Any, Optional
 
 
 class PostgreSQLOperations(DatabaseOperations):
-    def __init__(self, dbname: str, user: str, password: str, host: str, port: str):
+    def __init__(self, dbname: str, user: str, password: str, host: str, port: str, pool_config: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.db_type = "postgres"
         self.conn_params = {
@@ -14,6 +16,7 @@ class PostgreSQLOperations(DatabaseOperations):
             "host": host,
             "port": port
         }
+        self._init_pool(pool_config)
 
     def _get_connection(self):
         try:
@@ -28,7 +31,7 @@ class PostgreSQLOperations(DatabaseOperations):
 
     def get_table_list(self) -> List[Dict[str, str]]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("""
                         SELECT table_schema, table_name
@@ -43,7 +46,7 @@ class PostgreSQLOperations(DatabaseOperations):
 
     def get_table_info(self, schema: str, table: str) -> Dict[str, Any]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(f"""
                         SELECT 
@@ -80,20 +83,41 @@ class PostgreSQLOperations(DatabaseOperations):
         except Exception as e:
             raise OperationError(f"Failed to get table info: {str(e)}") from e
 
-    def execute_query_with_column_names(self, query: str) -> Tuple[List[Tuple], List[str]]:
+    def execute_query_with_column_names(self, query: str, params: Optional[QueryParams] = None) -> Tuple[List[Tuple], List[str]]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(query)
+                    execute_cursor(cursor, query, params)
                     results = cursor.fetchall()
                     column_names = [desc[0] for desc in cursor.description]
                     return results, column_names
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}") from e
 
+    def stream_query_with_column_names(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, params: Optional[QueryParams] = None) -> QueryResultStream:
+        conn = self.pool.acquire()
+        try:
+            # A named cursor keeps the result set on the server
+            cursor = conn.cursor(name=f"dataneuron_{uuid.uuid4().hex}")
+            cursor.itersize = batch_size
+            execute_cursor(cursor, query, params)
+            first_batch = cursor.fetchmany(batch_size)
+            column_names = [desc[0] for desc in cursor.description]
+        except Exception as e:
+            self.pool.release(conn)
+            raise OperationError(f"Failed to execute query: {str(e)}") from e
+
+        def close(exhausted):
+            try:
+                cursor.close()
+            finally:
+                self.pool.release(conn)
+
+        return QueryResultStream(column_names, fetch_batches(cursor, batch_size, first_batch), close)
+
     def execute_query(self, query: str) -> List[Tuple]:
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(query)
                     results = cursor.fetchall()
@@ -0,0 +1,81 @@
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+from .exceptions import OperationError
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def fetch_batches(cursor: Any, batch_size: int, first_batch: Optional[List[Tuple]] = None) -> Iterator[List[Tuple]]:
+    """Yield rows from a DB-API cursor with fetchmany until it is exhausted."""
+    if first_batch:
+        yield first_batch
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        yield batch
+
+
+def slice_batches(rows: Sequence[Tuple], batch_size: int) -> Iterator[List[Tuple]]:
+    for start in range(0, len(rows), batch_size):
+        yield list(rows[start:start + batch_size])
+
+
+class QueryResultStream:
+    """Rows of a query result, read from the database one batch at a time.
+
+    Iterating yields lists of at most batch_size rows. Use the stream as a
+    context manager, or call close(), so that the cursor and connection are
+    released even when the caller stops before the last batch.
+    """
+
+    def __init__(self, column_names: Sequence[str], batches: Iterator[List[Tuple]], on_close: Optional[Callable[[bool], None]] = None):
+        self.column_names = list(column_names)
+        self._batches = batches
+        self._on_close = on_close
+        self._exhausted = False
+        self._closed = False
+
+    def __iter__(self) -> Iterator[List[Tuple]]:
+        if self._closed:
+            return
+        try:
+            for batch in self._batches:
+                yield list(batch)
+            self._exhausted = True
+        except Exception as e:
+            self.close()
+            raise OperationError(
+                f"Failed to fetch query results: {str(e)}") from e
+        finally:
+            if self._exhausted:
+                self.close()
+
+    def rows(self) -> Iterator[Tuple]:
+        for batch in self:
+            yield from batch
+
+    def fetch(self, max_rows: Optional[int] = None) -> List[Tuple]:
+        """Read up to max_rows rows (all rows if None) and close the stream."""
+        result = []
+        try:
+            for batch in self:
+                if max_rows is not None and len(result) + len(batch) >= max_rows:
+                    result.extend(batch[:max_rows - len(result)])
+                    break
+                result.extend(batch)
+        finally:
+            self.close()
+        return result
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._on_close is not None:
+            self._on_close(self._exhausted)
+
+    def __enter__(self) -> 'QueryResultStream':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,22 +1,87 @@
+import os
+import re
 import sqlite3
-from typing import List, Tuple, Dict, Any
-from .base import DatabaseOperations
-from .exceptions import ConnectionError, OperationError
+import threading
+from typing import List, Tuple, Dict, Any, Optional
+from urllib.parse import quote
+from .base import DatabaseOperations, QueryParams, execute_cursor
+from .exceptions import ConnectionError, OperationError, ConfigurationError
+from .result_stream import QueryResultStream, DEFAULT_BATCH_SIZE, fetch_batches
+from ..utils.print import print_warning
+
+
+DEFAULT_PRAGMAS = {
+    'mmap_size': 268435456,  # 256 MB of the file memory-mapped
+    'cache_size': -65536,  # negative values are KiB, so 64 MB of page cache
+    'temp_store': 'MEMORY',
+}
+SUPPORTED_PRAGMAS = {'mmap_size', 'cache_size', 'temp_store', 'query_only'}
 
 
 class SQLiteOperations(DatabaseOperations):
-    def __init__(self, db_path):
+    def __init__(self, db_path, read_only: bool = False, pragmas: Optional[Dict[str, Any]] = None, check_wal: bool = False):
         super().__init__()
         self.db_type = "sqlite"
         self.db_path = db_path
+        self.read_only = read_only
+        self.pragmas = {**DEFAULT_PRAGMAS, 'query_only': read_only}
+        for name, value in (pragmas or {}).items():
+            if name not in SUPPORTED_PRAGMAS:
+                raise ConfigurationError(
+                    f"Unsupported SQLite pragma: {name}. Supported pragmas: {', '.join(sorted(SUPPORTED_PRAGMAS))}")
+            if not re.fullmatch(r'-?\w+', str(value)):
+                raise ConfigurationError(
+                    f"Invalid value for SQLite pragma {name}: {value}")
+            self.pragmas[name] = value
+        self.check_wal = check_wal
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
 
     def _get_connection(self):
+        """Return the calling thread's persistent connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _connect(self):
         try:
-            return sqlite3.connect(self.db_path)
+            if self.read_only and self.db_path != ':memory:':
+                uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+                conn = sqlite3.connect(
+                    uri, uri=True, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for name, value in self.pragmas.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                conn.execute(f"PRAGMA {name} = {value}")
+            if self.check_wal:
+                self._warn_without_wal(conn)
+            return conn
         except Exception as e:
             raise ConnectionError(
                 f"Failed to connect to SQLite database: {str(e)}")
 
+    def _warn_without_wal(self, conn):
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            print_warning(
+                f"SQLite database {self.db_path} uses journal_mode={journal_mode}. "
+                "Run 'PRAGMA journal_mode=WAL' on it so reads are not blocked by writers.")
+
+    def close(self):
+        """Close the persistent connections of every thread."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
     def get_table_list(self) -> List[Dict[str, str]]:
         try:
             with self._get_connection() as conn:
@@ -49,11 +114,11 @@ class SQLiteOperations(DatabaseOperations):
         except Exception as e:
             raise OperationError(f"Failed to get table info: {str(e)}")
 
-    def execute_query_with_column_names(self, query: str) -> Tuple[List[Tuple], List[str]]:
+    def execute_query_with_column_names(self, query: str, params: Optional[QueryParams] = None) -> Tuple[List[Tuple], List[str]]:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(query)
+                execute_cursor(cursor, query, params)
                 results = cursor.fetchall()
                 column_names = [description[0]
                                 for description in cursor.description]
@@ -61,6 +126,22 @@ class SQLiteOperations(DatabaseOperations):
         except Exception as e:
             raise OperationError(f"Failed to execute query: {str(e)}")
 
+    def stream_query_with_column_names(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, params: Optional[QueryParams] = None) -> QueryResultStream:
+        # The thread's connection is opened with check_same_thread=False, so the stream can be read from another thread
+        cursor = self._get_connection().cursor()
+        try:
+            execute_cursor(cursor, query, params)
+            column_names = [description[0]
+                            for description in cursor.description]
+        except Exception as e:
+            cursor.close()
+            raise OperationError(f"Failed to execute query: {str(e)}")
+
+        def close(exhausted):
+            cursor.close()
+
+        return QueryResultStream(column_names, fetch_batches(cursor, batch_size), close)
+
     def execute_query(self, query: str) -> List[Tuple]:
         try:
             with self._get_connection() as conn:
@@ -1,9 +1,19 @@
 import json
 from .server import create_app
 
+# Reused across invocations of a warm Lambda container
+_application = None
+
+
+def get_application():
+    global _application
+    if _application is None:
+        _application = create_app()
+    return _application
+
 
 def lambda_handler(event, context):
-    application = create_app()
+    application = get_application()
     with application.test_client() as client:
         http_method = event['httpMethod']
         path = event['path']
@@ -0,0 +1,62 @@
+from .prompt_compiler import context_prompt, cacheable_prompt
+from .sql_query_prompt import sql_query_guidelines, current_date_line
+
+
+def combined_query_prompt(query, context, db, sample_data, chat_history):
+    context_text = context_prompt(context)
+    # Everything before the chat history is the same for every question on a context, so it is cached
+    instructions = f"""In a single response, refine the user's question given at the end and write the SQL query that answers it.
+
+    1. Determine if the question can be answered using the given database structure, considering both the context and chat history if it exists.
+    2. If it can be answered:
+       a. Replace any ambiguous or colloquial terms with their corresponding database terms and write the refined question. In the refined question ALWAYS use "containing" for entity values, for example "users with name containing 'Linda'".
+       b. Provide a list of changes made to the original question.
+       c. Identify specific entities (column values) from the question that need to be validated against the full database. The sample data is only a small subset of the full dataset.
+       d. Write the SQL query for the refined question. Filter entity values with equality, using each value exactly as you listed it in the entities.
+       e. Give a very short explanation of your reasoning and the tables, columns and definitions you referenced.
+    3. If it cannot be answered based on the database structure, set can_be_answered to false and explain why in the explanation.
+
+    IMPORTANT: Only use tables and columns that are explicitly defined in the provided context.
+    Do not assume the existence of any tables or columns that are not listed.
+
+    {sql_query_guidelines(db)}
+
+    Please format your response as an XML as follows:
+
+    example:
+
+    <response>
+        <can_be_answered>true</can_be_answered>
+        <refined_query>Count the users in main.users with name containing 'Linda'</refined_query>
+        <changes>["Replaced 'people' with 'users in main.users'"]</changes>
+        <entities>[{{"table": "main.users", "column": "name", "potential_value": "Linda"}}]</entities>
+        <sql> SELECT COUNT(id) FROM main.users WHERE name = 'Linda' </sql>
+        <explanation>
+            Counts the users named Linda in the users table.
+        </explanation>
+        <references>
+            Tables: schema1.table1, schema2.table2
+            Columns: schema1.table1.column1, schema2.table2.column2
+            Definitions: definition1, definition2
+        </references>
+    </response>
+
+    changes and entities must be JSON arrays, use [] when there are none.
+    Follow the XML format strictly. Answer with only XML response as it will be parsed as xml, no other extra words or formatting."""
+    prefix = f"""
+    {context_text}
+
+    {sample_data}
+
+    {instructions}
+"""
+    suffix = f"""
+    {current_date_line()}
+
+    Chat History:
+    {chat_history}
+
+    The Query: "{query}"
+    """
+
+    return cacheable_prompt(prefix, suffix)
@@ -0,0 +1,68 @@
+from ..utils.file_utils import format_yaml_for_prompt
+
+# Key under which a loaded context keeps its serialized prompt text
+COMPILED_CONTEXT_KEY = 'formatted_context'
+
+
+def build_context_prompt(context):
+    """Serialize the tables, relationships and global definitions of a context for a prompt."""
+    context_prompt = "Database Context:\n\n"
+
+    # Format table information
+    context_prompt += "Tables:\n"
+    for table_name, table_data in context["tables"].items():
+        context_prompt += f"  {table_name}:\n"
+        context_prompt += format_yaml_for_prompt(
+            table_data).replace("\n", "\n    ")
+        context_prompt += "\n"
+
+    # Format relationships
+    context_prompt += "\nRelationships:\n"
+    context_prompt += format_yaml_for_prompt(context["relationships"]).replace(
+        "\n", "\n  "
+    )
+
+    # Format global definitions
+    context_prompt += "\nGlobal Definitions:\n"
+    context_prompt += format_yaml_for_prompt(context["global_definitions"]).replace(
+        "\n", "\n  "
+    )
+    return context_prompt
+
+
+def compile_context(context):
+    """Serialize the context once and keep the text in it for later prompts."""
+    context[COMPILED_CONTEXT_KEY] = build_context_prompt(context)
+    return context[COMPILED_CONTEXT_KEY]
+
+
+def context_prompt(context):
+    """The serialized context, rendered on the fly for contexts that were never compiled."""
+    compiled = context.get(COMPILED_CONTEXT_KEY)
+    if compiled is None:
+        return build_context_prompt(context)
+    return compiled
+
+
+class CacheablePrompt(str):
+    """Prompt text whose first prefix_length characters stay the same across requests on a context.
+
+    It is a plain string everywhere else; LLM clients that support prompt
+    caching send the prefix and the suffix as separate blocks.
+    """
+    prefix_length = 0
+
+    @property
+    def prefix(self) -> str:
+        return self[:self.prefix_length]
+
+    @property
+    def suffix(self) -> str:
+        return self[self.prefix_length:]
+
+
+def cacheable_prompt(prefix: str, suffix: str) -> CacheablePrompt:
+    """Join the static prefix and the per-request suffix of a prompt, marking the prefix as cacheable."""
+    result = CacheablePrompt(prefix + suffix)
+    result.prefix_length = len(prefix)
+    return result
@@ -1,14 +1,13 @@
+from .prompt_compiler import cacheable_prompt
+
+
 def query_refinement_prompt(formatted_context: str, sample_data: str, user_query: str, chat_history: str) -> str:
-    return f"""
+    prefix = f"""
     Given the following database context and sample data:
     {formatted_context}
     {sample_data}
-    The user has asked the following question:
-    "{user_query}"
-    Chat History:
-    {chat_history}
 
-    Your task is to:
+    The user's question and the chat history are given after these instructions. Your task is to:
     1. Determine if the question can potentially be answered using the given database structure, considering both the context and chat history if it exists.
     2. If it potentially can be answered:
        a. Identify any terms that might correspond to schema names, table names, column names, or data values.
@@ -51,6 +50,14 @@ def query_refinement_prompt(formatted_context: str, sample_data: str, user_query
             ...
         ]
     }}
+"""
+    suffix = f"""
+    The user has asked the following question:
+    "{user_query}"
+    Chat History:
+    {chat_history}
 
     Provide your response strictly in this JSON structure without any additional text.
     """
+
+    return cacheable_prompt(prefix, suffix)
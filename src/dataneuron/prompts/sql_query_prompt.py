@@ -1,7 +1,8 @@
 import datetime
 import json
-from ..utils.file_utils import format_yaml_for_prompt
+from functools import lru_cache
 from ..utils.date_functions import date_functions
+from .prompt_compiler import context_prompt, cacheable_prompt
 
 
 def get_date_format_functions(database):
@@ -26,6 +27,7 @@ def get_json_extract_functions(database):
         return "json extract function"
 
 
+@lru_cache(maxsize=None)
 def get_date_functions(db_name):
     if db_name in date_functions:
         return json.dumps(date_functions[db_name], indent=2)
@@ -33,6 +35,7 @@ def get_date_functions(db_name):
         return f"Apply the appropiate date function based on selected database."
 
 
+@lru_cache(maxsize=None)
 def get_sql_rules(db):
     common_rules = """
     - Keywords are case-insensitive but conventionally written in uppercase.
@@ -169,49 +172,16 @@ def get_sql_rules(db):
         return "Database type not recognized. Please specify 'postgres', 'mysql', 'mssql', or 'sqlite' or 'csv'"
 
 
-def sql_query_prompt(query, context, db):
-    context_prompt = "Database Context:\n\n"
-
-    given_db = 'duckdb' if db == 'csv' else db
-    # Format table information
-    context_prompt += "Tables:\n"
-    for table_name, table_data in context["tables"].items():
-        context_prompt += f"  {table_name}:\n"
-        context_prompt += format_yaml_for_prompt(
-            table_data).replace("\n", "\n    ")
-        context_prompt += "\n"
-
-    # Format relationships
-    context_prompt += "\nRelationships:\n"
-    context_prompt += format_yaml_for_prompt(context["relationships"]).replace(
-        "\n", "\n  "
-    )
-
-    # Format global definitions
-    context_prompt += "\nGlobal Definitions:\n"
-    context_prompt += format_yaml_for_prompt(context["global_definitions"]).replace(
-        "\n", "\n  "
-    )
+def current_date_line():
+    """The current date, given next to the question so the cached guidelines do not change daily."""
+    return f"Current Date: {datetime.datetime.now().strftime('%Y-%m-%d')}"
 
-    prompt = f"""
-    {context_prompt}
-
-    The Query: "{query}"
-
-    Based on the given database context and the given query, please provide:
-
-    1. A very short explanation of your reasoning process, including:
-       - How you interpreted the user's question
-       - Which tables and columns you chose to use and why
-       - Any assumptions you made or caveats.
-       - Any potential ambiguities in the query and how you resolved them
-    2. A list of the specific tables, columns, and definitions you referenced from the provided context.
-    3. The SQL query to answer the user's question.
-
-    IMPORTANT: Only use tables and columns that are explicitly defined in the provided context.
-    Do not assume the existence of any tables or columns that are not listed.
 
-    SQL query guidelines:
+@lru_cache(maxsize=None)
+def sql_query_guidelines(db):
+    """The SQL rules and date handling instructions for the given database type, rendered once."""
+    given_db = 'duckdb' if db == 'csv' else db
+    guidelines = f"""SQL query guidelines:
     - Only generate SELECT statements, non-write, non-destructive queries.
     - Only reference tables, coilumns given in the context.
     - Always use fully qualified table names (schema.table_name) in your SQL queries.
@@ -227,7 +197,7 @@ def sql_query_prompt(query, context, db):
         - Ensure to apply appropriate filters based on the column type, and if necessary, cast the column to the correct data type for accurate querying.
         - Prefer to use appropriate date functions to filter date columns instead of static date filters. If necessary, cast the column to date to ensure accurate filtering.
         - If you encounter any JSON format column, use appropriate functions({get_json_extract_functions(db)}) for JSON extraction based on the database.
-        - Current Date: {datetime.datetime.now().strftime('%Y-%m-%d')}
+        - Use the current date given with the query for relative dates.
         - Available Date SQL Functions(Only use date functions from the provided list):
             {get_date_functions(db)}
         -  When addressing questions that suggest the utilization of a date column with a specific time granularity, adhere to the following steps:
@@ -235,7 +205,27 @@ def sql_query_prompt(query, context, db):
             • For years, display them in the YYYY format.
             • For quarters, represent them as Q1 YYYY, Q2 YYYY, Q3 YYYY, or Q4 YYYY.
             • For months, use the abbreviated month names with year (e.g., Jan - YYYY, Feb - YYYY, ..., Dec - YYYY).
-            • For weeks, truncate the dates to a weekly basis.
+            • For weeks, truncate the dates to a weekly basis."""
+    return guidelines
+
+
+def sql_query_prompt(query, context, db):
+    context_text = context_prompt(context)
+    # Everything before the question is the same for every question on a context, so it is cached
+    instructions = f"""Based on the given database context and the query given at the end, please provide:
+
+    1. A very short explanation of your reasoning process, including:
+       - How you interpreted the user's question
+       - Which tables and columns you chose to use and why
+       - Any assumptions you made or caveats.
+       - Any potential ambiguities in the query and how you resolved them
+    2. A list of the specific tables, columns, and definitions you referenced from the provided context.
+    3. The SQL query to answer the user's question.
+
+    IMPORTANT: Only use tables and columns that are explicitly defined in the provided context.
+    Do not assume the existence of any tables or columns that are not listed.
+
+    {sql_query_guidelines(db)}
 
     Please format your response as an XML as follows:
 
@@ -253,7 +243,16 @@ def sql_query_prompt(query, context, db):
         </references>
     </response>
 
-    Follow the XML format strictly. Answer with only XML response as it will be parsed as xml, no other extra words or formatting.
+    Follow the XML format strictly. Answer with only XML response as it will be parsed as xml, no other extra words or formatting."""
+    prefix = f"""
+    {context_text}
+
+    {instructions}
+"""
+    suffix = f"""
+    {current_date_line()}
+
+    The Query: "{query}"
     """
 
-    return prompt
+    return cacheable_prompt(prefix, suffix)
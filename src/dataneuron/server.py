@@ -1,8 +1,9 @@
-from flask import Flask, request, jsonify, Response
-from .core.data_neuron import DataNeuron
+from flask import Flask, request, jsonify, Response, stream_with_context
+from .core.data_neuron import DataNeuron, DEFAULT_MAX_RESULT_ROWS
 from .core.dashboard_manager import DashboardManager
 from .core.context_loader import ContextLoader
-from .utils.serialization import ensure_serializable, convert_to_serializable
+from .core.dataneuron_pool import DataNeuronPool
+from .utils.serialization import ensure_serializable, convert_to_serializable, format_sse_event
 import traceback
 
 
@@ -12,15 +13,43 @@ def create_app(config=None):
     if config:
         app.config.from_object(config)
 
+    dataneuron_pool = DataNeuronPool(db_config='database.yaml',
+                                     check_interval=app.config.get('CONTEXT_CHECK_INTERVAL', 2.0),
+                                     read_only=app.config.get('SQLITE_READ_ONLY', True))
+    if app.config.get('WARM_CONTEXTS'):
+        dataneuron_pool.warm(app.config['WARM_CONTEXTS'])
+
     def get_dataneuron(context=None):
-        dataneuron = DataNeuron(db_config='database.yaml', context=context)
-        dataneuron.initialize()
-        return dataneuron
+        return dataneuron_pool.acquire(
+            context, max_result_rows=app.config.get('MAX_RESULT_ROWS', DEFAULT_MAX_RESULT_ROWS),
+            stream_sql=app.config.get('STREAM_SQL', False),
+            speculative_sql=app.config.get('SPECULATIVE_SQL', False),
+            combined_prompt=app.config.get('COMBINED_PROMPT', False),
+            max_prompt_tables=app.config.get('MAX_PROMPT_TABLES'),
+            filter_engine=app.config.get('FILTER_ENGINE', 'legacy'),
+            bind_filter_params=app.config.get('BIND_FILTER_PARAMS', False))
 
     def get_dashboard_manager():
         dashboard_manager = DashboardManager()
         return dashboard_manager
 
+    def wants_event_stream(data):
+        return bool(data.get('stream')) or \
+            request.accept_mimetypes.best == 'text/event-stream'
+
+    def event_stream_response(events):
+        def generate():
+            try:
+                for event, payload in events:
+                    yield format_sse_event(event, payload)
+            except Exception as e:
+                app.logger.error(
+                    f"Error in chat stream: {str(e)}", exc_info=True)
+                yield format_sse_event('error', {"message": str(e)})
+
+        return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
     @app.route('/chat', methods=['POST'])
     def chat():
         data = request.json
@@ -49,6 +78,9 @@ def create_app(config=None):
             if last_user_message is None:
                 return jsonify({"error": "No user message found"}), 400
 
+            if wants_event_stream(data):
+                return event_stream_response(dn.chat_stream(last_user_message))
+
             sql, response = dn.chat(last_user_message)
             serializable_response = ensure_serializable(response)
             return jsonify({"response": serializable_response, "sql": sql})
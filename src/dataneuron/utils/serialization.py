@@ -18,3 +18,8 @@ def ensure_serializable(obj):
             return ensure_serializable(obj.__dict__)
         else:
             return str(obj)
+
+
+def format_sse_event(event, data):
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(ensure_serializable(data), default=str)}\n\n"
@@ -3,39 +3,45 @@ from queue import Queue
 import click
 
 
-def process_simplified_xml(chunk, state):
+SIMPLIFIED_XML_TAGS = ('sql', 'explanation', 'references', 'note')
+TAG_PATTERNS = {
+    tag: re.compile(rf'<\s*{tag}\s*>(.*?)<\s*/\s*{tag}\s*>', re.DOTALL | re.IGNORECASE)
+    for tag in SIMPLIFIED_XML_TAGS
+}
+TAG_HEADINGS = {
+    'sql': ("Generated SQL Query:", "blue"),
+    'explanation': ("Explanation:", "green"),
+    'references': ("References:", "yellow"),
+    'note': ("Note:", "magenta"),
+}
+
+
+def parse_simplified_xml(chunk, state):
+    """Add a streamed chunk to state['buffer'] and return (tag, content) for every tag closed so far, in order."""
     state['buffer'] += chunk
+    completed = []
+    while True:
+        earliest = None
+        for tag, pattern in TAG_PATTERNS.items():
+            match = pattern.search(state['buffer'])
+            if match and (earliest is None or match.start() < earliest[1].start()):
+                earliest = (tag, match)
+        if earliest is None:
+            return completed
+        tag, match = earliest
+        completed.append((tag, match.group(1).strip()))
+        state['buffer'] = state['buffer'][match.end():]
 
-    # Process SQL tag
-    sql_match = re.search(r'<\s*sql\s*>(.*?)<\s*/\s*sql\s*>',
-                          state['buffer'], re.DOTALL | re.IGNORECASE)
-    if sql_match:
-        sql_content = sql_match.group(1).strip()
-        click.echo(click.style("\nGenerated SQL Query:", fg="blue", bold=True))
-        click.echo(sql_content)
-        state['buffer'] = state['buffer'][sql_match.end():]
-        if sql_content and not state['query_executed']:
-            state['sql_query'] = sql_content
-            state['sql_queue'].put(sql_content)
-            state['query_executed'] = True
 
-    # Process explanation tag
-    explanation_match = re.search(
-        r'<\s*explanation\s*>(.*?)<\s*/\s*explanation\s*>', state['buffer'], re.DOTALL | re.IGNORECASE)
-    if explanation_match:
-        explanation_content = explanation_match.group(1).strip()
-        click.echo(click.style("\nExplanation:", fg="green", bold=True))
-        click.echo(explanation_content)
-        state['buffer'] = state['buffer'][explanation_match.end():]
-
-    # Process references tag
-    references_match = re.search(
-        r'<\s*references\s*>(.*?)<\s*/\s*references\s*>', state['buffer'], re.DOTALL | re.IGNORECASE)
-    if references_match:
-        references_content = references_match.group(1).strip()
-        click.echo(click.style("\nReferences:", fg="yellow", bold=True))
-        click.echo(references_content)
-        state['buffer'] = state['buffer'][references_match.end():]
+def process_simplified_xml(chunk, state):
+    for tag, content in parse_simplified_xml(chunk, state):
+        heading, color = TAG_HEADINGS[tag]
+        click.echo(click.style(f"\n{heading}", fg=color, bold=True))
+        click.echo(content)
+        if tag == 'sql' and content and not state.get('query_executed'):
+            state['sql_query'] = content
+            state['sql_queue'].put(content)
+            state['query_executed'] = True
 
 
 def stream_and_print_simplified_xml(chunks):
@@ -0,0 +1,64 @@
+import json
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.api import claude_api
+from dataneuron.prompts.sql_query_prompt import sql_query_prompt
+
+CONTEXT = {
+    'tables': {'main.users': {'name': 'users', 'columns': [{'name': 'id'}]}},
+    'relationships': [],
+    'global_definitions': {}
+}
+
+
+@patch.dict(os.environ, {'CLAUDE_API_KEY': 'key'})
+class TestClaudePromptCaching(unittest.TestCase):
+    def test_context_prefix_is_sent_as_cached_block(self):
+        prompt = sql_query_prompt("how many users", CONTEXT, 'sqlite')
+        response = MagicMock()
+        response.json.return_value = {
+            'content': [{'text': '<sql>SELECT 1</sql>'}], 'stop_reason': 'end_turn',
+            'usage': {'input_tokens': 10, 'cache_read_input_tokens': 900, 'output_tokens': 5}
+        }
+
+        with patch('dataneuron.api.claude_api.make_api_call', return_value=response) as make_api_call, \
+                self.assertLogs('dataneuron.api.claude_api', level='INFO') as logs:
+            claude_api.call_claude_api_with_pagination(prompt)
+
+        data, headers = make_api_call.call_args[0]
+        prefix_block, suffix_block = data['messages'][0]['content']
+        self.assertEqual(prefix_block['cache_control'], {'type': 'ephemeral'})
+        self.assertIn("main.users", prefix_block['text'])
+        self.assertIn("SQL query guidelines", prefix_block['text'])
+        self.assertIn("Follow the XML format strictly", prefix_block['text'])
+        self.assertNotIn("how many users", prefix_block['text'])
+        self.assertEqual(prefix_block['text'] + suffix_block['text'], prompt)
+        self.assertIn("prompt-caching", headers['Anthropic-Beta'])
+        self.assertIn("cache_read_input_tokens=900", logs.output[0])
+
+    def test_plain_prompts_are_sent_as_text(self):
+        self.assertEqual(claude_api.build_user_content("hello"), "hello")
+
+    def test_stream_logs_usage(self):
+        events = [
+            {'type': 'message_start', 'message': {'usage': {'input_tokens': 3, 'cache_creation_input_tokens': 800}}},
+            {'type': 'content_block_delta', 'delta': {'text': 'Hi'}},
+            {'type': 'message_delta', 'usage': {'output_tokens': 1}},
+            {'type': 'message_stop'},
+        ]
+        response = MagicMock()
+        response.iter_lines.return_value = [
+            f"data: {json.dumps(event)}".encode() for event in events]
+
+        with patch('dataneuron.api.claude_api.make_api_call', return_value=response), \
+                self.assertLogs('dataneuron.api.claude_api', level='INFO') as logs:
+            chunks = list(claude_api.stream_claude_response("hello"))
+
+        self.assertEqual(chunks, ['Hi'])
+        self.assertIn("cache_creation_input_tokens=800", logs.output[0])
+        self.assertIn("output_tokens=1", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
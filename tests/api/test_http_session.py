@@ -0,0 +1,50 @@
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.api import http_session
+from dataneuron.api.claude_api import make_api_call
+from dataneuron.api import openai_api
+
+
+class TestHttpSession(unittest.TestCase):
+    def setUp(self):
+        http_session.reset_session()
+        self.addCleanup(http_session.reset_session)
+
+    def test_session_is_shared(self):
+        self.assertIs(http_session.get_session(), http_session.get_session())
+
+    @patch.dict(os.environ, {'DATA_NEURON_HTTP_RETRIES': '5', 'DATA_NEURON_HTTP_POOL_SIZE': '4'})
+    def test_adapter_retries_rate_limits(self):
+        adapter = http_session.get_session().get_adapter('https://api.anthropic.com')
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn('POST', adapter.max_retries.allowed_methods)
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+    @patch.dict(os.environ, {'DATA_NEURON_HTTP_READ_TIMEOUT': '60'})
+    def test_claude_call_uses_session_with_timeout(self):
+        session = MagicMock()
+        with patch('dataneuron.api.http_session.get_session', return_value=session):
+            make_api_call({'model': 'm'}, {'x-api-key': 'key'})
+        _, kwargs = session.post.call_args
+        self.assertEqual(kwargs['timeout'], (10.0, 60.0))
+        session.post.return_value.raise_for_status.assert_called_once()
+
+
+class TestOpenAIClientReuse(unittest.TestCase):
+    def setUp(self):
+        openai_api._create_client.cache_clear()
+        self.addCleanup(openai_api._create_client.cache_clear)
+
+    @patch.dict(os.environ, {'DATA_NEURON_LLM': 'custom', 'DATA_NEURON_LLM_API_KEY': 'key',
+                             'DATA_NEURON_LLM_ENDPOINT': 'http://localhost:8000/v1'})
+    @patch('dataneuron.api.openai_api.OpenAI')
+    def test_client_is_reused(self, mock_openai):
+        self.assertIs(openai_api.get_client(), openai_api.get_client())
+        mock_openai.assert_called_once_with(
+            api_key='key', base_url='http://localhost:8000/v1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.api.llm_cache import LLMCache, make_cache_key, reset_llm_cache
+from dataneuron.api.main import call_neuron_api, stream_neuron_api
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.disk_path = os.path.join(self.tmp_dir.name, 'llm_cache.db')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_every_part(self):
+        key = make_cache_key('claude', 'model', 'system', 'prompt')
+        self.assertNotEqual(key, make_cache_key(
+            'openai', 'model', 'system', 'prompt'))
+        self.assertNotEqual(key, make_cache_key(
+            'claude', 'model', 'systemprompt', ''))
+
+    def test_disk_tier_is_shared(self):
+        LLMCache(disk_path=self.disk_path).set('key', 'response')
+        other_worker = LLMCache(disk_path=self.disk_path)
+        self.assertEqual(other_worker.get('key'), 'response')
+        self.assertEqual(other_worker.get('key'), 'response')
+        stats = other_worker.stats()
+        self.assertEqual(stats['disk_hits'], 1)
+        self.assertEqual(stats['memory_hits'], 1)
+        self.assertEqual(stats['misses'], 0)
+
+    @patch('dataneuron.api.llm_cache.time.time')
+    def test_disk_entries_expire(self, mock_time):
+        mock_time.return_value = 1000.0
+        LLMCache(ttl=60, disk_path=self.disk_path).set('key', 'response')
+        mock_time.return_value = 1061.0
+        self.assertIsNone(LLMCache(ttl=60, disk_path=self.disk_path).get('key'))
+
+
+class TestCallNeuronApiCache(unittest.TestCase):
+    def setUp(self):
+        reset_llm_cache()
+        self.call_api = MagicMock(return_value="<sql>SELECT 1</sql>")
+        patcher = patch('dataneuron.api.main.get_api_functions',
+                        return_value=(self.call_api, None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(reset_llm_cache)
+
+    @patch.dict(os.environ, {'DATA_NEURON_LLM': 'claude', 'DATA_NEURON_LLM_CACHE': 'true'})
+    def test_repeated_prompt_is_served_from_cache(self):
+        self.assertEqual(call_neuron_api("question", use_cache=True), "<sql>SELECT 1</sql>")
+        self.assertEqual(call_neuron_api("question", use_cache=True), "<sql>SELECT 1</sql>")
+        call_neuron_api("question", instruction_prompt="other system prompt", use_cache=True)
+        call_neuron_api("question", include_context=True, use_cache=True)
+        self.assertEqual(self.call_api.call_count, 3)
+
+    @patch.dict(os.environ, {'DATA_NEURON_LLM': 'claude', 'DATA_NEURON_LLM_CACHE': 'true'})
+    def test_not_cached_by_default(self):
+        call_neuron_api("question", use_cache=True)
+        call_neuron_api("question")
+        call_neuron_api("question")
+        self.assertEqual(self.call_api.call_count, 3)
+
+    @patch.dict(os.environ, {'DATA_NEURON_LLM': 'claude', 'DATA_NEURON_LLM_CACHE': 'true'})
+    def test_stream_is_cached_when_complete(self):
+        stream = MagicMock(side_effect=lambda *args: iter(["<sql>", "SELECT 1", "</sql>"]))
+        with patch('dataneuron.api.main.get_api_functions', return_value=(None, None, stream)):
+            first = list(stream_neuron_api("question", use_cache=True))
+            second = list(stream_neuron_api("question", use_cache=True))
+        self.assertEqual(first, ["<sql>", "SELECT 1", "</sql>"])
+        self.assertEqual(second, ["<sql>SELECT 1</sql>"])
+        self.assertEqual(stream.call_count, 1)
+
+    @patch.dict(os.environ, {'DATA_NEURON_LLM': 'claude'})
+    def test_disabled_unless_enabled_in_the_environment(self):
+        os.environ.pop('DATA_NEURON_LLM_CACHE', None)
+        call_neuron_api("question", use_cache=True)
+        call_neuron_api("question", use_cache=True)
+        self.assertEqual(self.call_api.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from dataneuron.core.sql_query_filter import SQLQueryFilter
+from dataneuron.core.sql_query_filters.ast_filter import ASTClientFilter
+import unittest
+import test_sql_query_filter as legacy_tests
+
+
+class TestASTEngineMatchesLegacy(legacy_tests.TestSQLQueryFilter):
+    def setUp(self):
+        super().setUp()
+        self.filter = SQLQueryFilter(
+            self.client_tables, schemas=['main', 'inventory'], engine='ast')
+
+    def test_schema_qualified_names(self):
+        query = 'SELECT * FROM main.orders'
+        expected = 'SELECT * FROM main.orders WHERE "main"."orders"."user_id" = 1'
+        self.assertEqual(self.filter.apply_client_filter(query, 1), expected)
+
+    def test_subquery_in_join(self):
+        query = 'SELECT o.* FROM orders o JOIN (SELECT * FROM products) p ON o.product_id = p.id'
+        expected = 'SELECT o.* FROM orders o JOIN (SELECT * FROM products WHERE "products"."company_id" = 1) p ON o.product_id = p.id WHERE "o"."user_id" = 1'
+        self.assertEqual(self.filter.apply_client_filter(query, 1), expected)
+
+
+class TestASTEngineCTE(legacy_tests.TestSQLQueryFilterCTE):
+    def setUp(self):
+        super().setUp()
+        self.filter = SQLQueryFilter(
+            self.client_tables, schemas=['main', 'inventory'], engine='ast')
+
+
+class TestASTClientFilter(unittest.TestCase):
+    def setUp(self):
+        self.filter = ASTClientFilter(
+            {'main.orders': 'user_id', 'main.users': 'id', 'main.products': 'company_id'})
+
+    def test_or_condition_is_wrapped(self):
+        query = "SELECT * FROM orders WHERE status = 'open' OR total > 5 ORDER BY total LIMIT 3"
+        expected = "SELECT * FROM orders WHERE (status = 'open' OR total > 5) AND \"orders\".\"user_id\" = 1 ORDER BY total LIMIT 3"
+        self.assertEqual(self.filter.apply_client_filter(query, 1), expected)
+
+    def test_cte_references_are_not_filtered(self):
+        query = 'WITH recent AS (SELECT * FROM orders) SELECT * FROM recent JOIN products p ON p.id = recent.product_id'
+        expected = 'WITH recent AS (SELECT * FROM orders WHERE "orders"."user_id" = 1) SELECT * FROM recent JOIN products p ON p.id = recent.product_id WHERE "p"."company_id" = 1'
+        self.assertEqual(self.filter.apply_client_filter(query, 1), expected)
+
+    def test_recursive_cte(self):
+        query = 'WITH RECURSIVE r (n) AS (SELECT id FROM users UNION ALL SELECT n FROM r WHERE n < 3) SELECT * FROM r'
+        expected = 'WITH RECURSIVE r (n) AS (SELECT id FROM users WHERE "users"."id" = 1 UNION ALL SELECT n FROM r WHERE n < 3) SELECT * FROM r'
+        self.assertEqual(self.filter.apply_client_filter(query, 1), expected)
+
+    def test_correlated_subqueries(self):
+        query = 'SELECT name, (SELECT COUNT(*) FROM orders o WHERE o.user_id = u.id) FROM users u WHERE EXISTS (SELECT 1 FROM products)'
+        expected = ('SELECT name, (SELECT COUNT(*) FROM orders o WHERE o.user_id = u.id AND "o"."user_id" = 1) FROM users u '
+                    'WHERE EXISTS (SELECT 1 FROM products WHERE "products"."company_id" = 1) AND "u"."id" = 1')
+        self.assertEqual(self.filter.apply_client_filter(query, 1), expected)
+
+    def test_set_operations_with_trailing_clauses(self):
+        query = 'SELECT id FROM orders UNION SELECT id FROM products INTERSECT SELECT id FROM users ORDER BY 1;'
+        expected = ('SELECT id FROM orders WHERE "orders"."user_id" = 1 UNION SELECT id FROM products WHERE "products"."company_id" = 1 '
+                    'INTERSECT SELECT id FROM users WHERE "users"."id" = 1 ORDER BY 1;')
+        self.assertEqual(self.filter.apply_client_filter(query, 1), expected)
+
+    def test_filtered_tables(self):
+        self.filter.apply_client_filter('SELECT * FROM orders, products', 1)
+        self.assertEqual(self.filter.filtered_tables, {'main.orders', 'main.products'})
+
+    def test_clickhouse_prewhere(self):
+        query_filter = ASTClientFilter({'main.orders': 'user_id'}, db_type='clickhouse')
+        query = 'SELECT count() FROM (SELECT * FROM orders WHERE total > 5 GROUP BY id) AS s'
+        expected = 'SELECT count() FROM (SELECT * FROM orders PREWHERE "orders"."user_id" = 1 WHERE total > 5 GROUP BY id) AS s'
+        self.assertEqual(query_filter.apply_client_filter(query, 1), expected)
+
+    def test_existing_prewhere_keeps_where(self):
+        query_filter = ASTClientFilter({'main.orders': 'user_id'}, db_type='clickhouse')
+        query = 'SELECT * FROM orders PREWHERE status = 1 WHERE total > 5'
+        expected = 'SELECT * FROM orders PREWHERE status = 1 WHERE total > 5 AND "orders"."user_id" = 1'
+        self.assertEqual(query_filter.apply_client_filter(query, 1), expected)
+
+    def test_mssql_brackets(self):
+        query_filter = ASTClientFilter({'dbo.orders': 'user_id'}, schemas=['dbo'], db_type='mssql')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM dbo.orders', 1),
+                         'SELECT * FROM dbo.orders WHERE [dbo].[orders].[user_id] = 1')
+
+    def test_quoted_references(self):
+        query_filter = ASTClientFilter({'dbo.orders': 'user_id'}, schemas=['dbo'], db_type='mssql')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM [dbo].[orders]', 1),
+                         'SELECT * FROM [dbo].[orders] WHERE [dbo].[orders].[user_id] = 1')
+        query_filter = ASTClientFilter({'shop.orders': 'user_id'}, schemas=['shop'], db_type='mysql')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM `shop`.`orders` o', 1),
+                         'SELECT * FROM `shop`.`orders` o WHERE `o`.`user_id` = 1')
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            SQLQueryFilter({}, engine='fast')
+
+
+if __name__ == '__main__':
+    unittest.main()
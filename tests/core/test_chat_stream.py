@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.core.data_neuron import DataNeuron
+from dataneuron.db_operations.sqlite import SQLiteOperations
+
+LLM_CHUNKS = [
+    "<response><s", "ql>SELECT id FROM orders ORDER BY id</s", "ql>",
+    "<explanation>Lists order ids.</explanation>",
+    "<references>Tables: orders</references></response>"
+]
+
+
+class TestChatStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp_dir.name, 'orders.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE orders (id INTEGER)")
+        conn.executemany("INSERT INTO orders VALUES (?)",
+                         [(i,) for i in range(5)])
+        conn.commit()
+        conn.close()
+
+        self.dn = DataNeuron(db_config=None, context={'tables': {}})
+        self.dn.db = SQLiteOperations(db_path)
+        self.dn.query_refiner = MagicMock()
+        self.dn.query_refiner.refine_query.return_value = (
+            "List order ids", [], [], [])
+
+        patcher = patch('dataneuron.core.data_neuron.sql_query_prompt',
+                        return_value="prompt")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.dn.db.close()
+        self.tmp_dir.cleanup()
+
+    @patch('dataneuron.core.data_neuron.stream_neuron_api', return_value=iter(LLM_CHUNKS))
+    def test_stage_events(self, mock_stream):
+        events = list(self.dn.chat_stream("order ids?", batch_size=2))
+        names = [event for event, _ in events if event != 'token']
+        self.assertEqual(names, ['refined_question', 'sql', 'explanation', 'references',
+                                 'columns', 'rows', 'rows', 'rows', 'done'])
+        data = dict((event, payload) for event, payload in events)
+        self.assertEqual(data['sql'], {"sql": "SELECT id FROM orders ORDER BY id"})
+        self.assertEqual(data['columns'], {"column_names": ['id']})
+        self.assertEqual(data['done']['row_count'], 5)
+        self.assertEqual(self.dn.chat_history[-1]['role'], 'assistant')
+
+    @patch('dataneuron.core.data_neuron.stream_neuron_api', return_value=iter(LLM_CHUNKS))
+    def test_max_result_rows(self, mock_stream):
+        self.dn.max_result_rows = 3
+        rows = [payload['rows'] for event, payload in self.dn.chat_stream("order ids?", batch_size=2)
+                if event == 'rows']
+        self.assertEqual(rows, [[(0,), (1,)], [(2,)]])
+
+    @patch('dataneuron.core.data_neuron.stream_neuron_api', return_value=iter(["I cannot answer that."]))
+    def test_missing_sql_ends_with_error(self, mock_stream):
+        events = list(self.dn.chat_stream("order ids?"))
+        self.assertEqual(events[-1][0], 'error')
+
+    def test_query_runs_while_the_response_streams(self):
+        executed = threading.Event()
+        open_stream = self.dn.db.stream_query_with_column_names
+
+        def execute(*args, **kwargs):
+            executed.set()
+            return open_stream(*args, **kwargs)
+
+        def llm_stream(prompt, use_cache=False):
+            yield from LLM_CHUNKS[:3]
+            self.assertTrue(executed.wait(timeout=5))
+            yield from LLM_CHUNKS[3:]
+
+        with patch.object(self.dn.db, 'stream_query_with_column_names', side_effect=execute), \
+                patch('dataneuron.core.data_neuron.stream_neuron_api', side_effect=llm_stream):
+            events = list(self.dn.chat_stream("order ids?"))
+        self.assertEqual(events[-1], ('done', {"sql": "SELECT id FROM orders ORDER BY id", "row_count": 5}))
+
+    @patch('dataneuron.core.data_neuron.call_neuron_api', return_value="".join(LLM_CHUNKS))
+    @patch('dataneuron.core.data_neuron.stream_neuron_api', side_effect=lambda *args, **kwargs: iter(LLM_CHUNKS))
+    def test_chat_and_chat_stream_record_the_same_history(self, mock_stream, mock_call):
+        self.dn.chat("order ids?")
+        chat_history = self.dn.chat_history
+        self.dn.set_chat_history([])
+        list(self.dn.chat_stream("order ids?"))
+
+        self.assertEqual(self.dn.chat_history, chat_history)
+        self.assertEqual([msg['role'] for msg in chat_history], ['user', 'assistant'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.core.data_neuron import DataNeuron
+from dataneuron.core.query_refiner import QueryRefiner
+
+CONTEXT = {
+    'tables': {'main.users': {'name': 'users', 'columns': [{'name': 'name'}]}},
+    'relationships': [],
+    'global_definitions': {}
+}
+
+COMBINED_RESPONSE = """<response>
+    <can_be_answered>true</can_be_answered>
+    <refined_query>Count the users in main.users with name containing 'Linda'</refined_query>
+    <changes>["Replaced 'people' with 'users in main.users'"]</changes>
+    <entities>[{"table": "main.users", "column": "name", "potential_value": "Linda"}]</entities>
+    <sql>SELECT COUNT(*) FROM main.users WHERE name = 'Linda'</sql>
+    <explanation>Counts users named Linda.</explanation>
+</response>"""
+
+
+class TestCombinedPrompt(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.db_type = 'sqlite'
+        self.db.execute_query_with_column_names.return_value = (
+            [(1,)], ['count'])
+        self.dn = DataNeuron(db_config=None, context=CONTEXT,
+                             combined_prompt=True)
+        self.dn.db = self.db
+        self.dn.query_refiner = QueryRefiner(CONTEXT, self.db, None)
+
+        patcher = patch('dataneuron.core.query_refiner.call_neuron_api',
+                        return_value=COMBINED_RESPONSE)
+        self.refiner_api = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('dataneuron.core.data_neuron.call_neuron_api',
+                        return_value="<sql>SELECT COUNT(*) FROM main.users WHERE name = 'Linda Smith'</sql>")
+        self.sql_api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_exact_entity_match_needs_one_call(self):
+        self.db.execute_query_with_column_names.return_value = ([('Linda',)], ['name'])
+        result = self.dn.query("how many people called Linda")
+
+        self.assertEqual(
+            result['sql'], "SELECT COUNT(*) FROM main.users WHERE name = 'Linda'")
+        self.assertEqual(result['refinement_changes'], [
+                         "Replaced 'people' with 'users in main.users'"])
+        self.assertEqual(self.refiner_api.call_count, 1)
+        self.sql_api.assert_not_called()
+
+    def test_mismatched_entity_reprompts(self):
+        self.db.execute_query_with_column_names.return_value = ([('Linda Smith',)], ['name'])
+        result = self.dn.query("how many people called Linda")
+
+        self.assertEqual(
+            result['refined_question'], "Count the users in main.users with name equal to 'Linda Smith'")
+        self.assertEqual(
+            result['sql'], "SELECT COUNT(*) FROM main.users WHERE name = 'Linda Smith'")
+        self.sql_api.assert_called_once()
+
+    def test_unanswerable_question(self):
+        self.refiner_api.return_value = "<response><can_be_answered>false</can_be_answered>" \
+            "<explanation>No revenue data.</explanation></response>"
+        result = self.dn.query("what is our revenue")
+        self.assertIsNone(result['sql'])
+        self.sql_api.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
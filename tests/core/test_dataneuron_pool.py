@@ -0,0 +1,148 @@
+import gc
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+import yaml
+from unittest.mock import patch
+from dataneuron.core.dataneuron_pool import DataNeuronPool
+from dataneuron.db_operations.exceptions import OperationError
+
+
+class TestDataNeuronPool(unittest.TestCase):
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+
+        conn = sqlite3.connect('test.db')
+        conn.execute("CREATE TABLE orders (id INTEGER, user_id INTEGER)")
+        conn.commit()
+        conn.close()
+
+        with open('database.yaml', 'w') as f:
+            yaml.dump({'database': {'name': 'sqlite', 'db_path': 'test.db'}}, f)
+
+        os.makedirs(os.path.join('context', 'sales', 'tables'))
+        with open(os.path.join('context', 'sales', 'tables', 'orders.yaml'), 'w') as f:
+            yaml.dump({'table_name': 'orders', 'full_name': 'main.orders'}, f)
+        with open(os.path.join('context', 'sales', 'client_info.yaml'), 'w') as f:
+            yaml.dump({'schemas': ['main'], 'tables': {
+                      'main.orders': 'user_id'}}, f)
+
+        self.pool = DataNeuronPool(db_config='database.yaml', check_interval=0)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        self.tmp_dir.cleanup()
+
+    def test_handles_share_state(self):
+        first = self.pool.acquire('sales')
+        second = self.pool.acquire('sales')
+        self.assertIsNot(first, second)
+        self.assertIs(first.db, second.db)
+        self.assertIs(first.context, second.context)
+        self.assertIs(first.query_refiner, second.query_refiner)
+        self.assertIs(first.filter.resolver, second.filter.resolver)
+        self.assertIn('main.orders', first.context['tables'])
+
+    def test_handles_keep_request_state_local(self):
+        first = self.pool.acquire('sales')
+        second = self.pool.acquire('sales')
+        first.set_client_context(7)
+        first.set_chat_history([{'role': 'user', 'content': 'hi'}])
+        self.assertIsNone(second.current_client_id)
+        self.assertEqual(second.chat_history, [])
+        self.assertIsNot(first.filter, second.filter)
+        self.assertEqual(
+            first.client_filtered_query('SELECT * FROM orders'),
+            'SELECT * FROM orders WHERE "orders"."user_id" = 7')
+
+    def test_bound_client_filter(self):
+        conn = sqlite3.connect('test.db')
+        conn.execute("INSERT INTO orders VALUES (1, 7), (2, 8)")
+        conn.commit()
+        conn.close()
+        dn = self.pool.acquire('sales', bind_filter_params=True)
+        dn.set_client_context(7)
+        result, column_names = dn.execute_query_with_column_names('SELECT id FROM orders')
+        self.assertEqual(result, [(1,)])
+        self.assertEqual(dn._bind_client_filter('SELECT id FROM orders'),
+                         ('SELECT id FROM orders WHERE "orders"."user_id" = ?', [7]))
+
+    def _touch_context(self):
+        table_path = os.path.join('context', 'sales', 'tables', 'orders.yaml')
+        with open(table_path, 'w') as f:
+            yaml.dump({'table_name': 'orders', 'full_name': 'main.orders',
+                       'description': 'All orders'}, f)
+        stat = os.stat(table_path)
+        os.utime(table_path, ns=(stat.st_atime_ns,
+                 stat.st_mtime_ns + int(time.time())))
+
+    def test_context_change_invalidates_state(self):
+        state = self.pool.get_state('sales')
+        close = patch.object(state.db, 'close', wraps=state.db.close).start()
+        self.addCleanup(patch.stopall)
+        self._touch_context()
+
+        new_state = self.pool.get_state('sales')
+        self.assertIsNot(state, new_state)
+        self.assertEqual(
+            new_state.context['tables']['main.orders']['description'], 'All orders')
+        self.assertEqual(len(self.pool._states), 1)
+        close.assert_called_once()
+        self.assertIsNot(new_state.db, state.db)
+
+    def test_replaced_state_stays_open_for_live_handles(self):
+        dn = self.pool.acquire('sales')
+        state = self.pool.get_state('sales')
+        close = patch.object(state.db, 'close', wraps=state.db.close).start()
+        self.addCleanup(patch.stopall)
+        self._touch_context()
+
+        self.assertIsNot(self.pool.get_state('sales'), state)
+        close.assert_not_called()
+        result, _ = dn.execute_query_with_column_names('SELECT COUNT(*) FROM orders')
+        self.assertEqual(result, [(0,)])
+
+        del dn
+        gc.collect()
+        close.assert_called_once()
+
+    def test_context_files_are_checked_once_per_interval(self):
+        pool = DataNeuronPool(db_config='database.yaml', check_interval=60)
+        state = pool.get_state('sales')
+        self._touch_context()
+        with patch.object(pool, 'fingerprint') as fingerprint:
+            self.assertIs(pool.get_state('sales'), state)
+        fingerprint.assert_not_called()
+
+    def test_set_context_does_not_change_shared_refiner(self):
+        first = self.pool.acquire('sales')
+        second = self.pool.acquire('sales')
+        shared_refiner = second.query_refiner
+        first.set_context({'tables': {}})
+        self.assertIsNot(first.query_refiner, shared_refiner)
+        self.assertIs(second.query_refiner, shared_refiner)
+        self.assertIn('main.orders', shared_refiner.context['tables'])
+
+    def test_read_only_is_opt_in(self):
+        self.assertFalse(self.pool.get_state('sales').db.read_only)
+        pool = DataNeuronPool(db_config='database.yaml', read_only=True)
+        self.addCleanup(pool.clear)
+        db = pool.get_state('sales').db
+        self.assertTrue(db.read_only)
+        with self.assertRaises(OperationError):
+            db.execute_query("DELETE FROM orders")
+
+    def test_without_context(self):
+        dn = self.pool.acquire()
+        result, columns = dn.execute_query_with_column_names(
+            'SELECT COUNT(*) AS total FROM orders')
+        self.assertEqual(columns, ['total'])
+        self.assertEqual(result, [(0,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
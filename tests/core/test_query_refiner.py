@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from dataneuron.core.query_refiner import QueryRefiner
+
+CONTEXT = {
+    'tables': {'main.orders': {}, 'main.countries': {}},
+    'client_info': {'tables': {'main.orders': 'customer_id'}}
+}
+
+
+class TestEntityCache(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.db_type = 'sqlite'
+        self.db.execute_query_with_column_names.return_value = (
+            [('Germany',)], ['country'])
+        self.refiner = QueryRefiner(CONTEXT, self.db, None)
+
+    def test_repeated_lookups_hit_the_cache(self):
+        entity = {'table': 'main.customers',
+                  'column': 'country', 'potential_value': 'germany'}
+        self.refiner.validate_and_refine_entities([entity])
+        _, refined, _ = self.refiner.validate_and_refine_entities(
+            [dict(entity, potential_value=' Germany ')])
+
+        self.assertEqual(refined[0]['matches'], ['Germany'])
+        self.db.execute_query_with_column_names.assert_called_once()
+        self.assertEqual(self.refiner.entity_cache.stats()['hit_ratio'], 0.5)
+
+    def test_client_tables_are_cached_per_client(self):
+        entity = {'table': 'main.orders',
+                  'column': 'status', 'potential_value': 'open'}
+        self.refiner.validate_and_refine_entities([entity], client_id=1)
+        self.refiner.validate_and_refine_entities([entity], client_id=2)
+        self.refiner.validate_and_refine_entities([entity], client_id=1)
+
+        self.assertEqual(self.db.execute_query_with_column_names.call_count, 2)
+
+    def test_unqualified_and_unknown_tables_are_cached_per_client(self):
+        for table in ('orders', 'main.invoices'):
+            entity = {'table': table, 'column': 'status', 'potential_value': 'open'}
+            self.refiner.validate_and_refine_entities([entity], client_id=1)
+            self.refiner.validate_and_refine_entities([entity], client_id=2)
+        self.assertEqual(self.db.execute_query_with_column_names.call_count, 4)
+
+    def test_shared_tables_are_cached_across_clients(self):
+        entity = {'table': 'countries', 'column': 'name', 'potential_value': 'germany'}
+        self.refiner.validate_and_refine_entities([entity], client_id=1)
+        self.refiner.validate_and_refine_entities([entity], client_id=2)
+        self.db.execute_query_with_column_names.assert_called_once()
+
+    def test_misses_are_cached_and_context_change_clears(self):
+        self.db.execute_query_with_column_names.return_value = ([], ['name'])
+        entity = {'table': 'main.users',
+                  'column': 'name', 'potential_value': 'zed'}
+        self.refiner.validate_and_refine_entities([entity])
+        is_valid, _, invalid = self.refiner.validate_and_refine_entities(
+            [entity])
+        self.assertFalse(is_valid)
+        self.assertEqual(invalid, [entity])
+        self.db.execute_query_with_column_names.assert_called_once()
+
+        self.refiner.update_context(CONTEXT)
+        self.refiner.validate_and_refine_entities([entity])
+        self.assertEqual(self.db.execute_query_with_column_names.call_count, 2)
+
+
+class TestRefinementCache(unittest.TestCase):
+    @patch('dataneuron.core.query_refiner.call_neuron_api',
+           return_value='{"can_be_answered": true, "refined_query": "q"}')
+    def test_follow_ups_skip_the_response_cache(self, call_api):
+        refiner = QueryRefiner(dict(CONTEXT, relationships=[], global_definitions={}),
+                               MagicMock(db_type='sqlite'), None)
+        refiner.refine_query("how many orders")
+        refiner.refine_query("and last month?", "user: how many orders")
+        self.assertEqual([c.kwargs['use_cache'] for c in call_api.call_args_list], [True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
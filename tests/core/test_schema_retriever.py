@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from dataneuron.core.schema_retriever import SchemaRetriever, tokenize
+from dataneuron.core.data_neuron import DataNeuron
+from dataneuron.core.query_refiner import QueryRefiner
+from dataneuron.prompts.prompt_compiler import COMPILED_CONTEXT_KEY
+
+
+def make_table(name, columns, description=''):
+    return {'table_name': name, 'full_name': f'main.{name}', 'description': description,
+            'columns': [{'name': column} for column in columns]}
+
+
+CONTEXT = {
+    'tables': {
+        'main.customers': make_table('customers', ['id', 'name', 'country'], 'People who buy from us'),
+        'main.orders': make_table('orders', ['id', 'customer_id', 'total_amount', 'created_at']),
+        'main.products': make_table('products', ['id', 'title', 'price']),
+        'main.order_items': make_table('order_items', ['order_id', 'product_id', 'quantity']),
+        'main.employees': make_table('employees', ['id', 'salary', 'department']),
+    },
+    'relationships': {'relationships': [
+        {'tables': ['main.orders', 'main.customers'],
+         'foreign_key': 'orders.customer_id', 'reference_key': 'customers.id'},
+        {'tables': ['main.order_items', 'main.products'],
+         'foreign_key': 'order_items.product_id', 'reference_key': 'products.id'},
+    ]},
+    'global_definitions': {'revenue': 'sum of order totals'},
+    'sample_data': {'main.customers': [{'id': 1}], 'main.employees': [{'id': 2}]},
+}
+
+
+class TestSchemaRetriever(unittest.TestCase):
+    def setUp(self):
+        self.retriever = SchemaRetriever(CONTEXT, min_tables=0)
+
+    def test_tokenize_splits_identifiers(self):
+        self.assertEqual(tokenize("customerId total_amounts"),
+                         ['customer', 'id', 'total', 'amount'])
+
+    def test_rank_prefers_matching_tables(self):
+        ranked = self.retriever.rank("average salary per department")
+        self.assertEqual(ranked[0][0], 'main.employees')
+        self.assertEqual(len(ranked), 1)
+
+    def test_retrieve_expands_with_related_tables(self):
+        tables = self.retriever.retrieve("how many customers per country", top_k=1)
+        self.assertEqual(tables, ['main.customers', 'main.orders'])
+
+    def test_retrieve_returns_everything_without_matches(self):
+        self.assertEqual(self.retriever.retrieve("hello there", top_k=1),
+                         list(CONTEXT['tables']))
+
+    def test_prune_context(self):
+        pruned = self.retriever.prune_context("customers per country", top_k=1)
+
+        self.assertEqual(list(pruned['tables']), ['main.customers', 'main.orders'])
+        self.assertEqual(len(pruned['relationships']['relationships']), 1)
+        self.assertEqual(list(pruned['sample_data']), ['main.customers'])
+        self.assertEqual(pruned['global_definitions'], CONTEXT['global_definitions'])
+        self.assertNotIn('main.products', pruned[COMPILED_CONTEXT_KEY])
+        self.assertIs(self.retriever.prune_context("customer countries", top_k=1), pruned)
+        self.assertIs(self.retriever.prune_context("anything", top_k=10), CONTEXT)
+
+    def test_small_contexts_are_not_pruned(self):
+        retriever = SchemaRetriever(CONTEXT)
+        self.assertIs(retriever.prune_context("customers per country", top_k=1), CONTEXT)
+
+    @patch('dataneuron.core.schema_retriever.PRUNE_MIN_TABLES', 0)
+    def test_dataneuron_prompts_use_pruned_context(self):
+        db = MagicMock()
+        db.db_type = 'sqlite'
+        db.execute_query_with_column_names.return_value = ([(3,)], ['count'])
+        dn = DataNeuron(db_config=None, context=CONTEXT, max_prompt_tables=1)
+        dn.db = db
+        dn.query_refiner = QueryRefiner(CONTEXT, db, None)
+
+        with patch('dataneuron.core.query_refiner.call_neuron_api',
+                   return_value='{"can_be_answered": true, "refined_query": "salary by department", '
+                                '"changes": [], "entities": []}') as refine_api, \
+                patch('dataneuron.core.data_neuron.call_neuron_api',
+                      return_value="<sql>SELECT 1</sql>") as sql_api:
+            dn.query("average salary per department")
+
+        for api in (refine_api, sql_api):
+            prompt = api.call_args[0][0]
+            self.assertIn("main.employees", prompt)
+            self.assertNotIn("main.orders", prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.core import data_neuron
+from dataneuron.core.data_neuron import DataNeuron
+
+
+class TestSpeculativeSQL(unittest.TestCase):
+    def setUp(self):
+        self.dn = DataNeuron(db_config=None, context={
+                             'tables': {}}, speculative_sql=True)
+        self.dn.db = MagicMock()
+        self.dn.db.db_type = 'sqlite'
+        self.dn.db.execute_query_with_column_names.return_value = (
+            [(3,)], ['count'])
+        self.dn.query_refiner = MagicMock()
+        data_neuron.speculation_stats.reset()
+
+        patcher = patch('dataneuron.core.data_neuron.sql_query_prompt',
+                        side_effect=lambda question, context, db_type: f"prompt: {question}")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('dataneuron.core.data_neuron.call_neuron_api',
+                        side_effect=lambda prompt, use_cache=False: f"<sql>SELECT '{prompt}'</sql>")
+        self.call_api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unchanged_question_uses_speculation(self):
+        self.dn.query_refiner.refine_query.return_value = (
+            "how many orders", [], [], [])
+        result = self.dn.query("how many orders")
+
+        self.assertEqual(result['sql'], "SELECT 'prompt: how many orders'")
+        self.assertEqual(self.call_api.call_count, 1)
+        self.assertEqual(data_neuron.speculation_stats.stats()['hits'], 1)
+
+    def test_refined_question_discards_speculation(self):
+        self.dn.query_refiner.refine_query.return_value = (
+            "how many orders from Acme Corp", ["Expanded company name"], [], [])
+        result = self.dn.query("how many orders from acme")
+
+        self.assertEqual(
+            result['sql'], "SELECT 'prompt: how many orders from Acme Corp'")
+        self.assertEqual(self.call_api.call_count, 2)
+        self.assertEqual(data_neuron.speculation_stats.stats()['misses'], 1)
+
+    def test_follow_up_chat_messages_are_not_speculated(self):
+        self.dn.query_refiner.refine_query.return_value = (
+            "orders last month", [], [], [])
+        self.dn.set_chat_history([{'role': 'user', 'content': 'how many orders'},
+                                  {'role': 'assistant', 'content': 'There are 3 orders.'}])
+        self.dn.chat("and last month?")
+
+        self.call_api.assert_called_once_with("prompt: orders last month", use_cache=True)
+        self.assertEqual(data_neuron.speculation_stats.stats()['hits'], 0)
+
+    def test_speculation_is_skipped_when_workers_are_busy(self):
+        with patch.object(data_neuron, '_speculation_slots') as slots:
+            slots.acquire.return_value = False
+            self.assertIsNone(self.dn._start_speculation("how many orders"))
+        self.call_api.assert_not_called()
+
+    def test_disabled_by_default(self):
+        self.dn.speculative_sql = False
+        self.dn.query_refiner.refine_query.return_value = (
+            "how many orders", [], [], [])
+        self.dn.query("how many orders")
+        self.assertEqual(self.call_api.call_count, 1)
+        self.assertEqual(data_neuron.speculation_stats.stats()['hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
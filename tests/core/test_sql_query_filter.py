@@ -1,6 +1,8 @@
 import re
 from dataneuron.core.sql_query_filter import SQLQueryFilter
+from dataneuron.db_operations.sqlite import SQLiteOperations
 import unittest
+from unittest.mock import patch
 
 
 class TestSQLQueryFilter(unittest.TestCase):
@@ -274,5 +276,162 @@ class TestSQLQueryFilterCTE(unittest.TestCase):
     #         self.filter.apply_client_filter(query, 1), expected)
 
 
+
+class TestClientFilterTemplates(unittest.TestCase):
+    def setUp(self):
+        SQLQueryFilter._template_cache.clear()
+        self.filter = SQLQueryFilter(
+            {'main.orders': 'user_id', 'main.products': 'company_id'}, schemas=['main'])
+
+    def test_template_matches_full_filtering(self):
+        queries = [
+            'SELECT * FROM orders',
+            'SELECT o.id FROM orders o JOIN products p ON o.product_id = p.id WHERE o.total > 10',
+            'SELECT * FROM (SELECT id FROM orders) AS sub',
+            'SELECT id FROM orders UNION SELECT id FROM products',
+        ]
+        for query in queries:
+            for client_id in (1, 42):
+                expected = SQLQueryFilter(
+                    self.filter.client_tables, ['main'])._filter_query(query, client_id)
+                self.assertEqual(
+                    self.filter.apply_client_filter(query, client_id), expected)
+
+    def test_repeat_calls_skip_parsing(self):
+        query = 'SELECT * FROM orders'
+        self.filter.apply_client_filter(query, 1)
+        with patch('dataneuron.core.sql_query_filter.sqlparse.parse') as parse:
+            result = self.filter.apply_client_filter(query, 7)
+        parse.assert_not_called()
+        self.assertEqual(result, 'SELECT * FROM orders WHERE "orders"."user_id" = 7')
+        self.assertEqual(self.filter.filtered_tables, {'main.orders'})
+
+    def test_cache_is_keyed_by_client_table_config(self):
+        query = 'SELECT * FROM orders'
+        self.filter.apply_client_filter(query, 1)
+        other = SQLQueryFilter({'main.orders': 'tenant_id'}, schemas=['main'])
+        self.assertEqual(other.apply_client_filter(query, 1),
+                         'SELECT * FROM orders WHERE "orders"."tenant_id" = 1')
+
+    def test_non_numeric_client_ids_are_quoted(self):
+        self.assertEqual(self.filter.apply_client_filter('SELECT * FROM orders', 'abc'),
+                         'SELECT * FROM orders WHERE "orders"."user_id" = \'abc\'')
+        self.assertEqual(self.filter.apply_client_filter('SELECT * FROM orders', "x' OR '1'='1"),
+                         'SELECT * FROM orders WHERE "orders"."user_id" = \'x\'\' OR \'\'1\'\'=\'\'1\'')
+        ast_filter = SQLQueryFilter({'main.orders': 'user_id'}, schemas=['main'], engine='ast')
+        self.assertEqual(ast_filter.apply_client_filter('SELECT * FROM orders', 'acme'),
+                         'SELECT * FROM orders WHERE "orders"."user_id" = \'acme\'')
+
+
+class TestClientFilterDialects(unittest.TestCase):
+    client_tables = {'main.orders': 'user_id', 'main.products': 'company_id'}
+
+    def test_mysql_backticks(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='mysql')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM orders o WHERE o.total > 5', 1),
+                         'SELECT * FROM orders o WHERE o.total > 5 AND `o`.`user_id` = 1')
+
+    def test_mssql_bracketed_reference(self):
+        query_filter = SQLQueryFilter({'dbo.orders': 'user_id'}, ['dbo'], db_type='mssql')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM [dbo].[orders]', 1),
+                         'SELECT * FROM [dbo].[orders] WHERE [dbo].[orders].[user_id] = 1')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM [orders] WHERE total > 5', 1),
+                         'SELECT * FROM [orders] WHERE total > 5 AND [orders].[user_id] = 1')
+
+    def test_mysql_backtick_reference(self):
+        query_filter = SQLQueryFilter({'shop.orders': 'user_id'}, ['shop'], db_type='mysql')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM `shop`.`orders`', 1),
+                         'SELECT * FROM `shop`.`orders` WHERE `shop`.`orders`.`user_id` = 1')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM `orders` o', 1),
+                         'SELECT * FROM `orders` o WHERE `o`.`user_id` = 1')
+
+    def test_clickhouse_prewhere(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='clickhouse', engine='ast')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM orders WHERE total > 5 LIMIT 10', 1),
+                         'SELECT * FROM orders PREWHERE "orders"."user_id" = 1 WHERE total > 5 LIMIT 10')
+
+    def test_clickhouse_legacy_engine_keeps_where(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='clickhouse')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM orders WHERE total > 5', 1),
+                         'SELECT * FROM orders WHERE total > 5 AND "orders"."user_id" = 1')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM orders PREWHERE status = 1', 1),
+                         'SELECT * FROM orders PREWHERE status = 1 WHERE "orders"."user_id" = 1')
+
+    def test_clickhouse_prewhere_skips_select_list_subqueries(self):
+        query = 'SELECT (SELECT max(id) FROM users WHERE active = 1) AS m, total FROM orders'
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='clickhouse', engine='ast')
+        self.assertEqual(query_filter.apply_client_filter(query, 1),
+                         'SELECT (SELECT max(id) FROM users WHERE active = 1) AS m, total FROM orders '
+                         'PREWHERE "orders"."user_id" = 1')
+
+    def test_clickhouse_joins_keep_where(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='clickhouse')
+        self.assertEqual(query_filter.apply_client_filter('SELECT * FROM orders o JOIN products p ON o.product_id = p.id', 1),
+                         'SELECT * FROM orders o JOIN products p ON o.product_id = p.id WHERE "o"."user_id" = 1 AND "p"."company_id" = 1')
+
+
+class TestClientFilterParams(unittest.TestCase):
+    client_tables = {'main.orders': 'user_id', 'main.products': 'company_id'}
+    query = "SELECT o.id FROM orders o JOIN products p ON o.product_id = p.id WHERE p.name LIKE 'A%'"
+
+    def test_pyformat_placeholders_escape_percent(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='postgres')
+        sql, params = query_filter.apply_client_filter_with_params(self.query, '42')
+        self.assertEqual(sql, "SELECT o.id FROM orders o JOIN products p ON o.product_id = p.id "
+                              "WHERE p.name LIKE 'A%%' AND \"o\".\"user_id\" = %s AND \"p\".\"company_id\" = %s")
+        self.assertEqual(params, [42, 42])
+
+    def test_mysql_keeps_literal_id(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='mysql')
+        sql, params = query_filter.apply_client_filter_with_params(
+            "SELECT DATE_FORMAT(created_at, '%b - %Y') AS month FROM orders WHERE note <> '%s'", 7)
+        self.assertEqual(sql, "SELECT DATE_FORMAT(created_at, '%b - %Y') AS month FROM orders "
+                              "WHERE note <> '%s' AND `orders`.`user_id` = 7")
+        self.assertIsNone(params)
+
+    def test_clickhouse_named_placeholder(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='clickhouse', engine='ast')
+        sql, params = query_filter.apply_client_filter_with_params('SELECT * FROM orders', 'acme')
+        self.assertEqual(sql, 'SELECT * FROM orders PREWHERE "orders"."user_id" = {client_id:String}')
+        self.assertEqual(params, {'client_id': 'acme'})
+
+    def test_query_text_is_shared_across_clients(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='sqlite')
+        first, _ = query_filter.apply_client_filter_with_params(self.query, 1)
+        second, _ = query_filter.apply_client_filter_with_params(self.query, 2)
+        self.assertEqual(first, second)
+
+    def test_unfiltered_queries_have_no_params(self):
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='sqlite')
+        self.assertEqual(query_filter.apply_client_filter_with_params('SELECT 1', 1), ('SELECT 1', None))
+
+    def test_bound_query_executes(self):
+        db = SQLiteOperations(':memory:', read_only=False)
+        self.addCleanup(db.close)
+        db.execute_query("CREATE TABLE orders (id INTEGER, user_id INTEGER)")
+        db.execute_query("INSERT INTO orders VALUES (1, 7), (2, 8), (3, 7)")
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='sqlite')
+
+        sql, params = query_filter.apply_client_filter_with_params('SELECT id FROM orders', 7)
+        rows, columns = db.execute_query_with_column_names(sql, params)
+
+        self.assertEqual(sorted(rows), [(1,), (3,)])
+
+    def test_bound_query_with_percent_literals_executes(self):
+        db = SQLiteOperations(':memory:', read_only=False)
+        self.addCleanup(db.close)
+        db.execute_query("CREATE TABLE orders (id INTEGER, user_id INTEGER, note TEXT, created_at TEXT)")
+        db.execute_query("INSERT INTO orders VALUES (1, 7, 'A%s', '2024-03-01'), (2, 8, 'A%s', '2024-03-01'), "
+                         "(3, 7, 'B', '2024-04-01')")
+        query_filter = SQLQueryFilter(self.client_tables, ['main'], db_type='sqlite')
+
+        sql, params = query_filter.apply_client_filter_with_params(
+            "SELECT id, strftime('%Y-%m', created_at) AS month FROM orders WHERE note LIKE 'A%s'", 7)
+        rows, columns = db.execute_query_with_column_names(sql, params)
+
+        self.assertEqual(params, [7])
+        self.assertEqual(rows, [(1, '2024-03')])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -97,6 +97,15 @@ class TestClientFilterApplier(unittest.TestCase):
         expected = ''
         self.assertEqual(result, expected)
 
+    def test_dialect_quoting_and_placeholder(self):
+        filter_applier = ClientFilterApplierImplementation(
+            self.client_tables, schemas=['main'], db_type='mysql', bind_params=True)
+        table_info = {'name': 'users', 'schema': None, 'alias': 'u'}
+        self.assertEqual(filter_applier.apply_filter(table_info, 1), '`u`.`user_id` = 1')
+        filter_applier = ClientFilterApplierImplementation(
+            self.client_tables, schemas=['main'], db_type='postgres', bind_params=True)
+        self.assertEqual(filter_applier.apply_filter(table_info, 1), '"u"."user_id" = %s')
+
     def test_case_insensitive_match(self):
         filter_applier = ClientFilterApplierImplementation(
             self.client_tables, schemas=['main'], case_sensitive=False)
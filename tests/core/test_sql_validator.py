@@ -0,0 +1,32 @@
+import unittest
+from dataneuron.core.sql_validator import SQLQueryValidator
+
+CONTEXT = {
+    'tables': {
+        'main.orders': {'name': 'orders', 'alias': 'purchases'},
+        'sales.Customers': {'name': 'Customers'},
+    },
+    'global_definitions': {'global_aliases': {'table_aliases': {'buyers': 'sales.Customers'}}},
+    'client_info': {'schemas': ['main', 'sales'], 'tables': {'main.orders': 'user_id', 'sales.customers': 'tenant_id'}},
+}
+
+
+class TestSQLQueryValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = SQLQueryValidator(CONTEXT)
+
+    def test_known_tables_pass_and_get_a_limit(self):
+        query = 'SELECT o.id, c.name FROM orders o JOIN sales.customers c ON o.customer_id = c.id'
+        self.assertEqual(self.validator.validate_and_sanitize(query), f"{query} LIMIT 1000;")
+
+    def test_unknown_table_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.validator.validate_and_sanitize('SELECT * FROM invoices')
+
+    def test_non_select_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.validator.validate_and_sanitize('DELETE FROM orders')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.core.data_neuron import DataNeuron
+from dataneuron.db_operations.result_stream import QueryResultStream
+
+
+class TestStreamedSQLExecution(unittest.TestCase):
+    def setUp(self):
+        self.dn = DataNeuron(db_config=None, context={
+                             'tables': {}}, stream_sql=True)
+        self.dn.db = MagicMock()
+        self.dn.db.db_type = 'sqlite'
+        self.dn.query_refiner = MagicMock()
+        self.dn.query_refiner.refine_query.return_value = (
+            "How many orders?", [], [], [])
+        self.executed = threading.Event()
+
+        def execute(sql_query, batch_size=None):
+            self.executed.set()
+            return QueryResultStream(['count'], iter([[(3,)]]), lambda exhausted: None)
+
+        # query() and chat() stream results up to max_result_rows by default
+        self.dn.db.stream_query_with_column_names.side_effect = execute
+
+        patcher = patch('dataneuron.core.data_neuron.sql_query_prompt',
+                        return_value="prompt")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def llm_stream(self, prompt, use_cache=False):
+        yield "<sql>SELECT COUNT(*) FROM orders</sql>"
+        # The explanation only arrives once the query has already run
+        self.assertTrue(self.executed.wait(timeout=5))
+        yield "<explanation>Counts orders.</explanation>"
+
+    def test_query_executes_before_explanation_finishes(self):
+        with patch('dataneuron.core.data_neuron.stream_neuron_api', side_effect=self.llm_stream):
+            result = self.dn.query("how many orders")
+
+        self.assertEqual(result['sql'], "SELECT COUNT(*) FROM orders")
+        self.assertEqual(result['result'], [(3,)])
+        self.assertIn("<explanation>Counts orders.</explanation>",
+                      result['explanation'])
+
+    def test_chat_applies_client_filter(self):
+        self.dn.filter = MagicMock()
+        self.dn.filter.apply_client_filter.side_effect = lambda sql, client_id: f"{sql} WHERE user_id = {client_id}"
+        self.dn.set_client_context(7)
+        with patch('dataneuron.core.data_neuron.stream_neuron_api', side_effect=self.llm_stream):
+            sql, response = self.dn.chat("how many orders")
+
+        self.assertTrue(sql.startswith(
+            "SELECT COUNT(*) FROM orders WHERE user_id = 7"))
+        self.assertEqual(response['data'], [(3,)])
+
+    def test_response_without_sql(self):
+        with patch('dataneuron.core.data_neuron.stream_neuron_api', return_value=iter(["No idea."])):
+            result = self.dn.query("how many orders")
+        self.assertIsNone(result['sql'])
+        self.dn.db.stream_query_with_column_names.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
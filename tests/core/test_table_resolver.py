@@ -0,0 +1,72 @@
+import unittest
+from dataneuron.core.table_resolver import TableResolver, split_table_name
+
+CONTEXT = {
+    'tables': {
+        'main.orders': {'name': 'orders', 'alias': 'purchases'},
+        'sales.Customers': {'name': 'Customers'},
+    },
+    'global_definitions': {'global_aliases': {'table_aliases': {'buyers': 'sales.Customers'}}},
+    'client_info': {'schemas': ['main', 'sales'], 'tables': {'main.orders': 'user_id', 'sales.customers': 'tenant_id'}},
+}
+
+
+class TestTableResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = TableResolver.from_context(CONTEXT)
+
+    def test_client_tables_follow_the_search_path(self):
+        self.assertEqual(self.resolver.client_table('ORDERS'), 'main.orders')
+        self.assertEqual(self.resolver.client_table('orders', 'main'), 'main.orders')
+        self.assertEqual(self.resolver.client_table('main.orders'), 'main.orders')
+        self.assertEqual(self.resolver.client_column('customers'), 'tenant_id')
+        self.assertIsNone(self.resolver.client_table('invoices'))
+
+    def test_exact_reference_wins_over_search_path(self):
+        resolver = TableResolver({'orders': 'a', 'main.orders': 'b', 'sales.orders': 'c'}, ['main', 'sales'])
+        self.assertEqual(resolver.client_table('orders'), 'orders')
+        self.assertEqual(resolver.client_table('orders', 'sales'), 'sales.orders')
+
+    def test_quoted_references(self):
+        resolver = TableResolver({'dbo.orders': 'user_id', 'shop.Items': 'tenant_id'}, ['dbo'])
+        self.assertEqual(resolver.client_table('[dbo].[orders]'), 'dbo.orders')
+        self.assertEqual(resolver.client_table('[orders]', '[dbo]'), 'dbo.orders')
+        self.assertEqual(resolver.client_table('`shop`.`items`'), 'shop.Items')
+        self.assertEqual(resolver.client_table('"shop"."Items"'), 'shop.Items')
+        self.assertEqual(split_table_name('[my.db].[orders]'), ('my.db', 'orders'))
+
+    def test_case_sensitive(self):
+        resolver = TableResolver({'main.Orders': 'user_id'}, case_sensitive=True)
+        self.assertEqual(resolver.client_table('Orders'), 'main.Orders')
+        self.assertIsNone(resolver.client_table('orders'))
+
+    def test_context_tables_and_aliases(self):
+        self.assertEqual(self.resolver.resolve('customers'), 'sales.Customers')
+        self.assertEqual(self.resolver.resolve('purchases'), 'main.orders')
+        self.assertEqual(self.resolver.resolve('Buyers'), 'sales.Customers')
+        self.assertIsNone(self.resolver.resolve('invoices'))
+
+
+class TestTableResolverFromContext(unittest.TestCase):
+    def test_empty_definitions(self):
+        resolver = TableResolver.from_context({'tables': {}, 'global_definitions': None, 'client_info': None})
+        self.assertIsNone(resolver.client_table('orders'))
+        self.assertEqual(resolver.schemas, ['main'])
+
+    def test_null_global_aliases(self):
+        context = dict(CONTEXT, global_definitions={'global_aliases': None})
+        self.assertEqual(TableResolver.from_context(context).resolve('purchases'), 'main.orders')
+
+    def test_list_shaped_definitions(self):
+        context = dict(CONTEXT, global_definitions={'global_aliases': [
+            {'table_aliases': [{'buyers': 'sales.Customers'}]},
+            {'common_terms': [{'term': 'buyer', 'definition': 'A customer'}]},
+            'stray entry',
+        ]})
+        self.assertEqual(TableResolver.from_context(context).resolve('buyers'), 'sales.Customers')
+        context = dict(CONTEXT, global_definitions=['global_aliases'])
+        self.assertIsNone(TableResolver.from_context(context).resolve('buyers'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from dataneuron.core.value_index import ValueIndex, build_value_index, VALUE_INDEX_FILE
+from dataneuron.core.query_refiner import QueryRefiner
+from dataneuron.db_operations.sqlite import SQLiteOperations
+
+TABLES = {
+    'main.users': {
+        'full_name': 'main.users',
+        'columns': [
+            {'name': 'id', 'type': 'INTEGER', 'primary_key': True},
+            {'name': 'name', 'type': 'TEXT'},
+            {'name': 'city', 'type': 'VARCHAR(50)'},
+            {'name': 'age', 'type': 'INTEGER'},
+        ]
+    }
+}
+
+
+class TestValueIndex(unittest.TestCase):
+    def setUp(self):
+        self.db = SQLiteOperations(':memory:', read_only=False)
+        self.db.execute_query(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, city VARCHAR(50), age INTEGER)")
+        self.db.execute_query(
+            "INSERT INTO users (name, city, age) VALUES "
+            "('Linda Smith', 'Berlin', 31), ('Bob', 'Paris', 42), ('Belinda', 'Berlin', 57)")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_build_indexes_low_cardinality_text_columns(self):
+        index = build_value_index(self.db, TABLES)
+        self.assertTrue(index.has_column('main.users', 'city'))
+        self.assertFalse(index.has_column('main.users', 'age'))
+        self.assertFalse(index.has_column('main.users', 'id'))
+
+        index = build_value_index(self.db, TABLES, max_distinct=2)
+        self.assertTrue(index.has_column('main.users', 'city'))
+        self.assertFalse(index.has_column('main.users', 'name'))
+
+    def test_search_matches_substrings_case_insensitively(self):
+        index = ValueIndex()
+        index.add_column('main.users', 'name', ['Linda Smith', 'Bob', 'Belinda'])
+        self.assertEqual(index.search('MAIN.users', 'name', 'LINDA'),
+                         ['Belinda', 'Linda Smith'])
+        self.assertEqual(index.search('main.users', 'name', 'bo'), ['Bob'])
+        self.assertEqual(index.search('main.users', 'name', 'zed'), [])
+        self.assertIsNone(index.search('main.users', 'city', 'x'))
+
+    def test_save_and_load(self):
+        index = build_value_index(self.db, TABLES)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, VALUE_INDEX_FILE)
+            index.save(path)
+            loaded = ValueIndex.load(path)
+        self.assertEqual(loaded.values, index.values)
+        self.assertEqual(loaded.search('main.users', 'city', 'berl'), ['Berlin'])
+        self.assertIsNone(ValueIndex.load(path))
+
+    def test_refiner_uses_index_before_database(self):
+        context_loader = MagicMock()
+        context_loader.load_value_index.return_value = build_value_index(
+            self.db, TABLES)
+        db = MagicMock()
+        db.db_type = 'sqlite'
+        db.execute_query_with_column_names.return_value = ([(31,)], ['age'])
+        refiner = QueryRefiner({}, db, context_loader)
+
+        is_valid, refined, _ = refiner.validate_and_refine_entities([
+            {'table': 'main.users', 'column': 'city', 'potential_value': 'paris'},
+            {'table': 'main.users', 'column': 'age', 'potential_value': '31'},
+        ])
+
+        self.assertTrue(is_valid)
+        self.assertEqual(refined[0]['matches'], ['Paris'])
+        self.assertEqual(refined[1]['matches'], [31])
+        db.execute_query_with_column_names.assert_called_once()
+
+    def test_refiner_looks_up_values_missing_from_index(self):
+        context_loader = MagicMock()
+        context_loader.load_value_index.return_value = build_value_index(
+            self.db, TABLES)
+        self.db.execute_query("INSERT INTO users (name, city, age) VALUES ('Zoe', 'Oslo', 22)")
+        refiner = QueryRefiner({}, self.db, context_loader)
+
+        is_valid, refined, _ = refiner.validate_and_refine_entities([
+            {'table': 'main.users', 'column': 'city', 'potential_value': 'oslo'},
+        ])
+
+        self.assertTrue(is_valid)
+        self.assertEqual(refined[0]['matches'], ['Oslo'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+from dataneuron.db_operations.clickhouse import ClickHouseOperations
+
+
+class TestClickHouseOperations(unittest.TestCase):
+    def setUp(self):
+        self.mock_clickhouse_connect = MagicMock()
+        self.mock_client = self.mock_clickhouse_connect.get_client.return_value
+        self.mock_client.query.return_value.result_rows = [(1, 'Alice')]
+        self.mock_client.query.return_value.column_names = ('id', 'name')
+        patcher = patch.dict(
+            sys.modules, {'clickhouse_connect': self.mock_clickhouse_connect})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.db = ClickHouseOperations(
+            'localhost', 8443, 'user', 'password', 'analytics', settings={'max_execution_time': 30})
+
+    def test_client_is_reused(self):
+        self.db.execute_query("SELECT 1")
+        self.db.get_table_list()
+        self.db.execute_query_with_column_names("SELECT id, name FROM users")
+        self.assertEqual(self.mock_clickhouse_connect.get_client.call_count, 1)
+        self.mock_clickhouse_connect.get_client.assert_called_once_with(
+            autogenerate_session_id=False, host='localhost', port=8443,
+            user='user', password='password', database='analytics')
+
+    def test_default_settings_are_passed(self):
+        self.db.execute_query("SELECT 1")
+        self.mock_client.query.assert_called_with(
+            "SELECT 1", settings={'max_execution_time': 30})
+
+    def test_per_query_settings_override_defaults(self):
+        result, columns = self.db.execute_query_with_column_names(
+            "SELECT id, name FROM users", settings={'max_execution_time': 5, 'max_result_rows': 1000})
+        self.mock_client.query.assert_called_with("SELECT id, name FROM users", settings={
+            'max_execution_time': 5, 'max_result_rows': 1000})
+        self.assertEqual(result, [(1, 'Alice')])
+        self.assertEqual(columns, ('id', 'name'))
+
+    def test_params_are_bound_on_the_server(self):
+        self.db.execute_query_with_column_names(
+            "SELECT id FROM users WHERE org_id = {client_id:Int64}", {'client_id': 7})
+        self.mock_client.query.assert_called_with(
+            "SELECT id FROM users WHERE org_id = {client_id:Int64}",
+            settings={'max_execution_time': 30}, parameters={'client_id': 7})
+
+    def test_close_drops_client(self):
+        self.db.execute_query("SELECT 1")
+        self.db.close()
+        self.mock_client.close.assert_called_once()
+        self.db.execute_query("SELECT 1")
+        self.assertEqual(self.mock_clickhouse_connect.get_client.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from dataneuron.db_operations.connection_pool import ConnectionPool
+from dataneuron.db_operations.exceptions import ConnectionError
+from dataneuron.db_operations.postgres import PostgreSQLOperations
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.rollbacks = 0
+        self.healthy = True
+
+    def cursor(self):
+        cursor = MagicMock()
+        if not self.healthy:
+            cursor.execute.side_effect = Exception("server closed the connection")
+        return cursor
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.opened = []
+
+        def connect():
+            conn = FakeConnection()
+            self.opened.append(conn)
+            return conn
+
+        self.connect = connect
+
+    def test_reuses_released_connection(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(first.rollbacks, 2)
+
+    def test_respects_max_size(self):
+        pool = ConnectionPool(self.connect, max_size=1, acquire_timeout=0.05)
+        conn = pool.acquire()
+        with self.assertRaises(ConnectionError):
+            pool.acquire()
+        pool.release(conn)
+        self.assertIs(pool.acquire(), conn)
+
+    def test_waiting_borrower_gets_released_connection(self):
+        pool = ConnectionPool(self.connect, max_size=1, acquire_timeout=5)
+        conn = pool.acquire()
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire()))
+        waiter.start()
+        pool.release(conn)
+        waiter.join(timeout=5)
+        self.assertEqual(borrowed, [conn])
+
+    def test_health_check_replaces_broken_connection(self):
+        pool = ConnectionPool(self.connect, max_size=1)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.healthy = False
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_idle_timeout_keeps_min_size(self):
+        pool = ConnectionPool(self.connect, min_size=1,
+                              max_size=3, idle_timeout=0)
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        pool.acquire()
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(sum(conn.closed for conn in self.opened), 1)
+
+    def test_min_size_is_opened_on_first_use(self):
+        pool = ConnectionPool(self.connect, min_size=2, max_size=3)
+        self.assertEqual(len(self.opened), 0)
+        pool.acquire()
+        self.assertEqual(len(self.opened), 2)
+        self.assertEqual(pool.idle_count, 1)
+
+    def test_failed_reset_discards_connection(self):
+        pool = ConnectionPool(self.connect, max_size=1)
+        conn = pool.acquire()
+        conn.rollback = MagicMock(side_effect=Exception("connection lost"))
+        pool.release(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.size, 0)
+
+    def test_from_config(self):
+        pool = ConnectionPool.from_config(self.connect, {
+            'min_size': 1, 'max_size': 4, 'idle_timeout': 60, 'health_check': False})
+        self.assertEqual(pool.min_size, 1)
+        self.assertEqual(pool.max_size, 4)
+        self.assertEqual(pool.idle_timeout, 60)
+        self.assertFalse(pool.health_check)
+
+
+class TestPooledOperations(unittest.TestCase):
+    def test_queries_share_one_connection(self):
+        db = PostgreSQLOperations(
+            'testdb', 'user', 'password', 'localhost', '5432', pool_config={'max_size': 2})
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(1,)]
+        cursor.description = [('one',)]
+
+        with patch.object(db, '_get_connection', return_value=conn) as connect:
+            db._init_pool({'max_size': 2})
+            db.execute_query_with_column_names("SELECT 1 AS one")
+            db.execute_query_with_column_names("SELECT 1 AS one")
+            self.assertEqual(connect.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import MagicMock
+from dataneuron.db_operations.sqlite import SQLiteOperations
+from dataneuron.db_operations.database_helpers import DatabaseHelper
+from dataneuron.core.query_refiner import QueryRefiner
+
+
+class TestParameterPlaceholders(unittest.TestCase):
+    def test_placeholder_styles(self):
+        self.assertEqual(DatabaseHelper('postgres', None).parameter_placeholder('client_id', 1), '%s')
+        self.assertEqual(DatabaseHelper('mssql', None).parameter_placeholder('client_id', 1), '?')
+        self.assertEqual(DatabaseHelper('clickhouse', None).parameter_placeholder('client_id', '12'),
+                         '{client_id:Int64}')
+
+    def test_sql_literal(self):
+        helper = DatabaseHelper('postgres', None)
+        self.assertEqual(helper.sql_literal(7), '7')
+        self.assertEqual(helper.sql_literal('42'), '42')
+        self.assertEqual(helper.sql_literal("o'brien"), "'o''brien'")
+
+    def test_match_value_in_every_column(self):
+        query = DatabaseHelper('mysql', None).top_few_records('*', 'users', "o'brien", limit=5)
+        self.assertIn("WHERE CAST(users AS TEXT) LIKE '%o''brien%'", query)
+        self.assertTrue(query.endswith("LIMIT 5"))
+
+    def test_mysql_does_not_bind(self):
+        self.assertFalse(DatabaseHelper('mysql', None).supports_bind_parameters())
+        self.assertEqual(DatabaseHelper('mysql', None).escape_parameter_text("LIKE 'A%'"), "LIKE 'A%'")
+
+    def test_bind_parameters(self):
+        self.assertEqual(DatabaseHelper('postgres', None).bind_parameters('client_id', '12', 2), [12, 12])
+        self.assertEqual(DatabaseHelper('clickhouse', None).bind_parameters('client_id', 'a', 2), {'client_id': 'a'})
+
+
+class TestBatchedEntityLookup(unittest.TestCase):
+    def setUp(self):
+        self.db = SQLiteOperations(':memory:', read_only=False)
+        self.db.execute_query(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
+        self.db.execute_query(
+            "INSERT INTO users (name, age) VALUES ('Linda Smith', 31), ('Bob', 42), ('O''Brien', 57)")
+        self.helper = DatabaseHelper('sqlite', self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_batched_query_returns_indexed_text_matches(self):
+        query = self.helper.batched_top_few_records([
+            {'table': 'users', 'column': 'name', 'potential_value': 'linda'},
+            {'table': 'users', 'column': 'age', 'potential_value': '42'},
+            {'table': 'users', 'column': 'name', 'potential_value': "o'brien"},
+        ])
+        rows, columns = self.db.execute_query_with_column_names(query)
+
+        self.assertEqual(columns, ['entity_index', 'match_value'])
+        self.assertEqual(sorted(rows), [
+                         (0, 'Linda Smith'), (1, '42'), (2, "O'Brien")])
+
+    def test_mssql_uses_top(self):
+        query = DatabaseHelper('mssql', None).batched_top_few_records(
+            [{'table': 'dbo.users', 'column': 'name', 'potential_value': 'x'}], limit=5)
+        self.assertIn("SELECT DISTINCT TOP 5 CAST([name] AS NVARCHAR(4000))", query)
+        self.assertNotIn("LIMIT", query)
+
+    def test_refiner_validates_entities_in_one_round_trip(self):
+        db = MagicMock(wraps=self.db)
+        db.db_type = 'sqlite'
+        refiner = QueryRefiner({}, db, None)
+
+        is_valid, refined, invalid = refiner.validate_and_refine_entities([
+            {'table': 'users', 'column': 'name', 'potential_value': 'linda'},
+            {'table': 'users', 'column': 'name', 'potential_value': 'zed'},
+        ])
+
+        self.assertFalse(is_valid)
+        self.assertEqual(refined[0]['matches'], ['Linda Smith'])
+        self.assertEqual(invalid[0]['potential_value'], 'zed')
+        db.execute_query_with_column_names.assert_called_once()
+
+    def test_refiner_falls_back_to_separate_lookups(self):
+        db = MagicMock()
+        db.db_type = 'sqlite'
+        db.execute_query_with_column_names.side_effect = [
+            Exception("syntax error"), ([('Bob',)], ['name']), ([], ['name'])]
+        refiner = QueryRefiner({}, db, None)
+
+        is_valid, refined, invalid = refiner.validate_and_refine_entities([
+            {'table': 'users', 'column': 'name', 'potential_value': 'bob'},
+            {'table': 'users', 'column': 'name', 'potential_value': 'zed'},
+        ])
+
+        self.assertEqual(db.execute_query_with_column_names.call_count, 3)
+        self.assertEqual(len(refined) + len(invalid), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
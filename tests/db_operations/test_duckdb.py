@@ -0,0 +1,133 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from dataneuron.db_operations.exceptions import ConfigurationError
+
+
+@unittest.skipIf(duckdb is None, "duckdb is not installed")
+class TestDuckDBOperations(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.tmp_dir.name
+        with open(os.path.join(self.data_dir, 'orders.csv'), 'w') as f:
+            f.write("id,amount\n1,10.5\n2,20\n")
+        with open(os.path.join(self.data_dir, "order's items.csv"), 'w') as f:
+            f.write("id,sku\n1,A\n")
+        conn = duckdb.connect()
+        parquet_path = os.path.join(self.data_dir, 'customers.parquet')
+        conn.execute(
+            f"COPY (SELECT 1 AS id, 'Acme' AS name) TO '{parquet_path}' (FORMAT PARQUET)")
+        conn.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _table_types(self, db):
+        rows = db.execute_query(
+            "SELECT table_name, table_type FROM information_schema.tables ORDER BY table_name")
+        return dict(rows)
+
+    def _operations(self, **kwargs):
+        from dataneuron.db_operations.duckdb import DuckDBOperations
+        return DuckDBOperations(self.data_dir, **kwargs)
+
+    def test_table_mode_keeps_text_columns(self):
+        db = self._operations()
+        info = db.get_table_info('main', 'orders')
+        self.assertEqual([col['type'] for col in info['columns']],
+                         ['VARCHAR', 'VARCHAR'])
+        self.assertEqual(self._table_types(db)['customers'], 'BASE TABLE')
+
+    def test_view_mode_infers_types(self):
+        db = self._operations(mode='view')
+        self.assertEqual(self._table_types(db), {
+            'customers': 'VIEW', 'order\'s items': 'VIEW', 'orders': 'VIEW'})
+        info = db.get_table_info('main', 'orders')
+        self.assertEqual(info['columns'][0]['type'], 'BIGINT')
+        result, columns = db.execute_query_with_column_names(
+            "SELECT SUM(amount) FROM orders")
+        self.assertEqual(result[0][0], 30.5)
+
+    def test_materialize(self):
+        db = self._operations(mode='view', materialize=['customers'])
+        self.assertEqual(self._table_types(db)['customers'], 'BASE TABLE')
+        self.assertEqual(self._table_types(db)['orders'], 'VIEW')
+
+        db.materialize_table('orders')
+        self.assertEqual(self._table_types(db)['orders'], 'BASE TABLE')
+        self.assertEqual(db.execute_query(
+            "SELECT COUNT(*) FROM orders"), [(2,)])
+
+    def test_cache_reingests_only_changed_files(self):
+        cache_path = os.path.join(self.data_dir, 'cache.duckdb')
+        db = self._operations(cache_path=cache_path)
+        self.assertEqual(db.execute_query("SELECT COUNT(*) FROM orders"), [(2,)])
+        self.assertTrue(db.read_only)
+        db.conn.close()
+
+        db = self._operations(cache_path=cache_path)
+        db._create_object = MagicMock(side_effect=AssertionError("re-ingested"))
+        self.assertEqual(db.execute_query("SELECT COUNT(*) FROM orders"), [(2,)])
+        db.conn.close()
+
+        with open(os.path.join(self.data_dir, 'orders.csv'), 'a') as f:
+            f.write("3,5\n")
+        os.remove(os.path.join(self.data_dir, "order's items.csv"))
+        db = self._operations(cache_path=cache_path)
+        self.assertEqual(db.execute_query("SELECT COUNT(*) FROM orders"), [(3,)])
+        self.assertNotIn("order's items", self._table_types(db))
+        db.conn.close()
+
+    def test_view_mode_caches_only_materialized_tables(self):
+        cache_path = os.path.join(self.data_dir, 'cache.duckdb')
+        db = self._operations(mode='view', cache_path=cache_path)
+        self.assertFalse(os.path.exists(cache_path))
+        self.assertEqual(self._table_types(db)['orders'], 'VIEW')
+        db.conn.close()
+
+        db = self._operations(mode='view', materialize=['customers'], cache_path=cache_path)
+        self.assertEqual(db.execute_query("SELECT name FROM customers"), [('Acme',)])
+        self.assertEqual(db.cached_tables, {'customers'})
+        self.assertEqual(db.execute_query("SELECT SUM(amount) FROM orders"), [(30.5,)])
+        db.materialize_table('orders')
+        self.assertEqual(db.execute_query("SELECT COUNT(*) FROM orders"), [(2,)])
+        self.assertEqual(
+            [t['table'] for t in db.get_table_list()].count('orders'), 1)
+        db.conn.close()
+
+    def test_threads_use_own_cursors(self):
+        db = self._operations(mode='view', threads=2, memory_limit='256MB')
+        cursors = {}
+        results = {}
+
+        def run(index):
+            cursors[index] = db._get_cursor()
+            results[index] = db.execute_query(
+                f"SELECT COUNT(*) + {index} FROM orders")
+
+        workers = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(results, {i: [(2 + i,)] for i in range(4)})
+        self.assertEqual(len({id(cursor) for cursor in cursors.values()}), 4)
+        self.assertEqual(db.execute_query(
+            "SELECT current_setting('threads')"), [(2,)])
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ConfigurationError):
+            self._operations(mode='lazy')
+
+
+if __name__ == '__main__':
+    unittest.main()
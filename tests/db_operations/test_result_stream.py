@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from dataneuron.db_operations.result_stream import QueryResultStream, fetch_batches, slice_batches
+from dataneuron.db_operations.exceptions import OperationError
+from dataneuron.db_operations.sqlite import SQLiteOperations
+from dataneuron.db_operations.mysql import MySQLOperations
+
+
+class TestQueryResultStream(unittest.TestCase):
+    def test_iterates_batches_and_closes(self):
+        on_close = MagicMock()
+        stream = QueryResultStream(
+            ['id'], slice_batches([(1,), (2,), (3,)], 2), on_close)
+        self.assertEqual(list(stream), [[(1,), (2,)], [(3,)]])
+        on_close.assert_called_once_with(True)
+
+    def test_fetch_stops_early(self):
+        on_close = MagicMock()
+        fetched = []
+
+        def batches():
+            for i in range(100):
+                fetched.append(i)
+                yield [(i,)]
+
+        stream = QueryResultStream(['id'], batches(), on_close)
+        self.assertEqual(stream.fetch(3), [(0,), (1,), (2,)])
+        self.assertEqual(len(fetched), 3)
+        on_close.assert_called_once_with(False)
+
+    def test_context_manager_closes_once(self):
+        on_close = MagicMock()
+        with QueryResultStream(['id'], iter([[(1,)]]), on_close) as stream:
+            next(iter(stream))
+        stream.close()
+        on_close.assert_called_once_with(False)
+
+    def test_fetch_errors_are_wrapped(self):
+        cursor = MagicMock()
+        cursor.fetchmany.side_effect = Exception("connection reset")
+        on_close = MagicMock()
+        stream = QueryResultStream(['id'], fetch_batches(cursor, 10), on_close)
+        with self.assertRaises(OperationError):
+            stream.fetch()
+        on_close.assert_called_once()
+
+
+class TestBackendStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'stream.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE numbers (n INTEGER)")
+        conn.executemany("INSERT INTO numbers VALUES (?)",
+                         [(i,) for i in range(25)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sqlite_stream(self):
+        db = SQLiteOperations(self.db_path)
+        with db.stream_query_with_column_names("SELECT n FROM numbers ORDER BY n", batch_size=10) as stream:
+            self.assertEqual(stream.column_names, ['n'])
+            sizes = [len(batch) for batch in stream]
+        self.assertEqual(sizes, [10, 10, 5])
+
+    def test_sqlite_stream_reuses_thread_connection(self):
+        db = SQLiteOperations(self.db_path)
+        self.addCleanup(db.close)
+        conn = db._get_connection()
+        with patch.object(db, '_connect') as connect:
+            with db.stream_query_with_column_names("SELECT n FROM numbers") as stream:
+                self.assertEqual(len(stream.fetch(30)), 25)
+        connect.assert_not_called()
+        self.assertEqual(db.execute_query("SELECT COUNT(*) FROM numbers"), [(25,)])
+        self.assertIs(db._get_connection(), conn)
+
+    def test_duckdb_stream(self):
+        try:
+            import duckdb  # noqa: F401
+        except ImportError:
+            self.skipTest("duckdb is not installed")
+        from dataneuron.db_operations.duckdb import DuckDBOperations
+        with open(os.path.join(self.tmp_dir.name, 'numbers.csv'), 'w') as f:
+            f.write("n\n" + "\n".join(str(i) for i in range(25)) + "\n")
+
+        db = DuckDBOperations(self.tmp_dir.name)
+        stream = db.stream_query_with_column_names(
+            "SELECT n FROM numbers", batch_size=10)
+        self.assertEqual(stream.column_names, ['n'])
+        self.assertEqual(len(stream.fetch(12)), 12)
+
+    def test_mysql_early_stop_discards_connection(self):
+        db = MySQLOperations('localhost', 'user', 'password', 'testdb')
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.description = [('n',)]
+        cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        db.pool = MagicMock()
+        db.pool.acquire.return_value = conn
+
+        stream = db.stream_query_with_column_names(
+            "SELECT n FROM numbers", batch_size=2)
+        self.assertEqual(stream.fetch(1), [(1,)])
+        conn.cursor.assert_called_once_with(buffered=False)
+        db.pool.release.assert_called_once_with(conn, discard=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
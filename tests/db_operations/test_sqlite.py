@@ -1,6 +1,11 @@
 import unittest
 import os
+import sqlite3
+import tempfile
+import threading
+from unittest.mock import patch
 from dataneuron.db_operations.sqlite import SQLiteOperations
+from dataneuron.db_operations.exceptions import ConfigurationError, OperationError
 
 
 class TestSQLiteOperations(unittest.TestCase):
@@ -22,6 +27,7 @@ class TestSQLiteOperations(unittest.TestCase):
         """)
 
     def tearDown(self):
+        self.db.close()
         os.remove(self.db_path)
 
     def test_execute_query(self):
@@ -34,3 +40,52 @@ class TestSQLiteOperations(unittest.TestCase):
         self.assertIn("Table: test_table", schema_info)
         self.assertIn("id (INTEGER)", schema_info)
         self.assertIn("name (TEXT)", schema_info)
+
+
+class TestSQLiteConnections(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'analytics.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE events (id INTEGER)")
+        conn.execute("INSERT INTO events VALUES (1)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_only_connection_rejects_writes(self):
+        db = SQLiteOperations(self.db_path, read_only=True)
+        self.assertEqual(db.execute_query("SELECT COUNT(*) FROM events"), [(1,)])
+        with self.assertRaises(OperationError):
+            db.execute_query("DELETE FROM events")
+        db.close()
+
+    def test_connection_is_reused_per_thread(self):
+        db = SQLiteOperations(self.db_path, pragmas={'cache_size': -2000})
+        conn = db._get_connection()
+        self.assertIs(db._get_connection(), conn)
+        self.assertEqual(db.execute_query("PRAGMA cache_size"), [(-2000,)])
+        self.assertEqual(db.execute_query("PRAGMA temp_store"), [(2,)])
+
+        other = []
+        worker = threading.Thread(
+            target=lambda: other.append(db._get_connection()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(other[0], conn)
+        db.close()
+
+    def test_invalid_pragma(self):
+        with self.assertRaises(ConfigurationError):
+            SQLiteOperations(self.db_path, pragmas={'journal_mode': 'OFF'})
+        with self.assertRaises(ConfigurationError):
+            SQLiteOperations(self.db_path, pragmas={'cache_size': '1; DROP'})
+
+    @patch('dataneuron.db_operations.sqlite.print_warning')
+    def test_check_wal_warns(self, mock_warning):
+        db = SQLiteOperations(self.db_path, check_wal=True)
+        db.execute_query("SELECT 1")
+        mock_warning.assert_called_once()
+        db.close()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import yaml
+from dataneuron.core.context_loader import ContextLoader
+from dataneuron.prompts.prompt_compiler import build_context_prompt, compile_context, COMPILED_CONTEXT_KEY
+from dataneuron.prompts.sql_query_prompt import sql_query_prompt, sql_query_guidelines
+from dataneuron.prompts.combined_query_prompt import combined_query_prompt
+from dataneuron.prompts.query_refinement_prompt import query_refinement_prompt
+
+CONTEXT = {
+    'tables': {'main.users': {'name': 'users', 'columns': [{'name': 'id', 'type': 'int'}]}},
+    'relationships': [{'from': 'orders.uid', 'to': 'users.id'}],
+    'global_definitions': {'active': 'has order'}
+}
+
+
+class TestPromptCompiler(unittest.TestCase):
+    def test_compiled_context_is_reused(self):
+        context = dict(CONTEXT)
+        expected = sql_query_prompt("how many users", context, 'sqlite')
+        compile_context(context)
+
+        with patch('dataneuron.prompts.prompt_compiler.format_yaml_for_prompt') as format_yaml:
+            prompt = sql_query_prompt("how many users", context, 'sqlite')
+        format_yaml.assert_not_called()
+        self.assertEqual(prompt, expected)
+
+    def test_guidelines_render_once_per_database_without_the_date(self):
+        with patch('dataneuron.prompts.sql_query_prompt.datetime') as mock_datetime:
+            mock_datetime.datetime.now.return_value.strftime.return_value = '2030-01-02'
+            guidelines = sql_query_guidelines('postgres')
+            prompts = [sql_query_prompt("how many users", CONTEXT, 'postgres'),
+                       combined_query_prompt("how many users", CONTEXT, 'postgres', "Sample Data:", "")]
+        self.assertNotIn("2030-01-02", guidelines)
+        for prompt in prompts:
+            self.assertNotIn("2030-01-02", prompt.prefix)
+            self.assertIn("Current Date: 2030-01-02", prompt.suffix)
+
+        with patch('dataneuron.prompts.sql_query_prompt.get_sql_rules') as get_sql_rules:
+            sql_query_guidelines('postgres')
+        get_sql_rules.assert_not_called()
+
+    def test_cached_prefix_holds_the_static_instructions(self):
+        prompts = [sql_query_prompt("how many users", CONTEXT, 'sqlite'),
+                   combined_query_prompt("how many users", CONTEXT, 'sqlite', "Sample Data:", "user: hi")]
+        for prompt in prompts:
+            self.assertIn(sql_query_guidelines('sqlite'), prompt.prefix)
+            self.assertIn("Follow the XML format strictly", prompt.prefix)
+            self.assertNotIn("how many users", prompt.prefix)
+            self.assertNotIn("user: hi", prompt.prefix)
+            self.assertIn('The Query: "how many users"', prompt.suffix)
+
+    def test_refinement_prefix_does_not_depend_on_the_sample_data_text(self):
+        for sample_data in ["", "how many users"]:
+            prompt = query_refinement_prompt("main.users", sample_data, "how many users", "user: hi")
+            self.assertEqual(prompt.prefix + prompt.suffix, prompt)
+            self.assertIn("Return your response in the following JSON format", prompt.prefix)
+            self.assertNotIn('"how many users"', prompt.prefix)
+            self.assertNotIn("user: hi", prompt.prefix)
+            self.assertIn('"how many users"', prompt.suffix)
+
+    def test_context_loader_compiles_on_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                os.makedirs(os.path.join('context', 'sales', 'tables'))
+                with open(os.path.join('context', 'sales', 'tables', 'users.yaml'), 'w') as f:
+                    yaml.dump({'full_name': 'main.users', 'columns': [
+                              {'name': 'id'}]}, f)
+                context = ContextLoader('sales').load()
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(context[COMPILED_CONTEXT_KEY],
+                         build_context_prompt(context))
+        self.assertIn("main.users", context[COMPILED_CONTEXT_KEY])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from unittest.mock import patch
+from dataneuron.server import create_app
+
+
+class TestChatEndpoint(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('dataneuron.server.DataNeuronPool')
+        self.pool = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.dn = self.pool.acquire.return_value
+        self.client = create_app().test_client()
+
+    def test_chat_stream_sends_server_sent_events(self):
+        self.dn.chat_stream.return_value = iter([
+            ('sql', {'sql': 'SELECT 1'}),
+            ('rows', {'rows': [(1,)]}),
+            ('done', {'sql': 'SELECT 1', 'row_count': 1}),
+        ])
+        response = self.client.post('/chat', json={
+            'messages': [{'role': 'user', 'content': 'one?'}], 'stream': True})
+
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        body = response.get_data(as_text=True)
+        self.assertIn('event: sql\ndata: {"sql": "SELECT 1"}\n\n', body)
+        self.assertIn('event: rows\ndata: {"rows": [[1]]}\n\n', body)
+        self.dn.chat.assert_not_called()
+
+    def test_chat_without_stream_returns_json(self):
+        self.dn.chat.return_value = (
+            'SELECT 1', {'data': [(1,)], 'column_names': ['one']})
+        response = self.client.post('/chat', json={
+            'messages': [{'role': 'user', 'content': 'one?'}]})
+        self.assertEqual(response.get_json()['sql'], 'SELECT 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,4 @@
-from dataneuron.utils.stream_print import stream_and_print_simplified_xml
+from dataneuron.utils.stream_print import stream_and_print_simplified_xml, parse_simplified_xml
 
 
 def test_simplified_xml(capsys):
@@ -27,3 +27,11 @@ def test_simplified_xml(capsys):
     assert "Tables: users, orders" in captured.out
     assert "Note:" in captured.out
     assert "This query assumes that all users have placed at least one order" in captured.out
+
+
+def test_parse_simplified_xml_across_chunks():
+    state = {'buffer': ''}
+    assert parse_simplified_xml("<sql>SELECT 1</s", state) == []
+    assert parse_simplified_xml("ql><explanation>One</explanation>", state) == [
+        ('sql', 'SELECT 1'), ('explanation', 'One')]
+    assert state['buffer'] == ''